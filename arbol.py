@@ -0,0 +1,125 @@
+"""
+Árbol sintáctico concreto guardado en arreglos paralelos.
+
+En lugar de un objeto de Python por nodo, cada nodo es un índice en varios
+array('i'): su símbolo, su padre, su primer hijo, su siguiente hermano y el índice
+del token que consumió (o -1 si es un no terminal). Nodo es una vista liviana
+sobre un índice para recorrer el árbol cómodamente.
+"""
+from array import array
+
+
+class ArbolSintactico:
+    """
+    Árbol producido por ASDRArbol.
+
+    Atributos:
+        simbolo (array): Código del símbolo de cada nodo (ver TablaLL1: >= 0 terminal, < 0 no terminal).
+        padre (array): Índice del padre de cada nodo, o -1 para la raíz.
+        primer_hijo (array): Índice del primer hijo de cada nodo, o -1.
+        siguiente (array): Índice del siguiente hermano de cada nodo, o -1.
+        token (array): Índice en tokens del token consumido por cada terminal, o -1.
+        tokens (list): Tokens consumidos, en orden.
+        tabla (TablaLL1): Tabla que define los códigos de símbolo.
+    """
+    def __init__(self, tabla):
+        self.tabla = tabla
+        self.simbolo = array('i')
+        self.padre = array('i')
+        self.primer_hijo = array('i')
+        self.siguiente = array('i')
+        self.token = array('i')
+        self.tokens = []
+
+    def agregar(self, simbolo, padre):
+        """Agrega un nodo sin hijos y devuelve su índice."""
+        indice = len(self.simbolo)
+        self.simbolo.append(simbolo)
+        self.padre.append(padre)
+        self.primer_hijo.append(-1)
+        self.siguiente.append(-1)
+        self.token.append(-1)
+        return indice
+
+    def __len__(self):
+        return len(self.simbolo)
+
+    def nombre(self, indice):
+        codigo = self.simbolo[indice]
+        if codigo >= 0:
+            return self.tabla.terminales[codigo]
+        return self.tabla.no_terminales[-1 - codigo]
+
+    def raiz(self):
+        return Nodo(self, 0)
+
+    def recorrer(self, indice=0):
+        """Recorre en preorden el subárbol de un nodo, devolviendo índices."""
+        primer_hijo, siguiente = self.primer_hijo, self.siguiente
+        pila = [indice]
+        while pila:
+            nodo = pila.pop()
+            yield nodo
+            hijos = []
+            hijo = primer_hijo[nodo]
+            while hijo >= 0:
+                hijos.append(hijo)
+                hijo = siguiente[hijo]
+            pila.extend(reversed(hijos))
+
+    def bytes_arreglos(self):
+        """Devuelve los bytes ocupados por los arreglos de nodos (sin contar los tokens)."""
+        return sum(a.buffer_info()[1] * a.itemsize for a in (self.simbolo, self.padre, self.primer_hijo, self.siguiente, self.token))
+
+    def bytes_por_token(self):
+        """Devuelve los bytes de arreglos de nodos por cada token consumido."""
+        return self.bytes_arreglos() / len(self.tokens) if self.tokens else 0.0
+
+
+class Nodo:
+    """Vista de un nodo de un ArbolSintactico; no copia datos del árbol."""
+    __slots__ = ("arbol", "indice")
+
+    def __init__(self, arbol, indice):
+        self.arbol = arbol
+        self.indice = indice
+
+    @property
+    def nombre(self):
+        return self.arbol.nombre(self.indice)
+
+    @property
+    def es_terminal(self):
+        return self.arbol.simbolo[self.indice] >= 0
+
+    @property
+    def token(self):
+        indice = self.arbol.token[self.indice]
+        return self.arbol.tokens[indice] if indice >= 0 else None
+
+    @property
+    def padre(self):
+        indice = self.arbol.padre[self.indice]
+        return Nodo(self.arbol, indice) if indice >= 0 else None
+
+    def hijos(self):
+        hijo = self.arbol.primer_hijo[self.indice]
+        while hijo >= 0:
+            yield Nodo(self.arbol, hijo)
+            hijo = self.arbol.siguiente[hijo]
+
+    def descendientes(self):
+        for indice in self.arbol.recorrer(self.indice):
+            yield Nodo(self.arbol, indice)
+
+    def __eq__(self, otro):
+        return isinstance(otro, Nodo) and otro.arbol is self.arbol and otro.indice == self.indice
+
+    def __hash__(self):
+        return hash((id(self.arbol), self.indice))
+
+    def __repr__(self):
+        token = self.token
+        if token is not None:
+            return f"Nodo({self.nombre}, {token.value!r}, {token.row}:{token.col})"
+        return f"Nodo({self.nombre})"
@@ -0,0 +1,50 @@
+"""
+Mide el costo de construir el ArbolSintactico: tiempo y memoria por token.
+
+Para cada tamaño se parsea ejemplo.py repetido varias veces con ASDRTabla (sin árbol)
+y con ASDRArbol, y se reportan los bytes de arreglos por token y el pico de memoria
+adicional medido con tracemalloc.
+
+Uso:
+    python benchmarks/bench_arbol.py [repeticiones ...]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import lexico
+from parser import ASDRArbol, ASDRTabla, gramatica
+
+
+def medir(clase, tokens):
+    inicio = time.perf_counter()
+    parser = clase(gramatica, 'program', tokens=tokens)
+    parser.parse()
+    segundos = time.perf_counter() - inicio
+    # La memoria se mide en una segunda pasada para no inflar los tiempos con tracemalloc
+    tracemalloc.start()
+    clase(gramatica, 'program', tokens=tokens).parse()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return parser, segundos, pico
+
+
+def main(repeticiones):
+    with open(os.path.join(RAIZ, "ejemplo.py"), encoding="utf-8") as f:
+        ejemplo = f.read()
+    print(f"{'tokens':>9} {'nodos':>9} {'sin árbol (s)':>14} {'con árbol (s)':>14} {'arreglos B/token':>17} {'pico extra B/token':>19}")
+    for veces in repeticiones:
+        tokens = lexico.tokenize(ejemplo * veces)
+        _, t_tabla, pico_tabla = medir(ASDRTabla, tokens)
+        parser, t_arbol, pico_arbol = medir(ASDRArbol, tokens)
+        arbol = parser.arbol
+        extra = (pico_arbol - pico_tabla) / len(tokens)
+        print(f"{len(tokens):>9} {len(arbol):>9} {t_tabla:>14.4f} {t_arbol:>14.4f} {arbol.bytes_por_token():>17.1f} {extra:>19.1f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1, 10, 100, 1000])
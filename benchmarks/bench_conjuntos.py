@@ -0,0 +1,91 @@
+"""
+Compara el cálculo de PRIMEROS/SIGUIENTES por punto fijo con el de lista de trabajo.
+
+Solo se mide el cálculo de los conjuntos (anulables, PRIMEROS y SIGUIENTES); las
+predicciones y la tabla LL(1) se construyen igual con ambos algoritmos. La gramática
+de parser.py se extiende con reglas sintéticas (cadenas de expresiones,
+listas recursivas y alternativas anulables) hasta el número de producciones pedido,
+y para cada tamaño se mide el tiempo de ambos algoritmos y se verifica que den los
+mismos conjuntos.
+
+Uso:
+    python benchmarks/bench_conjuntos.py [producciones ...]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gramatica_compilada
+from parser import gramatica
+
+
+def gramatica_extendida(producciones, semilla=0):
+    """
+    Devuelve una copia de la gramática base con reglas de dialecto sintéticas.
+
+    Parámetros:
+        producciones (int): Número aproximado de producciones agregadas.
+        semilla (int): Variación de la forma de las reglas generadas.
+
+    Retorna:
+        dict: Gramática extendida, con 'statement' alcanzando todas las reglas nuevas.
+    """
+    extendida = {nt: list(prods) for nt, prods in gramatica.items()}
+    extendida['statement'] = list(extendida['statement'])
+    reglas = max(1, producciones // 4)
+    for i in range(reglas):
+        nt = f"ext_{i}"
+        cola = f"ext_{i}_cola"
+        siguiente = f"ext_{(i * 7 + semilla + 1) % reglas}"
+        extendida[nt] = [
+            [f"tk_ext_{i}", cola],
+            ['expression', cola],
+        ]
+        extendida[cola] = [
+            [f"tk_sep_{i % 13}", siguiente if i % 3 else 'expression', cola],
+            [],
+        ]
+        extendida['statement'].append([f"kw_ext_{i}", nt])
+    return extendida
+
+
+def medir(funcion, repeticiones):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+
+def punto_fijo(extendida):
+    primeros = gramatica_compilada.calcular_primeros(extendida)
+    return primeros, gramatica_compilada.calcular_siguientes(extendida, 'program', primeros)
+
+
+def worklist(extendida):
+    anulables = gramatica_compilada.calcular_anulables(extendida)
+    primeros = gramatica_compilada.calcular_primeros_worklist(extendida, anulables)
+    return primeros, gramatica_compilada.calcular_siguientes_worklist(extendida, 'program', primeros, anulables)
+
+
+def normalizar(conjuntos, extendida):
+    return {nt: conjuntos.get(nt, set()) for nt in extendida}
+
+
+def main(tamanos):
+    print(f"{'producciones':>12} {'punto fijo (s)':>15} {'worklist (s)':>13} {'aceleración':>12}  iguales")
+    for tamano in tamanos:
+        extendida = gramatica_extendida(tamano)
+        total = sum(len(prods) for prods in extendida.values())
+        repeticiones = 3 if total < 2000 else 1
+        t_fijo, fijo = medir(lambda: punto_fijo(extendida), repeticiones)
+        t_lista, lista = medir(lambda: worklist(extendida), repeticiones)
+        iguales = all(normalizar(a, extendida) == normalizar(b, extendida) for a, b in zip(fijo, lista))
+        print(f"{total:>12} {t_fijo:>15.4f} {t_lista:>13.4f} {t_fijo / t_lista:>11.1f}x  {'sí' if iguales else 'NO'}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [0, 100, 500, 1000, 2000, 4000])
@@ -0,0 +1,265 @@
+"""
+Mide la ejecución de programas con muchas iteraciones, compilados a clausuras (ejecucion.py).
+
+Los programas amplían los bucles de ejemplo.py ('while contador < 5', 'for k in
+range(0, 20, 2)', llamadas a sumar y x.append(var)) hasta ITERACIONES vueltas. Para cada
+uno se mide el mejor tiempo de:
+
+    recorrido      intérprete que recorre el ArbolSintactico en cada ejecución, con las
+                   variables en diccionarios (la forma directa de ejecutar el árbol)
+    clausuras      Programa.ejecutar: el árbol se compiló una vez a funciones anidadas
+                   y las variables están en posiciones fijas de un arreglo
+    CPython        exec del mismo código ya compilado por Python, como referencia
+
+La compilación (lexer, parser y árbol a clausuras) se mide aparte, una vez por programa.
+Se verifica que las tres formas impriman lo mismo.
+
+Uso:
+    python benchmarks/bench_ejecucion.py [ITERACIONES ...] [--repeticiones 5]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import ejecucion
+from parser import parse_source
+
+PROGRAMAS = {
+    "while": """
+contador = 0
+total = 0
+while contador < {n}:
+    total = total + contador * 2
+    contador = contador + 1
+print(total)
+""",
+    "for paso": """
+total = 0
+for k in range(0, {n} * 2, 2):
+    total += k
+print(total)
+""",
+    "llamadas": """
+def sumar(x, y):
+    temp = x + y
+    return temp
+
+resultado = 0
+for i in range({n}):
+    resultado = sumar(resultado, i)
+print(resultado)
+""",
+    "listas": """
+var = 0
+x = []
+while var < {n}:
+    x.append(var)
+    var += 1
+print(len(x))
+""",
+    "anidado": """
+def clasificar(val):
+    if val > 50:
+        return val - 50
+    elif val == 50:
+        return 0
+    else:
+        return val * 10
+
+suma = 0
+for iter in range({m}):
+    for j in range(100):
+        suma = suma + clasificar(j)
+print(suma)
+""",
+}
+
+
+class _Retorno(Exception):
+    def __init__(self, valor):
+        self.valor = valor
+
+
+class Recorrido:
+    """Intérprete de referencia: recorre el árbol en cada ejecución y busca los nombres en diccionarios."""
+
+    def __init__(self, arbol, salida):
+        self.raiz = arbol.raiz()
+        self.salida = salida
+        self.globales = dict(ejecucion.NATIVAS)
+
+    def ejecutar(self):
+        nodo = self.raiz
+        while True:
+            hijos = list(nodo.hijos())
+            if len(hijos) < 2:
+                return
+            self.sentencia(hijos[0], self.globales)
+            nodo = hijos[1]
+
+    def suite(self, nodo, variables):
+        hijos = list(nodo.hijos())
+        self.sentencia(hijos[1], variables)
+        nodo = hijos[2]
+        while True:
+            hijos = list(nodo.hijos())
+            if len(hijos) < 2:
+                return
+            self.sentencia(hijos[0], variables)
+            nodo = hijos[1]
+
+    def sentencia(self, nodo, variables):
+        hijos = list(nodo.hijos())
+        tipo = hijos[0].nombre
+        if tipo == 'id':
+            nombre = hijos[0].token.value
+            hijo = next(hijos[1].hijos())
+            if hijo.nombre == 'asig':
+                operador, expresion = hijo.hijos()
+                valor = self.expresion(expresion, variables)
+                if operador.nombre != 'tk_asign':
+                    valor = ejecucion.ASIGNACIONES[operador.nombre](self.nombre(nombre, variables), valor)
+                variables[nombre] = valor
+            else:
+                self.sufijos(self.nombre(nombre, variables), hijo, variables)
+        elif tipo == 'if_statement':
+            hijos = list(hijos[0].hijos())
+            while hijos:
+                if hijos[0].nombre == 'else':
+                    self.suite(hijos[2], variables)
+                    return
+                if self.expresion(hijos[1], variables):
+                    self.suite(hijos[3], variables)
+                    return
+                hijos = list(hijos[4].hijos())
+        elif tipo == 'while':
+            while self.expresion(hijos[1], variables):
+                self.suite(hijos[3], variables)
+        elif tipo == 'for':
+            for valor in range(*self.argumentos(hijos[5], variables)):
+                variables[hijos[1].token.value] = valor
+                self.suite(hijos[8], variables)
+        elif tipo == 'def':
+            variables[hijos[1].token.value] = self.funcion(hijos)
+        elif tipo == 'return':
+            raise _Retorno(self.expresion(hijos[1], variables))
+        elif tipo == 'print':
+            print(self.expresion(hijos[2], variables), file=self.salida)
+
+    def funcion(self, hijos):
+        parametros = [n.token.value for n in hijos[3].descendientes() if n.nombre == 'id']
+        cuerpo = hijos[6]
+
+        def llamar(*argumentos):
+            try:
+                self.suite(cuerpo, dict(zip(parametros, argumentos)))
+            except _Retorno as r:
+                return r.valor
+        return llamar
+
+    def nombre(self, nombre, variables):
+        if nombre in variables:
+            return variables[nombre]
+        return self.globales[nombre]
+
+    def expresion(self, nodo, variables):
+        hijos = list(nodo.hijos())
+        if nodo.nombre == 'comparison':
+            operador = next(hijos[1].hijos()).nombre
+            return ejecucion.OPERACIONES[operador](self.expresion(hijos[0], variables), self.expresion(hijos[2], variables))
+        if len(hijos) == 2 and hijos[1].nombre.endswith("'") and not hijos[0].es_terminal:
+            valor = self.expresion(hijos[0], variables)
+            cola = list(hijos[1].hijos())
+            while cola:
+                valor = ejecucion.OPERACIONES[cola[0].nombre](valor, self.expresion(cola[1], variables))
+                cola = list(cola[2].hijos())
+            return valor
+        primero = hijos[0]
+        if not primero.es_terminal:
+            if primero.nombre == 'list_literal':
+                return self.argumentos(list(primero.hijos())[1], variables)
+            return self.expresion(primero, variables)
+        if primero.nombre == 'tk_resta':
+            return -self.expresion(hijos[1], variables)
+        if primero.nombre == 'id':
+            return self.sufijos(self.nombre(primero.token.value, variables), hijos[1], variables)
+        if primero.nombre == 'tk_entero':
+            return int(primero.token.value)
+        if primero.nombre == 'tk_cadena':
+            return primero.token.value[1:-1]
+        return self.expresion(hijos[1], variables)
+
+    def argumentos(self, nodo, variables):
+        """Valores de un argument_list u optional_expression_list."""
+        valores = []
+        hijos = list(nodo.hijos())
+        if hijos and hijos[0].nombre == 'expression_list':
+            hijos = list(hijos[0].hijos())
+        while hijos:
+            k = 1 if hijos[0].nombre == 'tk_coma' else 0
+            valores.append(self.expresion(hijos[k], variables))
+            hijos = list(hijos[k + 1].hijos())
+        return valores
+
+    def sufijos(self, valor, nodo, variables):
+        while True:
+            hijos = list(nodo.hijos())
+            if not hijos:
+                return valor
+            if hijos[0].nombre == 'tk_par_izq':
+                return valor(*self.argumentos(hijos[1], variables))
+            partes = list(hijos[1].hijos())
+            valor = getattr(valor, partes[0].token.value)
+            nodo = partes[1]
+
+
+def mejor(funcion, repeticiones):
+    tiempo = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.process_time()
+        funcion()
+        tiempo = min(tiempo, time.process_time() - inicio)
+    return tiempo
+
+
+def medir(fuente, repeticiones):
+    inicio = time.process_time()
+    programa = ejecucion.compilar(fuente)
+    compilacion = time.process_time() - inicio
+    arbol = parse_source(fuente, construir_arbol=True).arbol
+    codigo = compile(fuente, "<bench>", "exec")
+
+    salidas = [io.StringIO() for _ in range(3)]
+    tiempos = [
+        mejor(lambda: Recorrido(arbol, salidas[0]).ejecutar(), max(1, repeticiones // 3)),
+        mejor(lambda: programa.ejecutar(salidas[1]), repeticiones),
+        mejor(lambda: exec(codigo, {"print": lambda v: salidas[2].write(f"{v}\n")}), repeticiones),
+    ]
+    # Cada repetición imprime lo mismo: se compara lo impreso por cada forma, sin repetir
+    impresos = [set(salida.getvalue().splitlines()) for salida in salidas]
+    if impresos[0] != impresos[1] or impresos[1] != impresos[2]:
+        raise AssertionError(f"Las salidas no coinciden: {impresos}")
+    return compilacion, tiempos
+
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description="Compara la ejecución por clausuras con un recorrido del árbol y con CPython.")
+    argumentos.add_argument("iteraciones", nargs="*", type=int, default=[10_000, 100_000])
+    argumentos.add_argument("--repeticiones", type=int, default=5)
+    opciones = argumentos.parse_args(argv)
+
+    print(f"{'programa':<10} {'iter.':>8} {'compilar':>9} {'recorrido':>10} {'clausuras':>10} {'CPython':>9} {'vs recorr.':>10} {'vs CPython':>10}")
+    for n in opciones.iteraciones:
+        for nombre, plantilla in PROGRAMAS.items():
+            compilacion, (recorrido, clausuras, cpython) = medir(plantilla.format(n=n, m=n // 100), opciones.repeticiones)
+            print(f"{nombre:<10} {n:>8} {compilacion * 1000:>7.1f}ms {recorrido * 1000:>8.1f}ms {clausuras * 1000:>8.1f}ms "
+                  f"{cpython * 1000:>7.1f}ms {recorrido / clausuras:>9.1f}x {clausuras / cpython:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
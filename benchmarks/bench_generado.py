@@ -0,0 +1,88 @@
+"""
+Compara el parser generado (ASDRGenerado) con el ASDR que interpreta la gramática.
+
+Para cada tamaño se generan programas con generador.py y se parsean con ASDR
+iterativo, ASDRTabla y ASDRGenerado, midiendo el mejor tiempo de parse sobre la misma
+lista de tokens. Antes de medir se verifica que todos (incluido ASDR recursivo, que no
+se mide porque agota la pila de Python con programas grandes) den el mismo resultado
+(aceptación, mensaje de error, posición y tokens consumidos) sobre programas generados
+y sobre copias con mutaciones aleatorias.
+
+Uso:
+    python benchmarks/bench_generado.py [bytes ...]
+"""
+import os
+import random
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import lexico
+from generador import generar_programa
+from parser import ASDR, ASDRGenerado, ASDRTabla, gramatica
+
+PARSERS = [
+    ("ASDR iterativo", lambda tokens: ASDR(gramatica, 'program', tokens=tokens, iterativo=True)),
+    ("ASDRTabla", lambda tokens: ASDRTabla(gramatica, 'program', tokens=tokens)),
+    ("ASDRGenerado", lambda tokens: ASDRGenerado(gramatica, 'program', tokens=tokens)),
+]
+RECURSIVO = ("ASDR", lambda tokens: ASDR(gramatica, 'program', tokens=tokens))
+
+
+def resultado(crear, tokens):
+    parser = crear(tokens)
+    try:
+        parser.parse()
+        error = None
+    except SyntaxError as e:
+        error = str(e)
+    return error, parser.pos, parser.token_actual()
+
+
+def mutar(codigo, azar, cambios=3):
+    for _ in range(cambios):
+        i = azar.randrange(len(codigo))
+        codigo = codigo[:i] + azar.choice(" \n:()=+,.x1-[]") + codigo[i + 1:]
+    return codigo
+
+
+def verificar(programas=200, semilla=0):
+    """Devuelve la cantidad de programas en los que algún parser difiere de ASDR."""
+    azar = random.Random(semilla)
+    diferencias = 0
+    for i in range(programas):
+        codigo = generar_programa(2000, semilla + i)
+        for fuente in (codigo, mutar(codigo, azar)):
+            tokens = lexico.tokenize(fuente)
+            resultados = [resultado(crear, tokens) for _, crear in [RECURSIVO] + PARSERS]
+            if any(r != resultados[0] for r in resultados[1:]):
+                diferencias += 1
+    return diferencias
+
+
+def medir(crear, tokens, repeticiones):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        parser = crear(tokens)
+        inicio = time.perf_counter()
+        parser.parse()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def main(tamanos):
+    diferencias = verificar()
+    print(f"Verificación: {diferencias} programas con resultados distintos de ASDR\n")
+    print(f"{'bytes':>9} {'tokens':>8} " + " ".join(f"{nombre + ' (s)':>19}" for nombre, _ in PARSERS) + f" {'aceleración':>12}")
+    for tamano in tamanos:
+        tokens = lexico.tokenize(generar_programa(tamano))
+        repeticiones = 5 if len(tokens) < 100000 else 1
+        tiempos = [medir(crear, tokens, repeticiones) for _, crear in PARSERS]
+        columnas = " ".join(f"{t:>19.4f}" for t in tiempos)
+        print(f"{tamano:>9} {len(tokens):>8} {columnas} {tiempos[0] / tiempos[-1]:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000])
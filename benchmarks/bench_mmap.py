@@ -0,0 +1,83 @@
+"""
+Compara el motor mmap del lexer con los motores que leen el archivo como texto.
+
+Para cada tamaño se genera un programa con generador.py y se escribe en un directorio
+temporal. Con cada motor se mide, en el mismo proceso:
+
+    lista   todos los tokens en memoria, como hace lexico.lexer: una lista de Token con
+            los motores de texto y un TokensMapeados con el motor mmap
+    parse   ASDRTabla consumiendo el generador de tokens sin guardarlos
+
+reportando segundos, pico de memoria (tracemalloc, en una segunda pasada) y bytes
+asignados por token en el pico. Antes de medir se verifica que todos los motores
+produzcan los mismos tokens.
+
+Uso:
+    python benchmarks/bench_mmap.py [bytes ...]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import lexico
+from generador import generar_programa
+from parser import ASDRTabla, gramatica
+
+MOTORES = sorted(lexico.MOTORES) + [lexico.MOTOR_MMAP]
+
+
+def lista(ruta, motor):
+    if motor == lexico.MOTOR_MMAP:
+        return len(lexico.TokensMapeados.desde_archivo(ruta, []))
+    return len(list(lexico.iter_tokens(ruta, motor=motor, errores=[])))
+
+
+def parse(ruta, motor):
+    parser = ASDRTabla(gramatica, 'program', tokens=lexico.iter_tokens(ruta, motor=motor, errores=[]))
+    parser.parse()
+    return parser.pos
+
+
+def medir(funcion, ruta, motor):
+    inicio = time.perf_counter()
+    funcion(ruta, motor)
+    segundos = time.perf_counter() - inicio
+    tracemalloc.start()
+    funcion(ruta, motor)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return segundos, pico
+
+
+def verificar(ruta):
+    referencia = [(t.kind, t.value, t.row, t.col) for t in lexico.iter_tokens(ruta, errores=[])]
+    for motor in MOTORES[1:]:
+        if [(t.kind, t.value, t.row, t.col) for t in lexico.iter_tokens(ruta, motor=motor, errores=[])] != referencia:
+            return False
+    return [(t.kind, t.value, t.row, t.col) for t in lexico.TokensMapeados.desde_archivo(ruta, [])] == referencia
+
+
+def main(tamanos):
+    with tempfile.TemporaryDirectory() as directorio:
+        print(f"{'bytes':>9} {'tokens':>8} {'etapa':>6} {'motor':>7} {'segundos':>9} {'pico (KB)':>10} {'B/token':>8}")
+        for tamano in tamanos:
+            ruta = os.path.join(directorio, f"programa_{tamano}.py")
+            with open(ruta, "w", encoding="utf-8") as f:
+                f.write(generar_programa(tamano))
+            if not verificar(ruta):
+                print(f"{tamano:>9} los motores producen tokens distintos")
+                continue
+            tokens = lista(ruta, MOTORES[0])
+            for nombre, funcion in (("lista", lista), ("parse", parse)):
+                for motor in MOTORES:
+                    segundos, pico = medir(funcion, ruta, motor)
+                    print(f"{tamano:>9} {tokens:>8} {nombre:>6} {motor:>7} {segundos:>9.4f} {pico / 1024:>10.0f} {pico / tokens:>8.1f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100000, 1000000, 10000000])
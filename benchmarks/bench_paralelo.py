@@ -0,0 +1,50 @@
+"""
+Compara el análisis secuencial de un archivo grande con paralelo.analizar_paralelo.
+
+Para cada tamaño se genera un programa con generador.py y se mide el tiempo de
+parse_source(codificado=True) y el de analizar_paralelo con distintas cantidades de
+procesos, comprobando que el resultado sea el mismo.
+
+Uso:
+    python benchmarks/bench_paralelo.py [bytes ...] [-j 1,2,4,8]
+"""
+import argparse
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from generador import generar_programa
+from paralelo import analizar_paralelo
+from parser import parse_source
+
+
+def cronometrar(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, time.perf_counter() - inicio
+
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argumentos.add_argument("tamanos", nargs="*", type=int, default=[1000000, 10000000])
+    argumentos.add_argument("-j", "--trabajos", default="1,2,4,8", help="cantidades de procesos, separadas por comas")
+    opciones = argumentos.parse_args(argv)
+    trabajos = [int(j) for j in opciones.trabajos.split(",")]
+
+    print(f"{'bytes':>9} {'tokens':>9} {'secuencial (s)':>15} " + " ".join(f"{f'-j {j} (s)':>10}" for j in trabajos))
+    for tamano in opciones.tamanos:
+        codigo = generar_programa(tamano)
+        secuencial, segundos = cronometrar(lambda: parse_source(codigo, codificado=True))
+        tiempos = []
+        for j in trabajos:
+            paralelo, segundos_paralelo = cronometrar(lambda: analizar_paralelo(codigo, trabajos=j))
+            assert paralelo[:4] == secuencial[:4] and list(paralelo.tokens.tipo) == list(secuencial.tokens.tipo)
+            tiempos.append(segundos_paralelo)
+        print(f"{tamano:>9} {len(secuencial.tokens):>9} {segundos:>15.3f} " + " ".join(f"{t:>10.3f}" for t in tiempos))
+
+
+if __name__ == "__main__":
+    main()
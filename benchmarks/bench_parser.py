@@ -0,0 +1,222 @@
+"""
+Suite de rendimiento del lexer y el parser sobre programas sintéticos de tamaño creciente.
+
+Para cada tamaño se genera un programa válido con generador.py, se escribe en un
+directorio temporal y se miden por separado las etapas de main_analisis_sintactico:
+
+    lexer         lexico.lexer (incluye escribir el archivo _tokens.txt)
+    conversion    parser.tokens_para_parser
+    construccion  ASDR(..., iterativo=True) con la gramática ya compilada
+    parse         ASDR.parse
+
+Además se mide una vez la compilación de la gramática (GramaticaCompilada). Para cada
+etapa se reportan segundos, tokens por segundo y pico de memoria medido con tracemalloc
+en una segunda pasada (para no inflar los tiempos). Los resultados se pueden guardar en
+JSON y compararse con los de otro commit.
+
+Uso:
+    python benchmarks/bench_parser.py [tamaños ...] [--json resultados.json] [--comparar anterior.json]
+
+Los tamaños aceptan sufijos K, M y G (por ejemplo 1K 100K 10M 100M); por defecto se
+usan 1K, 10K, 100K, 1M y 10M.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import lexico
+from gramatica_compilada import GramaticaCompilada, compilar_gramatica
+from generador import GeneradorProgramas
+from parser import ASDR, gramatica, tokens_para_parser
+
+ETAPAS = ("lexer", "conversion", "construccion", "parse")
+_SUFIJOS = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+
+def leer_tamano(texto):
+    """Convierte un tamaño como "10K" o "100M" en bytes."""
+    texto = texto.strip().upper().rstrip("B")
+    if texto and texto[-1] in _SUFIJOS:
+        return int(float(texto[:-1]) * _SUFIJOS[texto[-1]])
+    return int(texto)
+
+
+def commit_actual():
+    try:
+        salida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True, check=True)
+        return salida.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _etapas(ruta):
+    """Devuelve las etapas como funciones que reciben el resultado de la anterior."""
+    def lexer(_):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return lexico.lexer(ruta)
+
+    def construccion(tokens):
+        return ASDR(gramatica, 'program', tokens=tokens, iterativo=True)
+
+    def parse(parser):
+        parser.parse()
+        return parser
+
+    return [("lexer", lexer), ("conversion", tokens_para_parser), ("construccion", construccion), ("parse", parse)]
+
+
+def medir_tiempos(ruta, repeticiones):
+    """Ejecuta la cadena de etapas y devuelve el mejor tiempo de cada una y la cantidad de tokens."""
+    mejores = dict.fromkeys(ETAPAS, float("inf"))
+    tokens = 0
+    for _ in range(repeticiones):
+        valor = None
+        for nombre, etapa in _etapas(ruta):
+            inicio = time.perf_counter()
+            valor = etapa(valor)
+            mejores[nombre] = min(mejores[nombre], time.perf_counter() - inicio)
+            if nombre == "conversion":
+                tokens = len(valor)
+        del valor
+    return mejores, tokens
+
+
+def medir_memoria(ruta):
+    """Ejecuta la cadena de etapas una vez y devuelve el pico de memoria de cada una, en bytes."""
+    picos = {}
+    valor = None
+    for nombre, etapa in _etapas(ruta):
+        tracemalloc.start()
+        valor = etapa(valor)
+        picos[nombre] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return picos
+
+
+def medir_tamano(tamano, opciones, directorio):
+    generador = GeneradorProgramas(
+        semilla=opciones.semilla,
+        profundidad=opciones.profundidad,
+        profundidad_expresion=opciones.profundidad_expresion,
+        longitud_expresion=opciones.longitud_expresion,
+        longitud_identificador=opciones.longitud_identificador,
+        longitud_cadena=opciones.longitud_cadena,
+    )
+    codigo = generador.programa(tamano)
+    ruta = os.path.join(directorio, f"programa_{tamano}.py")
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write(codigo)
+    del codigo
+
+    repeticiones = opciones.repeticiones if tamano < (1 << 20) else 1
+    tiempos, tokens = medir_tiempos(ruta, repeticiones)
+    picos = {} if opciones.sin_memoria else medir_memoria(ruta)
+    etapas = {}
+    for nombre in ETAPAS:
+        etapas[nombre] = {
+            "segundos": tiempos[nombre],
+            "tokens_por_segundo": tokens / tiempos[nombre] if tiempos[nombre] else 0.0,
+            "pico_bytes": picos.get(nombre),
+        }
+    total = sum(tiempos.values())
+    with open(ruta, encoding="utf-8") as f:
+        lineas = sum(1 for _ in f)
+    resultado = {
+        "tamano": tamano,
+        "bytes": os.path.getsize(ruta),
+        "lineas": lineas,
+        "tokens": tokens,
+        "segundos": total,
+        "tokens_por_segundo": tokens / total if total else 0.0,
+        "etapas": etapas,
+    }
+    os.remove(ruta)
+    tokens_txt = ruta.replace(".py", "_tokens.txt")
+    if os.path.exists(tokens_txt):
+        os.remove(tokens_txt)
+    return resultado
+
+
+def medir_compilacion(repeticiones=5):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        GramaticaCompilada(gramatica, 'program')
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def imprimir_resultado(r, anterior=None):
+    etapas = r["etapas"]
+    columnas = " ".join(f"{etapas[e]['segundos']:>12.4f}" for e in ETAPAS)
+    picos = [etapas[e]["pico_bytes"] for e in ETAPAS if etapas[e]["pico_bytes"] is not None]
+    pico = f"{max(picos) / r['tokens']:>10.1f}" if picos else f"{'-':>10}"
+    linea = f"{r['bytes']:>11} {r['tokens']:>10} {columnas} {r['tokens_por_segundo']:>12.0f} {pico}"
+    if anterior:
+        linea += f" {anterior['segundos'] / r['segundos']:>8.2f}x"
+    print(linea, flush=True)
+
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description="Mide el lexer y el parser sobre programas sintéticos.")
+    argumentos.add_argument("tamanos", nargs="*", default=["1K", "10K", "100K", "1M", "10M"], help="tamaños de programa (admite K, M y G)")
+    argumentos.add_argument("--semilla", type=int, default=0)
+    argumentos.add_argument("--profundidad", type=int, default=3, help="anidamiento máximo de bloques")
+    argumentos.add_argument("--profundidad-expresion", type=int, default=2, help="anidamiento máximo de expresiones")
+    argumentos.add_argument("--longitud-expresion", type=float, default=1.0, help="largo medio de operadores encadenados y listas")
+    argumentos.add_argument("--longitud-identificador", type=int, default=6)
+    argumentos.add_argument("--longitud-cadena", type=int, default=12)
+    argumentos.add_argument("--repeticiones", type=int, default=3, help="repeticiones para tamaños menores a 1M (se toma la mejor)")
+    argumentos.add_argument("--sin-memoria", action="store_true", help="no medir el pico de memoria")
+    argumentos.add_argument("--json", help="archivo donde guardar los resultados")
+    argumentos.add_argument("--comparar", help="resultados JSON de otro commit para comparar")
+    opciones = argumentos.parse_args(argv)
+
+    anteriores = {}
+    if opciones.comparar:
+        with open(opciones.comparar, encoding="utf-8") as f:
+            anteriores = {r["tamano"]: r for r in json.load(f)["resultados"]}
+
+    compilar_gramatica(gramatica, 'program')
+    compilacion = medir_compilacion()
+    print(f"Compilación de la gramática: {compilacion * 1000:.2f} ms\n")
+    encabezado = " ".join(f"{e + ' (s)':>12}" for e in ETAPAS)
+    print(f"{'bytes':>11} {'tokens':>10} {encabezado} {'tokens/s':>12} {'B/token':>10}" + (f" {'vs ant.':>9}" if anteriores else ""))
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as directorio:
+        for texto in opciones.tamanos:
+            tamano = leer_tamano(texto)
+            r = medir_tamano(tamano, opciones, directorio)
+            resultados.append(r)
+            imprimir_resultado(r, anteriores.get(tamano))
+
+    if opciones.json:
+        reporte = {
+            "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": commit_actual(),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "parametros": {clave: valor for clave, valor in vars(opciones).items() if clave not in ("json", "comparar")},
+            "compilacion_segundos": compilacion,
+            "resultados": resultados,
+        }
+        with open(opciones.json, "w", encoding="utf-8") as f:
+            json.dump(reporte, f, ensure_ascii=False, indent=2)
+        print(f"\nResultados guardados en '{opciones.json}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Compara el análisis de expresiones largas por la cadena de la gramática y por precedencia.
+
+Cada programa tiene LINEAS asignaciones cuya expresión encadena OPERANDOS operandos con
+operadores al azar (y algunos paréntesis). Se mide el mejor tiempo de:
+
+    ASDR            funciones parse_<nt> sobre la gramática de parser.py (solo + - * /)
+    cadena          ASDRTabla sobre la gramática de parser.py
+    cadena ext.     ASDRTabla sobre gramatica_con_operadores (un nivel por precedencia)
+    precedencia     ASDRPrecedencia (escalada de precedencia sobre POTENCIAS)
+
+La primera fila de cada tamaño usa solo + - * /, que acepta la gramática original; la
+segunda usa todos los operadores de precedencia.POTENCIAS, y la gramática original no se mide.
+
+Uso:
+    python benchmarks/bench_precedencia.py [OPERANDOS ...] [--lineas 200]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import lexico
+from parser import ASDR, ASDRTabla, gramatica
+from precedencia import POTENCIA_COMPARACION, POTENCIAS, ASDRPrecedencia, gramatica_con_operadores
+
+_LEXEMAS = {tipo: lexema for lexema, tipo in lexico.OPERATORS.items()}
+BASICOS = ["+", "-", "*", "/"]
+TODOS = [_LEXEMAS[tipo] for tipo, potencia in POTENCIAS.items() if potencia[0] > POTENCIA_COMPARACION]
+
+
+def generar(operandos, lineas, operadores, semilla=0):
+    aleatorio = random.Random(semilla)
+    salida = []
+    for i in range(lineas):
+        partes = []
+        abiertos = 0
+        for k in range(operandos):
+            if k and aleatorio.random() < 0.1:
+                partes.append("(")
+                abiertos += 1
+            partes.append(aleatorio.choice(["a", "b", "c", "12", "f(x)"]))
+            if abiertos and aleatorio.random() < 0.1:
+                partes.append(")")
+                abiertos -= 1
+            if k + 1 < operandos:
+                partes.append(aleatorio.choice(operadores))
+        partes.append(")" * abiertos)
+        salida.append(f"v{i} = {' '.join(partes)}\n")
+    return "".join(salida)
+
+
+def mejor(crear, repeticiones=9):
+    tiempo = float("inf")
+    for _ in range(repeticiones):
+        parser = crear()
+        inicio = time.perf_counter()
+        parser.parse()
+        tiempo = min(tiempo, time.perf_counter() - inicio)
+    return tiempo
+
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argumentos.add_argument("operandos", nargs="*", type=int, default=[10, 100, 1000])
+    argumentos.add_argument("--lineas", type=int, default=2000)
+    opciones = argumentos.parse_args(argv)
+    extendida = gramatica_con_operadores(gramatica)
+
+    print(f"{'operadores':>10} {'operandos':>9} {'tokens':>8} {'ASDR (s)':>9} {'cadena (s)':>11} {'cadena ext. (s)':>16} {'precedencia (s)':>16}")
+    for operandos in opciones.operandos:
+        for nombre, operadores in (("+ - * /", BASICOS), ("todos", TODOS)):
+            tokens = lexico.tokenize(generar(operandos, max(1, opciones.lineas * 10 // operandos), operadores))
+            basicos = operadores is BASICOS
+            funciones = mejor(lambda: ASDR(gramatica, 'program', tokens=tokens, iterativo=True)) if basicos else None
+            cadena = mejor(lambda: ASDRTabla(gramatica, 'program', tokens=tokens)) if basicos else None
+            extendida_s = mejor(lambda: ASDRTabla(extendida, 'program', tokens=tokens))
+            precedencia = mejor(lambda: ASDRPrecedencia(gramatica, 'program', tokens=tokens))
+            print(f"{nombre:>10} {operandos:>9} {len(tokens):>8} {funciones if basicos else float('nan'):>9.4f} "
+                  f"{cadena if basicos else float('nan'):>11.4f} "
+                  f"{extendida_s:>16.4f} {precedencia:>16.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Compara los tokens codificados (lexico.TokensCodificados) con una lista de Token.
+
+Para cada tamaño se genera un programa con generador.py y se mide:
+
+    memoria  pico de tracemalloc al guardar todos los tokens (lista de Token o TokensCodificados)
+    parse    mejor tiempo de ASDRTabla sobre la lista y de ASDRCodificado sobre los arreglos
+    usos     tiempo de buscar todos los usos de un identificador, recorriendo la lista o con
+             TokensCodificados.usos (que construye su índice en la primera consulta)
+
+Uso:
+    python benchmarks/bench_simbolos.py [bytes ...]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import lexico
+from generador import generar_programa
+from parser import ASDRCodificado, ASDRTabla, gramatica
+
+
+def pico(funcion):
+    tracemalloc.start()
+    resultado = funcion()
+    memoria = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return resultado, memoria
+
+
+def mejor_parse(crear, repeticiones):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        parser = crear()
+        inicio = time.perf_counter()
+        parser.parse()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def cronometrar(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, time.perf_counter() - inicio
+
+
+def main(tamanos):
+    print(f"{'bytes':>9} {'tokens':>8} {'símbolos':>9} {'lista (KB)':>11} {'codif. (KB)':>12} "
+          f"{'ASDRTabla (s)':>14} {'ASDRCodif. (s)':>15} {'usos lista (s)':>15} {'usos índice (s)':>16}")
+    for tamano in tamanos:
+        codigo = generar_programa(tamano)
+        lista, memoria_lista = pico(lambda: lexico.tokenize(codigo))
+        codificados, memoria_codificados = pico(lambda: lexico.tokenize_codificado(codigo))
+        repeticiones = 5 if len(lista) < 100000 else 1
+        tabla = mejor_parse(lambda: ASDRTabla(gramatica, 'program', tokens=lista), repeticiones)
+        codificado = mejor_parse(lambda: ASDRCodificado(gramatica, 'program', tokens=codificados), repeticiones)
+        nombre = next(t.value for t in lista if t.kind == "id")
+        usos_lista, segundos_lista = cronometrar(lambda: [i for i, t in enumerate(lista) if t.kind == "id" and t.value == nombre])
+        codificados.usos(nombre)
+        usos_indice, segundos_indice = cronometrar(lambda: codificados.usos(nombre))
+        assert usos_lista == usos_indice
+        print(f"{tamano:>9} {len(lista):>8} {len(codificados.simbolos):>9} {memoria_lista / 1024:>11.0f} {memoria_codificados / 1024:>12.0f} "
+              f"{tabla:>14.4f} {codificado:>15.4f} {segundos_lista:>15.5f} {segundos_indice:>16.5f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000])
@@ -0,0 +1,178 @@
+"""
+Generador de programas sintéticos válidos a partir de la gramática de parser.py.
+
+Los programas se obtienen derivando la gramática al azar: cada terminal se escribe
+con su lexema (palabras reservadas, operadores y puntuación de lexico.py, y lexemas
+generados para id, tk_entero y tk_cadena) y la disposición en líneas sale de los
+propios símbolos: cada 'statement' empieza una línea, INDENT abre un nivel de
+indentación y DEDENT lo cierra. Como toda derivación es una oración de la gramática,
+los programas generados siempre son aceptados por el parser.
+
+El tamaño se controla con:
+    profundidad: anidamiento máximo de bloques (if/while/def/for).
+    profundidad_expresion: anidamiento máximo de expresiones (paréntesis, llamadas, listas).
+    longitud_expresion: largo medio de las colas recursivas (operadores encadenados,
+        argumentos, elementos de listas, sentencias de un bloque, elif).
+    longitud_identificador, longitud_cadena: largo de los lexemas generados.
+
+Uso:
+    python benchmarks/generador.py BYTES [semilla] > programa.py
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lexico
+from parser import gramatica
+
+_LEXEMAS = {tipo: lexema for lexema, tipo in {**lexico.OPERATORS, **lexico.PUNCTUATION}.items()}
+_LETRAS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def _alcanzan(gramatica, objetivo):
+    """Devuelve los no terminales desde los que se puede derivar una forma que contiene objetivo."""
+    alcanzan = set()
+    cambio = True
+    while cambio:
+        cambio = False
+        for nt, producciones in gramatica.items():
+            if nt not in alcanzan and any(s == objetivo or s in alcanzan for prod in producciones for s in prod):
+                alcanzan.add(nt)
+                cambio = True
+    return alcanzan
+
+
+class GeneradorProgramas:
+    """
+    Genera programas aleatorios derivando una gramática LL(1).
+
+    Parámetros:
+        gramatica (dict): Gramática a derivar (por defecto, la de parser.py).
+        semilla (int): Semilla del generador aleatorio.
+        profundidad (int): Anidamiento máximo de bloques.
+        profundidad_expresion (int): Anidamiento máximo de expresiones.
+        longitud_expresion (float): Largo medio de las colas recursivas.
+        longitud_identificador (int): Largo de los identificadores.
+        longitud_cadena (int): Largo del contenido de las cadenas.
+        simbolo_sentencia (str): No terminal que empieza una línea nueva.
+        bloque (str): No terminal que abre un bloque (controlado por profundidad).
+        expresion (str): No terminal de expresión (controlado por profundidad_expresion).
+    """
+    def __init__(self, gramatica=gramatica, semilla=0, profundidad=3, profundidad_expresion=2,
+                 longitud_expresion=1.0, longitud_identificador=6, longitud_cadena=12,
+                 simbolo_sentencia='statement', bloque='suite', expresion='expression'):
+        self.gramatica = gramatica
+        self.azar = random.Random(semilla)
+        self.profundidad = profundidad
+        self.profundidad_expresion = profundidad_expresion
+        self.continuar = longitud_expresion / (longitud_expresion + 1.0)
+        self.longitud_identificador = longitud_identificador
+        self.longitud_cadena = longitud_cadena
+        self.simbolo_sentencia = simbolo_sentencia
+        self.bloque = bloque
+        self.expresion = expresion
+        # Se descartan las producciones con terminales que el lexer no puede producir (p. ej. "//=")
+        gramatica = {nt: [p for p in prods if all(s in gramatica or self._lexeable(s) for s in p)] for nt, prods in gramatica.items()}
+        self.gramatica = gramatica
+        alcanzan_bloque = _alcanzan(gramatica, bloque) | {bloque}
+        alcanzan_expresion = _alcanzan(gramatica, expresion) | {expresion}
+        # Listas: no terminales con una cola recursiva cuyas demás producciones solo tienen terminales
+        self._listas = {nt for nt, prods in gramatica.items()
+                        if any(p and p[-1] == nt for p in prods)
+                        and all(p and p[-1] == nt or not any(s in gramatica for s in p) for p in prods)}
+        # Producciones permitidas cuando se llegó al límite de anidamiento de bloques o de expresiones
+        self._sin_bloque = {nt: [p for p in prods if not alcanzan_bloque.intersection(p)] for nt, prods in gramatica.items()}
+        self._sin_expresion = {nt: [p for p in prods if not alcanzan_expresion.intersection(p)] for nt, prods in gramatica.items()}
+
+    @staticmethod
+    def _lexeable(terminal):
+        if terminal in ('id', 'tk_entero', 'tk_cadena', 'INDENT', 'DEDENT', 'EOF'):
+            return True
+        tokens = lexico.tokenize(_LEXEMAS.get(terminal, terminal))
+        return len(tokens) == 2 and tokens[0].kind == terminal
+
+    def identificador(self):
+        lexema = "".join(self.azar.choice(_LETRAS) for _ in range(self.longitud_identificador))
+        return lexema + "_" if lexema in lexico.KEYWORDS else lexema
+
+    def lexema(self, terminal):
+        if terminal == 'id':
+            return self.identificador()
+        if terminal == 'tk_entero':
+            return str(self.azar.randint(0, 10 ** 6))
+        if terminal == 'tk_cadena':
+            return '"' + "".join(self.azar.choice(_LETRAS + " ") for _ in range(self.longitud_cadena)) + '"'
+        return _LEXEMAS.get(terminal, terminal)
+
+    def _elegir(self, nt, nivel, nivel_expresion):
+        producciones = self.gramatica[nt]
+        if nivel >= self.profundidad:
+            producciones = self._sin_bloque[nt] or producciones
+        if nivel_expresion >= self.profundidad_expresion:
+            producciones = self._sin_expresion[nt] or producciones
+        if nt in self._listas:
+            colas = [p for p in producciones if p and p[-1] == nt]
+            if colas and self.azar.random() < self.continuar:
+                return self.azar.choice(colas)
+            producciones = [p for p in producciones if not (p and p[-1] == nt)] or producciones
+        return self.azar.choice(producciones)
+
+    def sentencia(self, lineas, nivel=0):
+        """
+        Deriva una sentencia y agrega sus líneas a la lista.
+
+        Parámetros:
+            lineas (list): Lista donde se agregan las líneas generadas (sin salto de línea).
+            nivel (int): Nivel de indentación inicial.
+        """
+        actual = []
+        # Pila de (símbolo, nivel de expresión en el que aparece)
+        pila = [(self.simbolo_sentencia, 0)]
+        while pila:
+            simbolo, nivel_expresion = pila.pop()
+            if simbolo == self.simbolo_sentencia or simbolo in ('INDENT', 'DEDENT'):
+                if actual:
+                    lineas.append("    " * nivel + " ".join(actual))
+                    actual = []
+                nivel += (simbolo == 'INDENT') - (simbolo == 'DEDENT')
+            if simbolo not in self.gramatica:
+                if simbolo not in ('INDENT', 'DEDENT', 'EOF'):
+                    actual.append(self.lexema(simbolo))
+                continue
+            if simbolo == self.expresion:
+                nivel_expresion += 1
+            produccion = self._elegir(simbolo, nivel, nivel_expresion)
+            pila.extend((s, nivel_expresion) for s in reversed(produccion))
+        if actual:
+            lineas.append("    " * nivel + " ".join(actual))
+
+    def programa(self, tamano):
+        """
+        Genera un programa de al menos tamano bytes (UTF-8) formado por sentencias completas.
+
+        Parámetros:
+            tamano (int): Tamaño mínimo del programa en bytes.
+
+        Retorna:
+            str: Código fuente, terminado en salto de línea.
+        """
+        partes = []
+        total = 0
+        while total < tamano:
+            lineas = []
+            self.sentencia(lineas)
+            texto = "\n".join(lineas) + "\n"
+            partes.append(texto)
+            total += len(texto)
+        return "".join(partes)
+
+
+def generar_programa(tamano, semilla=0, **opciones):
+    """Atajo para GeneradorProgramas(semilla=semilla, **opciones).programa(tamano)."""
+    return GeneradorProgramas(semilla=semilla, **opciones).programa(tamano)
+
+
+if __name__ == "__main__":
+    sys.stdout.write(generar_programa(int(sys.argv[1]), int(sys.argv[2]) if len(sys.argv) > 2 else 0))
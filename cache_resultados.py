@@ -0,0 +1,183 @@
+"""
+Caché en disco de resultados de análisis, indexada por el contenido del código fuente.
+
+Cada entrada se identifica por el hash SHA-256 del contenido, la huella de la gramática,
+VERSION_ANALIZADOR y el modo de análisis, así que un archivo que no cambió no se vuelve
+a lexear ni a parsear. Una entrada es un archivo JSON con el resultado y, si se pide,
+los tokens en el formato binario de lexico (<clave>_tokens.bin).
+
+El tamaño total se limita expulsando las entradas usadas hace más tiempo (LRU): cada
+consulta acertada actualiza la fecha de modificación de la entrada, de modo que varios
+procesos pueden compartir el mismo directorio sin un índice común. Cada proceso lleva
+la cuenta de lo que escribe y solo recorre el directorio cuando su cuenta supera el
+máximo, así que con varios procesos el límite puede excederse por poco hasta entonces.
+"""
+import hashlib
+import json
+import os
+import re
+
+import lexico
+from gramatica_compilada import hash_gramatica
+
+#Versión del lexer y el parser; cambiarla invalida los resultados guardados
+VERSION_ANALIZADOR = 1
+
+#Directorio de caché predeterminado, junto a este módulo
+RUTA_CACHE_RESULTADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache_resultados")
+
+_SUFIJO_TOKENS = lexico.EXTENSIONES_TOKENS["binario"]
+
+#Nombres de los archivos de la caché: <clave>.json y <clave>_tokens.bin, o sus temporales
+#(<nombre>.<pid>.tmp). Los demás archivos del directorio no se cuentan ni se borran.
+_NOMBRE_ENTRADA = re.compile(r"([0-9a-f]{64})(\.json|" + re.escape(_SUFIJO_TOKENS) + r")(\.\d+\.tmp)?")
+
+
+class CacheResultados:
+    """
+    Caché de resultados en un directorio, con tamaño acotado y expulsión LRU.
+
+    Parámetros:
+        gramatica (dict): Gramática con la que se analiza; su huella forma parte de la clave.
+        simbolo_inicial (str): Símbolo inicial de la gramática.
+        directorio (str): Directorio donde se guardan las entradas; se crea si no existe.
+        tamano_maximo (int): Bytes máximos que pueden ocupar todas las entradas.
+        guardar_tokens (bool): Si es True, cada entrada guarda también sus tokens.
+    """
+    def __init__(self, gramatica, simbolo_inicial, directorio=RUTA_CACHE_RESULTADOS, tamano_maximo=64 << 20, guardar_tokens=False):
+        self.directorio = directorio
+        self.tamano_maximo = tamano_maximo
+        self.guardar_tokens = guardar_tokens
+        self.huella = hash_gramatica(gramatica, simbolo_inicial)
+        self.aciertos = 0
+        self.fallos = 0
+        os.makedirs(directorio, exist_ok=True)
+        # Un tamaño máximo menor que el de una ejecución anterior se aplica desde el inicio
+        self._total = self._recortar()
+
+    def clave(self, contenido, modo=""):
+        """
+        Calcula la clave de un código fuente.
+
+        Parámetros:
+            contenido (bytes): Contenido del archivo fuente.
+            modo (str): Opciones que cambian el resultado (por ejemplo "recuperar").
+
+        Retorna:
+            str: Hash SHA-256 en hexadecimal.
+        """
+        fuente = hashlib.sha256(contenido).hexdigest()
+        return hashlib.sha256(f"{fuente}:{self.huella}:{VERSION_ANALIZADOR}:{modo}".encode("utf-8")).hexdigest()
+
+    def _ruta(self, clave, sufijo=".json"):
+        return os.path.join(self.directorio, clave + sufijo)
+
+    def obtener(self, clave):
+        """
+        Devuelve el resultado guardado para una clave, o None si no está.
+
+        Un acierto marca la entrada como usada recientemente.
+        """
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, "r", encoding="utf-8") as archivo:
+                resultado = json.load(archivo)
+            os.utime(ruta)
+        except (OSError, ValueError):
+            self.fallos += 1
+            return None
+        self.aciertos += 1
+        return resultado
+
+    def tokens(self, clave):
+        """Devuelve los tokens guardados para una clave (lexico.TokensCodificados), o None."""
+        try:
+            return lexico.leer_tokens_binario(self._ruta(clave, _SUFIJO_TOKENS))
+        except (OSError, ValueError):
+            return None
+
+    def guardar(self, clave, resultado, tokens=None):
+        """
+        Guarda el resultado de una clave y, si hay que guardar tokens, sus tokens.
+
+        Parámetros:
+            clave (str): Clave calculada con clave().
+            resultado (dict): Resultado serializable en JSON.
+            tokens: Tokens del análisis; se ignoran si guardar_tokens es False.
+        """
+        sufijo_temporal = f".{os.getpid()}.tmp"
+        try:
+            if self.guardar_tokens and tokens is not None:
+                ruta = self._ruta(clave, _SUFIJO_TOKENS)
+                lexico.escribir_tokens_binario(tokens, ruta + sufijo_temporal)
+                self._reemplazar(ruta + sufijo_temporal, ruta)
+            # El JSON se escribe al final: la entrada solo existe cuando está completa
+            ruta = self._ruta(clave)
+            with open(ruta + sufijo_temporal, "w", encoding="utf-8") as archivo:
+                json.dump(resultado, archivo, ensure_ascii=False)
+            self._reemplazar(ruta + sufijo_temporal, ruta)
+        except OSError:
+            return
+        if self._total > self.tamano_maximo:
+            self._total = self._recortar()
+
+    def _reemplazar(self, temporal, ruta):
+        """Mueve un archivo temporal a su ruta, descontando del total el archivo que reemplaza."""
+        tamano = os.path.getsize(temporal)
+        try:
+            tamano -= os.path.getsize(ruta)
+        except OSError:
+            pass
+        os.replace(temporal, ruta)
+        self._total += tamano
+
+    def _archivos(self):
+        """Devuelve (nombre, clave, sufijo, temporal) de cada archivo del directorio que es de la caché."""
+        try:
+            nombres = os.listdir(self.directorio)
+        except OSError:
+            return []
+        archivos = []
+        for nombre in nombres:
+            coincidencia = _NOMBRE_ENTRADA.fullmatch(nombre)
+            if coincidencia is not None:
+                clave, sufijo, temporal = coincidencia.groups()
+                archivos.append((nombre, clave, sufijo, temporal is not None))
+        return archivos
+
+    def _recortar(self):
+        """Expulsa las entradas menos usadas hasta respetar el máximo y devuelve el tamaño total."""
+        entradas = {}
+        total = 0
+        for nombre, clave, sufijo, temporal in self._archivos():
+            if temporal:
+                continue
+            try:
+                info = os.stat(os.path.join(self.directorio, nombre))
+            except OSError:
+                continue
+            tamano, fecha = entradas.get(clave, (0, 0))
+            # La fecha de uso es la del JSON, que es el que se actualiza en cada acierto
+            entradas[clave] = (tamano + info.st_size, info.st_mtime if sufijo == ".json" else fecha)
+            total += info.st_size
+        if total <= self.tamano_maximo:
+            return total
+        for clave, (tamano, _) in sorted(entradas.items(), key=lambda entrada: entrada[1][1]):
+            for sufijo in (".json", _SUFIJO_TOKENS):
+                try:
+                    os.remove(self._ruta(clave, sufijo))
+                except OSError:
+                    pass
+            total -= tamano
+            if total <= self.tamano_maximo:
+                break
+        return total
+
+    def limpiar(self):
+        """Borra todas las entradas (y los temporales que hayan quedado); no toca otros archivos."""
+        for nombre, _, _, _ in self._archivos():
+            try:
+                os.remove(os.path.join(self.directorio, nombre))
+            except OSError:
+                pass
+        self._total = 0
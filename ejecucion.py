@@ -0,0 +1,753 @@
+"""
+Ejecución de programas aceptados, compilados a clausuras de Python.
+
+El árbol que construye ASDRArbol se recorre una sola vez y cada nodo se traduce a una
+función anidada que recibe el marco de variables: una expresión devuelve su valor y una
+sentencia devuelve None, o _RETORNO si ejecutó un 'return'. Recorrer el árbol (y decidir
+qué hacer con cada nodo) solo se paga al compilar; al ejecutar, un bucle cuesta una
+llamada por sentencia y por operación.
+
+Los nombres también se resuelven al compilar, con las reglas de Python: las variables
+asignadas dentro de una función (parámetros, asignaciones, variables de un 'for' y
+funciones definidas en ella) son locales y el resto son globales. Cada nombre recibe una
+posición fija en un arreglo: el marco de una función es una lista del tamaño de sus
+locales (más una posición para el valor de retorno) y las globales son otra lista,
+compartida por todo el programa. Leer una variable es indexar una lista, sin diccionarios.
+
+Las expresiones se compilan por la forma del árbol (operando seguido de una cola de
+operador y operando), así que también se ejecutan los programas de la gramática que
+genera precedencia.gramatica_con_operadores, con todos los operadores de lexico.OPERATORS.
+
+Uso:
+    python ejecucion.py ARCHIVO [--motor regex] [--operadores]
+"""
+import argparse
+import ast
+import operator
+import sys
+import time
+
+import lexico
+from parser import ASDRArbol, gramatica
+
+#Operadores binarios, de comparación y prefijos, con la semántica de Python
+OPERACIONES = {
+    'tk_suma': operator.add, 'tk_resta': operator.sub, 'tk_mult': operator.mul,
+    'tk_div': operator.truediv, 'tk_div_entera': operator.floordiv, 'tk_mod': operator.mod,
+    'tk_pot': operator.pow, 'tk_and_bin': operator.and_, 'tk_or_bin': operator.or_,
+    'tk_xor_bin': operator.xor, 'tk_despl_izq': operator.lshift, 'tk_despl_der': operator.rshift,
+    'tk_igual': operator.eq, 'tk_dif': operator.ne, 'tk_menor': operator.lt,
+    'tk_mayor': operator.gt, 'tk_menor_igual': operator.le, 'tk_mayor_igual': operator.ge,
+}
+PREFIJOS = {'tk_resta': operator.neg, 'tk_suma': operator.pos, 'tk_not_bin': operator.invert}
+
+#Asignaciones compuestas: x += e usa la operación en el lugar, como en Python (extiende listas)
+ASIGNACIONES = {
+    'tk_suma_asig': operator.iadd, 'tk_resta_asig': operator.isub, 'tk_mult_asig': operator.imul,
+    'tk_div_asig': operator.itruediv, 'tk_div_ent_asig': operator.ifloordiv, 'tk_mod_asig': operator.imod,
+    'tk_pot_asig': operator.ipow, 'tk_and_bin_asig': operator.iand, 'tk_or_bin_asig': operator.ior,
+    'tk_xor_bin_asig': operator.ixor, 'tk_despl_izq_asig': operator.ilshift,
+    'tk_despl_der_asig': operator.irshift,
+}
+
+#Funciones de Python disponibles como globales; solo las que el lexer reconoce como 'id'
+NATIVAS = {funcion.__name__: funcion for funcion in (
+    len, str, repr, min, max, sorted, reversed, enumerate, zip, map, iter, next,
+    any, all, chr, ord, type,
+) if funcion.__name__ not in lexico.KEYWORDS}
+
+#Límites del plegado de constantes, los de CPython: si el resultado pasaría de estos bits
+#(enteros) o de este largo (cadenas), la operación se deja para la ejecución
+MAX_BITS_PLEGADO = 128
+MAX_LARGO_PLEGADO = 4096
+
+#Valor de una posición del marco todavía no asignada
+_SIN_VALOR = object()
+#Lo que devuelve una sentencia que ejecutó 'return'; el valor queda en el marco
+_RETORNO = object()
+
+
+class ErrorEjecucion(Exception):
+    """Construcción aceptada por la gramática que no se puede ejecutar (como 'return' fuera de una función)."""
+    def __init__(self, mensaje, token=None):
+        if token is not None:
+            mensaje = f"<{token.row},{token.col}> Error de ejecución: {mensaje}"
+        super().__init__(mensaje)
+        self.row = token.row if token is not None else None
+        self.col = token.col if token is not None else None
+
+
+class _Valor:
+    """Expresión compilada: su función y, si se conocen al compilar, su valor constante o su posición en el marco."""
+    __slots__ = ("funcion", "constante", "posicion", "sin_valor")
+
+    def __init__(self, funcion, constante=(), posicion=None, sin_valor=None):
+        self.funcion = funcion
+        self.constante = constante
+        self.posicion = posicion
+        self.sin_valor = sin_valor
+
+
+def _constante(valor):
+    return _Valor(lambda m: valor, (valor,))
+
+
+def _hijos(nodo):
+    return list(nodo.hijos())
+
+
+class _Ambito:
+    """
+    Nombres de una función (o del nivel superior) con su posición en el marco.
+
+    En una función las posiciones se fijan antes de compilar su cuerpo; en el nivel
+    superior el marco es el de las globales, que crece con cada nombre nuevo.
+    """
+    def __init__(self, posiciones, funcion=None, padre=None):
+        self.posiciones = posiciones
+        self.funcion = funcion
+        self.padre = padre
+
+
+class Programa:
+    """
+    Programa compilado a clausuras, listo para ejecutarse las veces que se quiera.
+
+    Atributos:
+        globales (dict): Nombre de cada variable global y su posición en el marco global.
+        salida: Archivo donde escribe print (por defecto, sys.stdout al momento de ejecutar).
+    """
+    def __init__(self, arbol):
+        self.globales = {}
+        self.salida = None
+        self._marco = []
+        self._cuerpo = None
+        raiz = _Ambito(self.globales)
+        sentencias = []
+        nodo = arbol.raiz()
+        while True:
+            hijos = _hijos(nodo)
+            if len(hijos) < 2:
+                break
+            sentencias.append(self._sentencia(hijos[0], raiz))
+            nodo = hijos[1]
+        self._cuerpo = self._bloque(sentencias)[0]
+        self._inicial = [NATIVAS.get(nombre, _SIN_VALOR) for nombre in self.globales]
+
+    def ejecutar(self, salida=None):
+        """
+        Ejecuta el programa desde el comienzo, con todas las globales sin asignar.
+
+        Parámetros:
+            salida: Archivo donde escribe print; por defecto, sys.stdout.
+
+        Retorna:
+            dict: Valor final de cada variable global asignada.
+        """
+        self.salida = salida
+        marco = self._marco
+        marco[:] = self._inicial
+        self._cuerpo(marco)
+        return {nombre: marco[i] for nombre, i in self.globales.items()
+                if marco[i] is not _SIN_VALOR and marco[i] is not NATIVAS.get(nombre)}
+
+    # ------------------------------------------------------------------ nombres
+
+    def _resolver(self, nombre, token, ambito):
+        """Devuelve (marco global, o None si el nombre está en el marco propio; posición; si es local de una función)."""
+        if nombre in ambito.posiciones:
+            local = ambito.funcion is not None
+            return None, ambito.posiciones[nombre], local
+        padre = ambito.padre
+        while padre is not None and padre.funcion is not None:
+            if nombre in padre.posiciones:
+                raise ErrorEjecucion(f"la función “{ambito.funcion}” usa “{nombre}”, variable local de "
+                                     f"“{padre.funcion}”; las clausuras no están soportadas", token)
+            padre = padre.padre
+        posicion = self.globales.setdefault(nombre, len(self.globales))
+        # En el nivel superior el marco propio es el global
+        return (None if ambito.funcion is None else self._marco), posicion, False
+
+    def _cargar(self, nombre, token, ambito):
+        marco_global, i, local = self._resolver(nombre, token, ambito)
+        sin_valor = _sin_valor(nombre, token, local)
+        if marco_global is None:
+            def cargar(m):
+                v = m[i]
+                if v is _SIN_VALOR:
+                    sin_valor()
+                return v
+            return _Valor(cargar, posicion=i, sin_valor=sin_valor)
+
+        def cargar_global(m):
+            v = marco_global[i]
+            if v is _SIN_VALOR:
+                sin_valor()
+            return v
+        return _Valor(cargar_global)
+
+    def _asignar(self, nombre, token, ambito, valor, operacion=None):
+        """Compila la asignación (simple o compuesta) de valor a nombre."""
+        marco_global, i, local = self._resolver(nombre, token, ambito)
+        e = valor.funcion
+        if operacion is None:
+            if marco_global is None:
+                if valor.constante:
+                    c = valor.constante[0]
+
+                    def asignar_constante(m):
+                        m[i] = c
+                    return asignar_constante
+
+                def asignar(m):
+                    m[i] = e(m)
+                return asignar
+
+            def asignar_global(m):
+                marco_global[i] = e(m)
+            return asignar_global
+
+        sin_valor = _sin_valor(nombre, token, local)
+        if marco_global is None:
+            if valor.constante:
+                c = valor.constante[0]
+
+                def actualizar_constante(m):
+                    v = m[i]
+                    if v is _SIN_VALOR:
+                        sin_valor()
+                    m[i] = operacion(v, c)
+                return actualizar_constante
+
+            def actualizar(m):
+                v = m[i]
+                if v is _SIN_VALOR:
+                    sin_valor()
+                m[i] = operacion(v, e(m))
+            return actualizar
+
+        def actualizar_global(m):
+            v = marco_global[i]
+            if v is _SIN_VALOR:
+                sin_valor()
+            marco_global[i] = operacion(v, e(m))
+        return actualizar_global
+
+    # ------------------------------------------------------------------ sentencias
+
+    def _bloque(self, sentencias):
+        """Une sentencias compiladas (función, puede_retornar) en una sola."""
+        if len(sentencias) == 1:
+            return sentencias[0]
+        funciones = tuple(funcion for funcion, _ in sentencias)
+        if not any(retorna for _, retorna in sentencias):
+            if len(funciones) == 2:
+                primera, segunda = funciones
+
+                def par(m):
+                    primera(m)
+                    segunda(m)
+                return par, False
+
+            def bloque(m):
+                for f in funciones:
+                    f(m)
+            return bloque, False
+
+        def bloque_con_retorno(m):
+            for f in funciones:
+                if f(m) is not None:
+                    return _RETORNO
+        return bloque_con_retorno, True
+
+    def _suite(self, nodo, ambito):
+        # suite -> INDENT statement suite_cont; suite_cont -> statement suite_cont | DEDENT
+        hijos = _hijos(nodo)
+        sentencias = [self._sentencia(hijos[1], ambito)]
+        nodo = hijos[2]
+        while True:
+            hijos = _hijos(nodo)
+            if len(hijos) < 2:
+                return self._bloque(sentencias)
+            sentencias.append(self._sentencia(hijos[0], ambito))
+            nodo = hijos[1]
+
+    def _sentencia(self, nodo, ambito):
+        """Compila un 'statement'; retorna (función, puede_retornar)."""
+        hijos = _hijos(nodo)
+        tipo = hijos[0].nombre
+        if tipo == 'id':
+            return self._sentencia_id(hijos[0].token, hijos[1], ambito), False
+        if tipo == 'if_statement':
+            return self._si(_hijos(hijos[0]), ambito)
+        if tipo == 'while':
+            return self._mientras(hijos, ambito)
+        if tipo == 'for':
+            return self._para(hijos, ambito)
+        if tipo == 'def':
+            return self._definir(hijos, ambito), False
+        if tipo == 'return':
+            if ambito.funcion is None:
+                raise ErrorEjecucion("“return” fuera de una función", hijos[0].token)
+            e = self._expresion(hijos[1], ambito).funcion
+            retorno = len(ambito.posiciones)
+
+            def retornar(m):
+                m[retorno] = e(m)
+                return _RETORNO
+            return retornar, True
+        if tipo == 'print':
+            e = self._expresion(hijos[2], ambito).funcion
+
+            def imprimir(m):
+                print(e(m), file=self.salida)
+            return imprimir, False
+
+        def pasar(m):
+            pass
+        return pasar, False
+
+    def _sentencia_id(self, token, despues, ambito):
+        # statement_after_id -> asig | llamada
+        hijo = _hijos(despues)[0]
+        if hijo.nombre == 'asig':
+            operador, expresion = _hijos(hijo)
+            valor = self._expresion(expresion, ambito)
+            return self._asignar(token.value, token, ambito, valor, ASIGNACIONES.get(operador.nombre))
+        e = self._sufijos(self._cargar(token.value, token, ambito), hijo, ambito).funcion
+
+        def evaluar(m):
+            e(m)
+        return evaluar
+
+    def _si(self, hijos, ambito):
+        # if comparison : suite else_part; else_part -> elif comparison : suite else_part | else : suite | ε
+        ramas = []
+        retorna = False
+        while hijos:
+            if hijos[0].nombre == 'else':
+                cuerpo, r = self._suite(hijos[2], ambito)
+                ramas.append((None, cuerpo))
+                retorna = retorna or r
+                break
+            condicion = self._expresion(hijos[1], ambito).funcion
+            cuerpo, r = self._suite(hijos[3], ambito)
+            ramas.append((condicion, cuerpo))
+            retorna = retorna or r
+            hijos = _hijos(hijos[4])
+        if len(ramas) == 1:
+            (c, a), = ramas
+
+            def si(m):
+                if c(m):
+                    return a(m)
+            return si, retorna
+        if len(ramas) == 2 and ramas[1][0] is None:
+            (c, a), (_, b) = ramas
+
+            def si_no(m):
+                if c(m):
+                    return a(m)
+                return b(m)
+            return si_no, retorna
+        ramas = tuple(ramas)
+
+        def si_cadena(m):
+            for c, cuerpo in ramas:
+                if c is None or c(m):
+                    return cuerpo(m)
+        return si_cadena, retorna
+
+    def _mientras(self, hijos, ambito):
+        # while comparison : suite
+        c = self._expresion(hijos[1], ambito).funcion
+        cuerpo, retorna = self._suite(hijos[3], ambito)
+        if not retorna:
+            def mientras(m):
+                while c(m):
+                    cuerpo(m)
+            return mientras, False
+
+        def mientras_con_retorno(m):
+            while c(m):
+                if cuerpo(m) is not None:
+                    return _RETORNO
+        return mientras_con_retorno, True
+
+    def _para(self, hijos, ambito):
+        # for id in range ( argument_list ) : suite
+        token = hijos[1].token
+        argumentos = self._argumentos(hijos[5], ambito)
+        destino, i, _ = self._resolver(token.value, token, ambito)
+        cuerpo, retorna = self._suite(hijos[8], ambito)
+        if len(argumentos) == 1 and argumentos[0].constante:
+            fin = argumentos[0].constante[0]
+
+            def limites(m):
+                return range(fin)
+        else:
+            funciones = tuple(valor.funcion for valor in argumentos)
+
+            def limites(m):
+                return range(*[f(m) for f in funciones])
+        if not retorna:
+            def para(m):
+                marco = m if destino is None else destino
+                for v in limites(m):
+                    marco[i] = v
+                    cuerpo(m)
+            return para, False
+
+        def para_con_retorno(m):
+            marco = m if destino is None else destino
+            for v in limites(m):
+                marco[i] = v
+                if cuerpo(m) is not None:
+                    return _RETORNO
+        return para_con_retorno, True
+
+    def _definir(self, hijos, ambito):
+        # def id ( param_list ) : suite
+        token = hijos[1].token
+        nombre = token.value
+        parametros = []
+        nodo = hijos[3]
+        while True:
+            # param_list -> id param_list_cont | ε; param_list_cont -> , id param_list_cont | ε
+            partes = _hijos(nodo)
+            if not partes:
+                break
+            identificador = partes[0] if partes[0].nombre == 'id' else partes[1]
+            if identificador.token.value in parametros:
+                raise ErrorEjecucion(f"parámetro “{identificador.token.value}” repetido", identificador.token)
+            parametros.append(identificador.token.value)
+            nodo = partes[-1]
+        posiciones = {nombre_local: i for i, nombre_local in enumerate(parametros)}
+        for nombre_local in _asignados(hijos[6]):
+            posiciones.setdefault(nombre_local, len(posiciones))
+        propio = _Ambito(posiciones, nombre, ambito)
+        cuerpo, _ = self._suite(hijos[6], propio)
+        funcion = _crear_funcion(nombre, parametros, len(posiciones), cuerpo)
+        return self._asignar(nombre, token, ambito, _constante(funcion))
+
+    # ------------------------------------------------------------------ expresiones
+
+    def _expresion(self, nodo, ambito):
+        """
+        Compila una expresión (o 'comparison') por la forma de su árbol.
+
+        Un no terminal con dos hijos cuyo segundo es una cola (nombre terminado en ')
+        es una cadena de operadores asociativos por la izquierda; cualquier otro es un
+        operando, un prefijo o un no terminal que envuelve a uno de ellos.
+        """
+        hijos = _hijos(nodo)
+        if nodo.nombre == 'comparison':
+            operador = _hijos(hijos[1])[0].nombre
+            return _binaria(OPERACIONES[operador], self._expresion(hijos[0], ambito), self._expresion(hijos[2], ambito))
+        if len(hijos) == 2 and hijos[1].nombre.endswith("'") and not hijos[0].es_terminal:
+            valor = self._expresion(hijos[0], ambito)
+            cola = _hijos(hijos[1])
+            while cola:
+                valor = _binaria(OPERACIONES[cola[0].nombre], valor, self._expresion(cola[1], ambito))
+                cola = _hijos(cola[2]) if len(cola) > 2 else ()
+            return valor
+        primero = hijos[0]
+        tipo = primero.nombre
+        if not primero.es_terminal:
+            return self._expresion(primero, ambito) if tipo != 'list_literal' else self._lista(primero, ambito)
+        if len(hijos) == 2 and tipo in PREFIJOS:
+            return _prefija(PREFIJOS[tipo], self._expresion(hijos[1], ambito))
+        if tipo == 'id':
+            return self._sufijos(self._cargar(primero.token.value, primero.token, ambito), hijos[1], ambito)
+        if tipo == 'tk_entero':
+            return _constante(int(primero.token.value))
+        if tipo == 'tk_cadena':
+            return _constante(_cadena(primero.token.value))
+        # ( expression )
+        return self._expresion(hijos[1], ambito)
+
+    def _lista(self, nodo, ambito):
+        # list_literal -> [ optional_expression_list ]
+        elementos = [valor.funcion for valor in self._lista_expresiones(_hijos(nodo)[1], ambito)]
+        if not elementos:
+            return _Valor(lambda m: [])
+        elementos = tuple(elementos)
+        return _Valor(lambda m: [f(m) for f in elementos])
+
+    def _lista_expresiones(self, nodo, ambito):
+        # optional_expression_list / argument_list: expresiones separadas por comas, o ε
+        valores = []
+        hijos = _hijos(nodo)
+        if hijos and hijos[0].nombre == 'expression_list':
+            hijos = _hijos(hijos[0])
+        while hijos:
+            k = 1 if hijos[0].nombre == 'tk_coma' else 0
+            valores.append(self._expresion(hijos[k], ambito))
+            hijos = _hijos(hijos[k + 1])
+        return valores
+
+    _argumentos = _lista_expresiones
+
+    def _sufijos(self, valor, nodo, ambito):
+        """Aplica a valor los accesos .nombre y las llamadas (...) de una 'llamada'."""
+        while True:
+            # llamada -> ( argument_list ) | . func_call | ε; func_call -> id llamada | ( argument_list ) llamada
+            hijos = _hijos(nodo)
+            if not hijos:
+                return valor
+            if hijos[0].nombre == 'tk_par_izq':
+                return _llamar(valor, self._argumentos(hijos[1], ambito))
+            partes = _hijos(hijos[1])
+            if partes[0].nombre == 'id':
+                valor = _atributo(valor, partes[0].token.value)
+                nodo = partes[1]
+            else:
+                valor = _llamar(valor, self._argumentos(partes[1], ambito))
+                nodo = partes[3]
+
+
+def _asignados(suite):
+    """Nombres asignados en un cuerpo de función, sin entrar en las funciones que define."""
+    nombres = []
+    pendientes = [suite]
+    while pendientes:
+        nodo = pendientes.pop()
+        hijos = _hijos(nodo)
+        if nodo.nombre == 'statement':
+            tipo = hijos[0].nombre
+            if tipo == 'id' and _hijos(hijos[1])[0].nombre == 'asig':
+                nombres.append(hijos[0].token.value)
+            elif tipo in ('for', 'def'):
+                nombres.append(hijos[1].token.value)
+            if tipo == 'def':
+                continue
+        pendientes.extend(reversed([hijo for hijo in hijos if not hijo.es_terminal]))
+    return nombres
+
+
+def _sin_valor(nombre, token, local):
+    """Función que lanza el error de leer nombre antes de asignarlo."""
+    if local:
+        mensaje = f"<{token.row},{token.col}> Error de ejecución: variable local “{nombre}” usada antes de asignarla"
+        error = UnboundLocalError
+    else:
+        mensaje = f"<{token.row},{token.col}> Error de ejecución: nombre “{nombre}” no definido"
+        error = NameError
+
+    def sin_valor():
+        raise error(mensaje)
+    return sin_valor
+
+
+def _cadena(lexema):
+    try:
+        return ast.literal_eval(lexema)
+    except (ValueError, SyntaxError):
+        return lexema[1:-1]
+
+
+def _crear_funcion(nombre, parametros, locales, cuerpo):
+    """
+    Función de Python que crea el marco de una llamada y ejecuta cuerpo.
+
+    Hasta tres parámetros la función los recibe por nombre (la cantidad de argumentos la
+    verifica Python, con los nombres del programa en el mensaje), y el marco se arma sin
+    empaquetar una tupla.
+    """
+    aridad = len(parametros)
+    relleno = [_SIN_VALOR] * (locales - aridad + 1)
+    retorno = locales
+    if aridad == 0:
+        def funcion():
+            marco = relleno.copy()
+            if cuerpo(marco) is not None:
+                return marco[retorno]
+    elif aridad == 1:
+        def funcion(a):
+            marco = [a, *relleno]
+            if cuerpo(marco) is not None:
+                return marco[retorno]
+    elif aridad == 2:
+        def funcion(a, b):
+            marco = [a, b, *relleno]
+            if cuerpo(marco) is not None:
+                return marco[retorno]
+    elif aridad == 3:
+        def funcion(a, b, c):
+            marco = [a, b, c, *relleno]
+            if cuerpo(marco) is not None:
+                return marco[retorno]
+    else:
+        def funcion(*argumentos):
+            if len(argumentos) != aridad:
+                raise TypeError(f"{nombre}() takes {aridad} positional arguments but {len(argumentos)} were given")
+            marco = [*argumentos, *relleno]
+            if cuerpo(marco) is not None:
+                return marco[retorno]
+    codigo = funcion.__code__
+    if aridad <= 3 and 'marco' not in parametros:
+        funcion.__code__ = codigo.replace(co_varnames=(*parametros, *codigo.co_varnames[aridad:]))
+    funcion.__name__ = funcion.__qualname__ = nombre
+    return funcion
+
+
+def _plegable(operacion, a, b):
+    """Indica si operacion(a, b) es barata de calcular al compilar, estimando el tamaño del resultado."""
+    enteros = isinstance(a, int) and isinstance(b, int)
+    if operacion is operator.pow:
+        return not enteros or b <= 0 or a.bit_length() * b <= MAX_BITS_PLEGADO
+    if operacion is operator.mul:
+        if enteros:
+            return a.bit_length() + b.bit_length() <= MAX_BITS_PLEGADO
+        if isinstance(a, str) and isinstance(b, int):
+            return len(a) * b <= MAX_LARGO_PLEGADO
+        if isinstance(b, str) and isinstance(a, int):
+            return len(b) * a <= MAX_LARGO_PLEGADO
+        return True
+    if operacion is operator.lshift:
+        return not enteros or b < 0 or a.bit_length() + b <= MAX_BITS_PLEGADO
+    # El formato con % puede pedir un ancho arbitrario ('%0999999999d' % 1)
+    return not (operacion is operator.mod and isinstance(a, str))
+
+
+def _binaria(operacion, izquierda, derecha):
+    """Compila una operación binaria, especializada si un operando es constante o una variable del marco."""
+    if izquierda.constante and derecha.constante and _plegable(operacion, izquierda.constante[0], derecha.constante[0]):
+        try:
+            return _constante(operacion(izquierda.constante[0], derecha.constante[0]))
+        except Exception:
+            # El error (como 1 / 0) se lanza al ejecutar, igual que en Python
+            pass
+    a, b = izquierda.funcion, derecha.funcion
+    if izquierda.posicion is not None:
+        i, sin_valor = izquierda.posicion, izquierda.sin_valor
+        if derecha.constante:
+            c = derecha.constante[0]
+
+            def variable_constante(m):
+                v = m[i]
+                if v is _SIN_VALOR:
+                    sin_valor()
+                return operacion(v, c)
+            return _Valor(variable_constante)
+
+        def variable_expresion(m):
+            v = m[i]
+            if v is _SIN_VALOR:
+                sin_valor()
+            return operacion(v, b(m))
+        return _Valor(variable_expresion)
+    if derecha.constante:
+        c = derecha.constante[0]
+        return _Valor(lambda m: operacion(a(m), c))
+    if izquierda.constante:
+        c = izquierda.constante[0]
+        return _Valor(lambda m: operacion(c, b(m)))
+    return _Valor(lambda m: operacion(a(m), b(m)))
+
+
+def _prefija(operacion, operando):
+    if operando.constante:
+        try:
+            return _constante(operacion(operando.constante[0]))
+        except Exception:
+            pass
+    a = operando.funcion
+    return _Valor(lambda m: operacion(a(m)))
+
+
+def _atributo(valor, nombre):
+    a = valor.funcion
+    return _Valor(lambda m: getattr(a(m), nombre))
+
+
+def _llamar(valor, argumentos):
+    f = valor.funcion
+    funciones = tuple(argumento.funcion for argumento in argumentos)
+    if not funciones:
+        return _Valor(lambda m: f(m)())
+    if len(funciones) == 1:
+        a, = funciones
+        return _Valor(lambda m: f(m)(a(m)))
+    if len(funciones) == 2:
+        a, b = funciones
+        return _Valor(lambda m: f(m)(a(m), b(m)))
+    return _Valor(lambda m: f(m)(*[g(m) for g in funciones]))
+
+
+def compilar(source, motor="regex", operadores=False):
+    """
+    Analiza un código fuente y lo compila a clausuras.
+
+    Parámetros:
+        source (str): Código fuente del programa.
+        motor (str): Motor del lexer (ver lexico.MOTORES).
+        operadores (bool): Si es True, se analiza con precedencia.gramatica_con_operadores,
+            que acepta todos los operadores de lexico.OPERATORS.
+
+    Retorna:
+        Programa: El programa compilado.
+
+    Lanza:
+        SyntaxError: Si el programa tiene errores léxicos o no es aceptado por la gramática.
+        ErrorEjecucion: Si usa una construcción que no se puede ejecutar.
+    """
+    errores = []
+    tokens = lexico.tokenize(source, motor, errores)
+    if errores:
+        raise SyntaxError(errores[0].mensaje)
+    if operadores:
+        from precedencia import gramatica_con_operadores
+        parser = ASDRArbol(gramatica_con_operadores(gramatica), 'program', tokens=tokens)
+    else:
+        parser = ASDRArbol(gramatica, 'program', tokens=tokens)
+    parser.parse()
+    return Programa(parser.arbol)
+
+
+def ejecutar(source, salida=None, motor="regex", operadores=False):
+    """
+    Compila y ejecuta un código fuente.
+
+    Parámetros:
+        source (str): Código fuente del programa.
+        salida: Archivo donde escribe print; por defecto, sys.stdout.
+        motor (str): Motor del lexer (ver lexico.MOTORES).
+        operadores (bool): Si es True, se aceptan todos los operadores de lexico.OPERATORS.
+
+    Retorna:
+        dict: Valor final de cada variable global asignada.
+    """
+    return compilar(source, motor, operadores).ejecutar(salida)
+
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description="Ejecuta un programa aceptado por el parser, compilado a clausuras.")
+    argumentos.add_argument("archivo", help="archivo a ejecutar")
+    argumentos.add_argument("--motor", choices=sorted(lexico.MOTORES), default="regex", help="motor del lexer")
+    argumentos.add_argument("--operadores", action="store_true", help="aceptar todos los operadores de lexico.OPERATORS")
+    argumentos.add_argument("--tiempos", action="store_true", help="mostrar el tiempo de compilación y de ejecución")
+    opciones = argumentos.parse_args(argv)
+
+    try:
+        with open(opciones.archivo, "r", encoding="utf-8") as f:
+            source = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"Error al leer el archivo: {e}")
+        return 2
+    inicio = time.perf_counter()
+    try:
+        programa = compilar(source, opciones.motor, opciones.operadores)
+    except (SyntaxError, ErrorEjecucion) as e:
+        print(f"❌ {opciones.archivo}: {e}")
+        return 1
+    compilado = time.perf_counter()
+    programa.ejecutar()
+    if opciones.tiempos:
+        fin = time.perf_counter()
+        print(f"compilación: {compilado - inicio:.3f} s, ejecución: {fin - compilado:.3f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""
+Generación de un parser descendente recursivo especializado para una gramática.
+
+ASDR interpreta la gramática en cada paso: recorre las producciones de un no terminal,
+pregunta si cada símbolo es terminal y llama a las funciones a través de un diccionario.
+Este módulo escribe, a partir de las predicciones de una GramaticaCompilada, un módulo
+de Python con una función por no terminal en la que todo eso ya está resuelto:
+
+    - la producción se elige con if sobre el tipo del token actual (comparación directa
+      si la predicción tiene un solo token, o pertenencia a un frozenset);
+    - los terminales se consumen en línea, sin comprobar los que la propia elección
+      ya garantiza;
+    - las alternativas que solo difieren en su primer terminal (por ejemplo las de
+      'asig') se unen en una sola rama;
+    - las producciones que terminan en el mismo no terminal se convierten en un ciclo.
+
+El módulo generado lleva la huella de la gramática y se vuelve a generar cuando no
+coincide. Los errores se informan con coincidir y _error_prediccion del parser, así
+que los mensajes son los mismos que los de ASDR.
+"""
+import importlib.util
+import os
+import re
+import types
+
+VERSION_GENERADOR = 1
+RUTA_GENERADO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "_parser_generado.py")
+
+
+def nombre_funcion(nt):
+    """Devuelve el nombre de la función generada para un no terminal."""
+    return "parse_" + re.sub(r"\W", lambda m: "_prima" if m.group() == "'" else f"_{ord(m.group()):x}", nt)
+
+
+class _Emisor:
+    def __init__(self):
+        self.lineas = []
+        self.constantes = {}
+
+    def linea(self, nivel, texto):
+        self.lineas.append("    " * nivel + texto)
+
+    def conjunto(self, tokens):
+        clave = frozenset(tokens)
+        if clave not in self.constantes:
+            self.constantes[clave] = f"_C{len(self.constantes)}"
+        return self.constantes[clave]
+
+    def condicion(self, tokens):
+        if len(tokens) == 1:
+            return f"k == {next(iter(tokens))!r}"
+        return f"k in {self.conjunto(tokens)}"
+
+
+def _ramas(compilada, nt):
+    """
+    Agrupa las producciones de nt en ramas (tokens que la eligen, terminal inicial ya
+    verificado o None, resto de la producción), respetando que gana la primera producción.
+    """
+    ramas = []
+    vistos = set()
+    for produccion, pred in compilada.predicciones[nt]:
+        efectivos = set(pred) - vistos
+        vistos |= set(pred)
+        if not efectivos:
+            continue
+        cuerpo = [s for s in produccion if s != '[]']
+        if cuerpo and compilada.es_terminal(cuerpo[0]) and efectivos <= {cuerpo[0]}:
+            resto = tuple(cuerpo[1:])
+            for rama in ramas:
+                if rama[1] is not None and rama[2] == resto:
+                    rama[0] |= efectivos
+                    break
+            else:
+                ramas.append([efectivos, cuerpo[0], resto])
+        else:
+            ramas.append([efectivos, None, tuple(cuerpo)])
+    return ramas
+
+
+def _emitir_funcion(emisor, compilada, nt):
+    ramas = _ramas(compilada, nt)
+    ciclo = any(resto and resto[-1] == nt for _, _, resto in ramas)
+    esperados = set()
+    for _, pred in compilada.predicciones[nt]:
+        esperados.update(pred)
+
+    emisor.linea(0, f"def {nombre_funcion(nt)}(p):")
+    emisor.linea(1, "flujo = p.flujo")
+    emisor.linea(1, "avanzar = flujo.avanzar")
+    nivel = 1
+    if ciclo:
+        emisor.linea(1, "while True:")
+        nivel = 2
+    emisor.linea(nivel, "k = flujo.actual.kind")
+    for tokens, inicial, resto in ramas:
+        emisor.linea(nivel, f"if {emisor.condicion(tokens)}:")
+        if inicial is not None:
+            emisor.linea(nivel + 1, "avanzar()")
+            emisor.linea(nivel + 1, "p.pos += 1")
+        continua = bool(resto) and resto[-1] == nt
+        for s in (resto[:-1] if continua else resto):
+            if compilada.es_terminal(s):
+                emisor.linea(nivel + 1, f"if flujo.actual.kind != {s!r}:")
+                emisor.linea(nivel + 2, f"p.coincidir({s!r})")
+                emisor.linea(nivel + 1, "avanzar()")
+                emisor.linea(nivel + 1, "p.pos += 1")
+            else:
+                emisor.linea(nivel + 1, f"{nombre_funcion(s)}(p)")
+        emisor.linea(nivel + 1, "continue" if continua else "return")
+    emisor.linea(nivel, f"raise p._error_prediccion(flujo.actual, {emisor.conjunto(esperados)})")
+    emisor.lineas += ["", ""]
+
+
+def generar_codigo(compilada):
+    """
+    Genera el código fuente del parser especializado.
+
+    Parámetros:
+        compilada (GramaticaCompilada): Gramática compilada.
+
+    Retorna:
+        str: Código de un módulo con una función parse_<nt> por no terminal y el
+        diccionario FUNCIONES (no terminal -> función), compatible con ASDR.funciones.
+    """
+    emisor = _Emisor()
+    for nt in compilada.gramatica:
+        _emitir_funcion(emisor, compilada, nt)
+
+    cabecera = [
+        '"""Parser generado por generar_parser.py a partir de la gramática; no editar."""',
+        "",
+        f"VERSION_GENERADOR = {VERSION_GENERADOR}",
+        f"HUELLA = {compilada.huella!r}",
+        "",
+    ]
+    for tokens, nombre in emisor.constantes.items():
+        cabecera.append(f"{nombre} = frozenset({sorted(tokens)!r})")
+    cabecera += ["", ""]
+    funciones = ", ".join(f"{nt!r}: {nombre_funcion(nt)}" for nt in compilada.gramatica)
+    return "\n".join(cabecera + emisor.lineas + [f"FUNCIONES = {{{funciones}}}", ""])
+
+
+def _vigente(ruta, huella):
+    try:
+        with open(ruta, encoding="utf-8") as archivo:
+            cabecera = [archivo.readline() for _ in range(4)]
+    except OSError:
+        return False
+    return f"VERSION_GENERADOR = {VERSION_GENERADOR}\n" in cabecera and f"HUELLA = {huella!r}\n" in cabecera
+
+
+def _escribir(ruta, codigo):
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        with open(temporal, "w", encoding="utf-8") as archivo:
+            archivo.write(codigo)
+        os.replace(temporal, ruta)
+        return True
+    except OSError:
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+        return False
+
+
+def _importar(ruta, huella):
+    spec = importlib.util.spec_from_file_location(f"_parser_generado_{huella[:16]}", ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def cargar_parser_generado(compilada, ruta=RUTA_GENERADO):
+    """
+    Devuelve el módulo del parser especializado, generándolo si hace falta.
+
+    Si el archivo en ruta fue generado para la misma gramática se importa tal cual; si
+    no existe o su huella es otra, se vuelve a generar. Si no se puede escribir, el
+    módulo se compila solo en memoria. El resultado se guarda en la gramática compilada.
+
+    Parámetros:
+        compilada (GramaticaCompilada): Gramática compilada.
+        ruta (str): Archivo del módulo generado, o None para no usar el disco.
+
+    Retorna:
+        module: Módulo con FUNCIONES, HUELLA y las funciones parse_<nt>.
+    """
+    modulo = compilada.funciones.get("generado")
+    if modulo is not None:
+        return modulo
+    huella = compilada.huella
+    if ruta and (_vigente(ruta, huella) or _escribir(ruta, generar_codigo(compilada))):
+        modulo = _importar(ruta, huella)
+        if modulo.HUELLA != huella:
+            modulo = None
+    if modulo is None:
+        modulo = types.ModuleType(f"_parser_generado_{huella[:16]}")
+        exec(compile(generar_codigo(compilada), ruta or "<parser generado>", "exec"), modulo.__dict__)
+    compilada.funciones["generado"] = modulo
+    return modulo
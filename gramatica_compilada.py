@@ -0,0 +1,482 @@
+import hashlib
+import json
+import os
+import pickle
+from collections import defaultdict
+
+#Versión del formato de GramaticaCompilada; cambiarla invalida las cachés en disco
+VERSION_CACHE = 1
+
+#Archivo de caché predeterminado, junto a este módulo
+RUTA_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".gramatica_compilada.pickle")
+
+_compiladas = {}
+
+
+def es_terminal(gramatica, simbolo):
+    return simbolo not in gramatica and simbolo != '[]'
+
+
+def calcular_primeros(gramatica):
+    primeros = defaultdict(set)
+    cambiado = True
+    while cambiado:
+        cambiado = False
+        for nt, producciones in gramatica.items():
+            for prod in producciones:
+                if prod == []:
+                    if 'ε' not in primeros[nt]:
+                        primeros[nt].add('ε')
+                        cambiado = True
+                    continue
+                i = 0
+                bloque_deriva_epsilon = True
+                while i < len(prod) and bloque_deriva_epsilon:
+                    simbolo = prod[i]
+                    bloque_deriva_epsilon = False
+                    if es_terminal(gramatica, simbolo):
+                        if simbolo not in primeros[nt]:
+                            primeros[nt].add(simbolo)
+                            cambiado = True
+                        break
+                    else:
+                        antes = len(primeros[nt])
+                        primeros[nt].update(primeros[simbolo] - {'ε'})
+                        if len(primeros[nt]) > antes:
+                            cambiado = True
+                        if 'ε' in primeros[simbolo]:
+                            bloque_deriva_epsilon = True
+                            i += 1
+                        else:
+                            break
+                if i == len(prod) and bloque_deriva_epsilon:
+                    if 'ε' not in primeros[nt]:
+                        primeros[nt].add('ε')
+                        cambiado = True
+    return primeros
+
+
+def calcular_siguientes(gramatica, simbolo_inicial, primeros):
+    siguientes = defaultdict(set)
+    cambiado = True
+    siguientes[simbolo_inicial].add('EOF')
+    while cambiado:
+        cambiado = False
+        for nt, producciones in gramatica.items():
+            for prod in producciones:
+                len_prod = len(prod)
+                for i, simbolo_actual in enumerate(prod):
+                    if simbolo_actual in gramatica:
+                        siguientes_en_prod = set()
+                        j = i + 1
+                        puede_derivar_epsilon_cola = True
+                        while j < len_prod and puede_derivar_epsilon_cola:
+                            siguiente_simbolo = prod[j]
+                            puede_derivar_epsilon_cola = False
+                            if es_terminal(gramatica, siguiente_simbolo):
+                                if siguiente_simbolo not in siguientes_en_prod:
+                                    siguientes_en_prod.add(siguiente_simbolo)
+                                break
+                            else:
+                                antes = len(siguientes_en_prod)
+                                siguientes_en_prod.update(primeros[siguiente_simbolo] - {'ε'})
+                                if len(siguientes_en_prod) > antes:
+                                     pass
+                                if 'ε' in primeros[siguiente_simbolo]:
+                                    puede_derivar_epsilon_cola = True
+                                    j += 1
+                                else:
+                                    break
+                        antes = len(siguientes[simbolo_actual])
+                        siguientes[simbolo_actual].update(siguientes_en_prod)
+                        if len(siguientes[simbolo_actual]) > antes:
+                            cambiado = True
+                        if j == len_prod and puede_derivar_epsilon_cola:
+                            antes = len(siguientes[simbolo_actual])
+                            siguientes[simbolo_actual].update(siguientes[nt])
+                            if len(siguientes[simbolo_actual]) > antes:
+                                cambiado = True
+    return siguientes
+
+
+def calcular_anulables(gramatica):
+    """
+    Calcula los no terminales que derivan ε con una lista de trabajo.
+
+    Cada producción lleva la cuenta de los símbolos que aún no se sabe si son anulables;
+    cuando un no terminal se vuelve anulable solo se revisan las producciones donde aparece.
+
+    Parámetros:
+        gramatica (dict): Diccionario no terminal -> lista de producciones.
+
+    Retorna:
+        set: No terminales anulables.
+    """
+    anulables = set()
+    pendiente = []
+    faltan = []
+    apariciones = defaultdict(list)
+    for nt, producciones in gramatica.items():
+        for prod in producciones:
+            indice = len(faltan)
+            faltan.append(len(prod))
+            for simbolo in prod:
+                if simbolo in gramatica:
+                    apariciones[simbolo].append((indice, nt))
+            if not prod and nt not in anulables:
+                anulables.add(nt)
+                pendiente.append(nt)
+    while pendiente:
+        simbolo = pendiente.pop()
+        for indice, nt in apariciones[simbolo]:
+            faltan[indice] -= 1
+            if faltan[indice] == 0 and nt not in anulables:
+                anulables.add(nt)
+                pendiente.append(nt)
+    return anulables
+
+
+def _propagar(conjuntos, aristas, iniciales):
+    """
+    Propaga conjuntos por un grafo de inclusión (origen ⊆ destino) con una lista de trabajo.
+
+    Solo se envían los elementos nuevos de cada nodo (su delta), de modo que cada
+    elemento recorre cada arista como máximo una vez.
+    """
+    delta = {nodo: set(elementos) for nodo, elementos in iniciales.items() if elementos}
+    pendiente = list(delta)
+    while pendiente:
+        nodo = pendiente.pop()
+        nuevos = delta.pop(nodo)
+        for destino in aristas.get(nodo, ()):
+            agregados = nuevos - conjuntos[destino]
+            if agregados:
+                conjuntos[destino] |= agregados
+                if destino in delta:
+                    delta[destino] |= agregados
+                else:
+                    delta[destino] = agregados
+                    pendiente.append(destino)
+
+
+def calcular_primeros_worklist(gramatica, anulables=None):
+    """
+    Calcula PRIMEROS con un grafo de dependencias entre no terminales.
+
+    Da el mismo resultado que calcular_primeros (incluido 'ε' para los anulables), pero
+    recorre cada producción una sola vez y luego solo revisita los no terminales afectados.
+
+    Parámetros:
+        gramatica (dict): Diccionario no terminal -> lista de producciones.
+        anulables (set): No terminales anulables, si ya se calcularon.
+
+    Retorna:
+        dict: Conjunto PRIMEROS de cada no terminal.
+    """
+    if anulables is None:
+        anulables = calcular_anulables(gramatica)
+    primeros = defaultdict(set, {nt: set() for nt in gramatica})
+    aristas = defaultdict(set)
+    for nt, producciones in gramatica.items():
+        for prod in producciones:
+            for simbolo in prod:
+                if simbolo in gramatica:
+                    aristas[simbolo].add(nt)
+                    if simbolo not in anulables:
+                        break
+                else:
+                    if es_terminal(gramatica, simbolo):
+                        primeros[nt].add(simbolo)
+                    break
+    _propagar(primeros, aristas, {nt: set(conjunto) for nt, conjunto in primeros.items()})
+    for nt in anulables:
+        primeros[nt].add('ε')
+    return primeros
+
+
+def calcular_siguientes_worklist(gramatica, simbolo_inicial, primeros, anulables=None):
+    """
+    Calcula SIGUIENTES con un grafo de dependencias entre no terminales.
+
+    Da el mismo resultado que calcular_siguientes: los aportes de PRIMEROS se agregan
+    en una sola pasada y las inclusiones SIGUIENTES(A) ⊆ SIGUIENTES(B) se propagan
+    con una lista de trabajo.
+
+    Parámetros:
+        gramatica (dict): Diccionario no terminal -> lista de producciones.
+        simbolo_inicial (str): Símbolo inicial de la gramática.
+        primeros (dict): Conjunto PRIMEROS de cada no terminal.
+        anulables (set): No terminales anulables, si ya se calcularon.
+
+    Retorna:
+        dict: Conjunto SIGUIENTES de cada no terminal.
+    """
+    if anulables is None:
+        anulables = {nt for nt, conjunto in primeros.items() if 'ε' in conjunto}
+    siguientes = defaultdict(set, {nt: set() for nt in gramatica})
+    siguientes[simbolo_inicial].add('EOF')
+    aristas = defaultdict(set)
+    for nt, producciones in gramatica.items():
+        for prod in producciones:
+            # Se recorre la producción de derecha a izquierda acumulando PRIMEROS de la cola
+            cola = set()
+            cola_anulable = True
+            for simbolo in reversed(prod):
+                if simbolo in gramatica:
+                    siguientes[simbolo] |= cola
+                    if cola_anulable:
+                        aristas[nt].add(simbolo)
+                    if simbolo in anulables:
+                        cola |= primeros[simbolo]
+                        cola.discard('ε')
+                    else:
+                        cola = primeros[simbolo] - {'ε'}
+                        cola_anulable = False
+                else:
+                    cola = {simbolo} if es_terminal(gramatica, simbolo) else set()
+                    cola_anulable = False
+    _propagar(siguientes, aristas, {nt: set(conjunto) for nt, conjunto in siguientes.items()})
+    return siguientes
+
+
+def calcular_predicciones(gramatica, primeros, siguientes):
+    predicciones = defaultdict(list)
+    for nt, producciones in gramatica.items():
+        for prod in producciones:
+            pred = set()
+            if prod == []:
+                pred.update(siguientes[nt])
+            else:
+                i = 0
+                deriva_epsilon_prefijo = True
+                while i < len(prod) and deriva_epsilon_prefijo:
+                    simbolo = prod[i]
+                    deriva_epsilon_prefijo = False
+                    if es_terminal(gramatica, simbolo):
+                        if simbolo not in pred:
+                            pred.add(simbolo)
+                        break
+                    else:
+                        pred.update(primeros[simbolo] - {'ε'})
+                        if 'ε' in primeros[simbolo]:
+                            deriva_epsilon_prefijo = True
+                            i += 1
+                        else:
+                            break
+                if i == len(prod) and deriva_epsilon_prefijo:
+                    pred.update(siguientes[nt])
+            predicciones[nt].append((prod, pred))
+    return predicciones
+
+
+def conflictos_ll1(predicciones):
+    """
+    Busca los conflictos LL(1): terminales predichos por más de una producción del mismo no terminal.
+
+    Parámetros:
+        predicciones (dict): Lista de (producción, conjunto de predicción) de cada no terminal.
+
+    Retorna:
+        dict: No terminal -> {terminal: índices de las producciones que lo predicen}, solo
+        con los no terminales y terminales en conflicto; vacío si la gramática es LL(1).
+    """
+    conflictos = {}
+    for nt, lista in predicciones.items():
+        por_terminal = defaultdict(list)
+        for i, (_, pred) in enumerate(lista):
+            for terminal in pred:
+                por_terminal[terminal].append(i)
+        en_conflicto = {terminal: indices for terminal, indices in sorted(por_terminal.items()) if len(indices) > 1}
+        if en_conflicto:
+            conflictos[nt] = en_conflicto
+    return conflictos
+
+
+class TablaLL1:
+    """
+    Tabla de análisis LL(1) densa construida a partir de las predicciones de la gramática.
+
+    Los símbolos se internan como enteros: los terminales usan códigos >= 0 y los
+    no terminales códigos negativos (-1 - índice). La entrada (no terminal, terminal)
+    de la tabla guarda el índice de la producción a aplicar o -1 si no hay ninguna.
+    Si varias producciones predicen el mismo terminal se conserva la primera, igual
+    que hace ASDR al recorrer las predicciones en orden.
+    """
+    def __init__(self, gramatica, simbolo_inicial, predicciones):
+        self.no_terminales = list(gramatica)
+        indice_nt = {nt: i for i, nt in enumerate(self.no_terminales)}
+        terminales = []
+        self.id_terminal = {}
+        def internar(simbolo):
+            if simbolo in indice_nt:
+                return -1 - indice_nt[simbolo]
+            if simbolo not in self.id_terminal:
+                self.id_terminal[simbolo] = len(terminales)
+                terminales.append(simbolo)
+            return self.id_terminal[simbolo]
+        for nt in self.no_terminales:
+            for produccion, pred in predicciones[nt]:
+                for simbolo in produccion:
+                    internar(simbolo)
+                for terminal in sorted(pred):
+                    internar(terminal)
+        self.terminales = terminales
+        # Columna extra para tipos de token que la gramática no conoce
+        self.desconocido = len(terminales)
+        self.ancho = len(terminales) + 1
+        self.inicial = internar(simbolo_inicial)
+        self.producciones = []
+        self.cuerpos = []
+        self.entradas = [-1] * (len(self.no_terminales) * self.ancho)
+        for i, nt in enumerate(self.no_terminales):
+            for produccion, pred in predicciones[nt]:
+                id_prod = len(self.producciones)
+                self.producciones.append((nt, produccion))
+                self.cuerpos.append(tuple(internar(s) for s in reversed(produccion)))
+                for terminal in pred:
+                    celda = i * self.ancho + self.id_terminal[terminal]
+                    if self.entradas[celda] < 0:
+                        self.entradas[celda] = id_prod
+
+    def traducir(self, tipos):
+        """
+        Devuelve una lista que traduce códigos de tipo de token a códigos de terminal.
+
+        Parámetros:
+            tipos (list): Tipo de token de cada código (por ejemplo lexico.TIPOS_TOKEN).
+
+        Retorna:
+            list: Código de terminal de cada tipo, o desconocido si la gramática no lo usa.
+        """
+        return [self.id_terminal.get(tipo, self.desconocido) for tipo in tipos]
+
+    def id_simbolo(self, simbolo):
+        """Devuelve el código entero de un símbolo (terminal >= 0, no terminal < 0)."""
+        if simbolo in self.id_terminal:
+            return self.id_terminal[simbolo]
+        return -1 - self.no_terminales.index(simbolo)
+
+
+class GramaticaCompilada:
+    """
+    Resultado del análisis de una gramática: PRIMEROS, SIGUIENTES, predicciones y tabla LL(1).
+
+    Se calcula una sola vez por gramática y se comparte entre todas las instancias de
+    ASDR que la usan, por lo que sus conjuntos no deben modificarse.
+
+    Atributos:
+        gramatica (dict): Gramática analizada.
+        inicial (str): Símbolo inicial.
+        huella (str): Hash de la gramática y el símbolo inicial (ver hash_gramatica).
+        primeros (dict): Conjunto PRIMEROS de cada no terminal.
+        siguientes (dict): Conjunto SIGUIENTES de cada no terminal.
+        predicciones (dict): Lista de (producción, conjunto de predicción) de cada no terminal.
+        tabla (TablaLL1): Tabla de análisis LL(1).
+        funciones (dict): Funciones de análisis generadas por el parser, por modo; no se guardan en disco.
+    """
+    def __init__(self, gramatica, simbolo_inicial, huella=None, algoritmo="worklist"):
+        self.gramatica = gramatica
+        self.inicial = simbolo_inicial
+        self.huella = huella or hash_gramatica(gramatica, simbolo_inicial)
+        if algoritmo == "worklist":
+            anulables = calcular_anulables(gramatica)
+            primeros = calcular_primeros_worklist(gramatica, anulables)
+            siguientes = calcular_siguientes_worklist(gramatica, simbolo_inicial, primeros, anulables)
+        elif algoritmo == "punto_fijo":
+            primeros = calcular_primeros(gramatica)
+            siguientes = calcular_siguientes(gramatica, simbolo_inicial, primeros)
+        else:
+            raise ValueError(f"Algoritmo desconocido: {algoritmo}")
+        predicciones = calcular_predicciones(gramatica, primeros, siguientes)
+        self.primeros = {nt: primeros.get(nt, set()) for nt in gramatica}
+        self.siguientes = {nt: siguientes.get(nt, set()) for nt in gramatica}
+        self.predicciones = dict(predicciones)
+        self.tabla = TablaLL1(gramatica, simbolo_inicial, self.predicciones)
+        self.funciones = {}
+
+    def es_terminal(self, simbolo):
+        return es_terminal(self.gramatica, simbolo)
+
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        estado["funciones"] = {}
+        return estado
+
+
+def hash_gramatica(gramatica, simbolo_inicial):
+    """
+    Calcula una huella estable de la gramática, que identifica su análisis en las cachés.
+
+    Parámetros:
+        gramatica (dict): Diccionario no terminal -> lista de producciones.
+        simbolo_inicial (str): Símbolo inicial de la gramática.
+
+    Retorna:
+        str: Hash SHA-256 en hexadecimal.
+    """
+    contenido = json.dumps([VERSION_CACHE, simbolo_inicial, list(gramatica.items())], ensure_ascii=False)
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+
+def _leer_cache(ruta, huella):
+    try:
+        with open(ruta, "rb") as archivo:
+            compilada = pickle.load(archivo)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if isinstance(compilada, GramaticaCompilada) and compilada.huella == huella:
+        return compilada
+    return None
+
+
+def _escribir_cache(ruta, compilada):
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        with open(temporal, "wb") as archivo:
+            pickle.dump(compilada, archivo, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, ruta)
+    except OSError:
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+
+
+def compilar_gramatica(gramatica, simbolo_inicial, ruta_cache=None):
+    """
+    Devuelve el análisis de una gramática, reutilizándolo si ya se calculó.
+
+    El resultado se memoriza en el proceso por la huella de la gramática. Si se indica
+    ruta_cache, además se intenta cargar de ese archivo antes de calcularlo y se guarda
+    en él después, de modo que un proceso nuevo no tenga que recalcular los conjuntos.
+
+    Parámetros:
+        gramatica (dict): Diccionario no terminal -> lista de producciones.
+        simbolo_inicial (str): Símbolo inicial de la gramática.
+        ruta_cache (str): Archivo de caché en disco (por ejemplo RUTA_CACHE), o None para no usarlo.
+
+    Retorna:
+        GramaticaCompilada: Análisis compartido de la gramática.
+    """
+    huella = hash_gramatica(gramatica, simbolo_inicial)
+    compilada = _compiladas.get(huella)
+    if compilada is not None:
+        return compilada
+    if ruta_cache:
+        compilada = _leer_cache(ruta_cache, huella)
+    if compilada is None:
+        compilada = GramaticaCompilada(gramatica, simbolo_inicial, huella)
+        if ruta_cache:
+            _escribir_cache(ruta_cache, compilada)
+    _compiladas[huella] = compilada
+    return compilada
+
+
+def registrar(compilada):
+    """
+    Agrega a la memoria del proceso una gramática compilada en otro proceso.
+
+    Parámetros:
+        compilada (GramaticaCompilada): Análisis ya calculado (por ejemplo, recibido por un trabajador).
+    """
+    _compiladas[compilada.huella] = compilada
@@ -0,0 +1,541 @@
+"""
+Análisis incremental de un documento que se edita (por ejemplo, desde un editor).
+
+El documento guarda, por cada línea, sus tokens y el estado del lexer al terminarla,
+y divide el programa en bloques de sentencias de nivel superior: un bloque empieza
+en una línea sin indentación cuyo primer token puede iniciar un 'statement'. Al
+aplicar una edición solo se vuelven a lexear las líneas tocadas (y las siguientes
+hasta que la pila de indentación coincide con la anterior) y solo se vuelven a
+parsear los bloques que las contienen; el resto de los resultados se reutiliza.
+
+Las líneas se guardan en trozos de unas LINEAS_POR_TROZO líneas, y cuatro árboles de
+Fenwick acumulan por trozo la cantidad de líneas, de caracteres, de inicios de bloque
+y de bloques pendientes de parsear. Un bloque no se guarda como un número de línea
+sino como una marca en su primera línea (con el estado de su análisis), así que las
+líneas y bloques que siguen a una edición no se renumeran: ubicar una línea o un
+desplazamiento y desplazar todo lo que sigue cuesta O(log n), y el trabajo de una
+edición depende de su tamaño (y del de los bloques que toca), no del del documento.
+
+Cada bloque se parsea por separado con ASDRTabla como un 'program' terminado por un
+EOF centinela. Si el error de un bloque cae justo en el centinela, la sentencia
+continúa en la línea siguiente y el bloque se une con el siguiente antes de volver
+a parsearlo. Como en la gramática ningún token que inicia una sentencia puede
+continuar una sentencia ya completa, el resultado es el mismo que el de parse_source
+sobre el texto completo.
+"""
+from bisect import bisect_right
+from itertools import accumulate
+from typing import NamedTuple, Optional
+
+import lexico
+from gramatica_compilada import compilar_gramatica
+from parser import ASDRTabla, ResultadoAnalisis, gramatica
+
+#Líneas por trozo: un trozo se divide al pasar del doble y se une a un vecino al bajar de la mitad
+LINEAS_POR_TROZO = 256
+
+
+class _Linea(NamedTuple):
+    tokens: tuple
+    pila: tuple
+    detenido: bool
+    fin: Optional[tuple]
+    con_errores: bool
+    corte: int
+
+
+_ESTADO_INICIAL = ((0,), False)
+
+#Estado de una línea que no empieza un bloque; las que lo empiezan guardan None
+#(pendiente), True (aceptado) o False (rechazado)
+_INTERIOR = object()
+
+
+class _Fenwick:
+    """Sumas de prefijos de una lista de enteros, con actualización y búsqueda en O(log n)."""
+    __slots__ = ("arbol", "n", "alto")
+
+    def __init__(self, valores):
+        arbol = [0, *valores]
+        n = len(arbol) - 1
+        for i in range(1, n + 1):
+            j = i + (i & -i)
+            if j <= n:
+                arbol[j] += arbol[i]
+        self.arbol = arbol
+        self.n = n
+        self.alto = 1 << (n.bit_length() - 1) if n else 0
+
+    def sumar(self, i, delta):
+        arbol, n = self.arbol, self.n
+        i += 1
+        while i <= n:
+            arbol[i] += delta
+            i += i & -i
+
+    def prefijo(self, i):
+        """Suma de los primeros i valores."""
+        arbol = self.arbol
+        suma = 0
+        while i > 0:
+            suma += arbol[i]
+            i -= i & -i
+        return suma
+
+    def buscar(self, valor):
+        """Devuelve (i, resto): el menor i cuyo prefijo hasta i inclusive supera valor, y valor menos el prefijo anterior."""
+        arbol, n = self.arbol, self.n
+        i = 0
+        paso = self.alto
+        while paso:
+            siguiente = i + paso
+            if siguiente <= n and arbol[siguiente] <= valor:
+                i = siguiente
+                valor -= arbol[siguiente]
+            paso >>= 1
+        return i, valor
+
+
+class _Trozo:
+    """Líneas consecutivas del documento con su análisis y el estado de los bloques que empiezan en ellas."""
+    __slots__ = ("lineas", "info", "estados", "caracteres", "inicios", "pendientes")
+
+    def __init__(self, lineas, info, estados):
+        self.lineas = lineas
+        self.info = info
+        self.estados = estados
+        self.contar()
+
+    def contar(self):
+        estados = self.estados
+        self.caracteres = sum(map(len, self.lineas))
+        self.inicios = len(estados) - estados.count(_INTERIOR)
+        self.pendientes = estados.count(None) + estados.count(False)
+
+    def totales(self):
+        return len(self.lineas), self.caracteres, self.inicios, self.pendientes
+
+
+def _pendiente(estado):
+    return estado is None or estado is False
+
+
+class DocumentoIncremental:
+    """
+    Documento que se mantiene analizado a medida que recibe ediciones.
+
+    Los saltos de línea \\r\\n y \\r se guardan como \\n (lexico.normalizar_saltos): los
+    desplazamientos de editar se cuentan sobre texto, no sobre el texto original.
+
+    Parámetros:
+        source (str): Texto inicial del documento.
+        motor (str): Motor del lexer (ver lexico.MOTORES).
+    """
+    def __init__(self, source="", motor="regex"):
+        self._escanear = lexico.MOTORES[motor]
+        self.compilada = compilar_gramatica(gramatica, 'program')
+        self._arranques = self.compilada.primeros['statement'] - {'ε'}
+        lineas = list(lexico.lineas_de_texto(source))
+        info = []
+        estado = _ESTADO_INICIAL
+        for linea in lineas:
+            datos = self._analizar_linea(linea, estado)
+            info.append(datos)
+            estado = (datos.pila, datos.detenido)
+        estados = [None if i == 0 or datos.corte >= 0 else _INTERIOR for i, datos in enumerate(info)]
+        self._n = len(lineas)
+        self._trozos = [_Trozo(lineas[i:i + LINEAS_POR_TROZO], info[i:i + LINEAS_POR_TROZO], estados[i:i + LINEAS_POR_TROZO])
+                        for i in range(0, len(lineas), LINEAS_POR_TROZO)] or [_Trozo([], [], [])]
+        self._reconstruir()
+        self._primer_pendiente = 0
+
+    @property
+    def texto(self):
+        return "".join(linea for trozo in self._trozos for linea in trozo.lineas)
+
+    def __len__(self):
+        """Cantidad de líneas del documento."""
+        return self._n
+
+    # ------------------------------------------------------------------ trozos
+
+    def _reconstruir(self):
+        """Vuelve a calcular los árboles de Fenwick después de cambiar la cantidad de trozos."""
+        totales = list(zip(*(trozo.totales() for trozo in self._trozos)))
+        self._f_lineas, self._f_caracteres, self._f_inicios, self._f_pendientes = map(_Fenwick, totales)
+
+    def _actualizar(self, c, antes):
+        """Aplica a los árboles la diferencia entre los totales antes y ahora del trozo c."""
+        ahora = self._trozos[c].totales()
+        for arbol, viejo, nuevo in zip((self._f_lineas, self._f_caracteres, self._f_inicios, self._f_pendientes), antes, ahora):
+            if nuevo != viejo:
+                arbol.sumar(c, nuevo - viejo)
+
+    def _ubicar(self, i):
+        """Devuelve (trozo, posición en el trozo) de la línea i, que debe existir."""
+        return self._f_lineas.buscar(i)
+
+    def _info(self, i):
+        c, j = self._ubicar(i)
+        return self._trozos[c].info[j]
+
+    def _linea(self, i):
+        c, j = self._ubicar(i)
+        return self._trozos[c].lineas[j]
+
+    def _recorrer(self, inicio, fin):
+        """Genera (línea, info) de las líneas inicio a fin - 1."""
+        if inicio >= fin:
+            return
+        c, j = self._ubicar(inicio)
+        restantes = fin - inicio
+        trozos = self._trozos
+        while restantes > 0:
+            trozo = trozos[c]
+            hasta = min(len(trozo.lineas), j + restantes)
+            yield from zip(trozo.lineas[j:hasta], trozo.info[j:hasta])
+            restantes -= hasta - j
+            c += 1
+            j = 0
+
+    def _reemplazar(self, inicio, fin, lineas, info):
+        """Reemplaza las líneas inicio a fin - 1 por lineas (sin marcas de bloque), redistribuyendo los trozos tocados."""
+        trozos = self._trozos
+        n = self._n
+        if inicio < n:
+            c, ja = self._ubicar(inicio)
+        else:
+            c = len(trozos) - 1
+            ja = len(trozos[c].lineas)
+        if fin < n and fin > inicio:
+            d, jb = self._ubicar(fin)
+        elif fin > inicio:
+            d = len(trozos) - 1
+            jb = len(trozos[d].lineas)
+        else:
+            d, jb = c, ja
+        primero, ultimo = trozos[c], trozos[d]
+        nuevas = primero.lineas[:ja] + lineas + ultimo.lineas[jb:]
+        nuevas_info = primero.info[:ja] + info + ultimo.info[jb:]
+        nuevos_estados = primero.estados[:ja] + [_INTERIOR] * len(lineas) + ultimo.estados[jb:]
+        self._n = n + len(lineas) - (fin - inicio)
+
+        m = d - c + 1
+        total = len(nuevas)
+        minimo = LINEAS_POR_TROZO // 2
+        if minimo * m <= total <= 2 * LINEAS_POR_TROZO * m:
+            # La misma cantidad de trozos: solo se actualizan sus totales
+            antes = [trozos[x].totales() for x in range(c, d + 1)]
+            for x, trozo in enumerate(self._repartir(nuevas, nuevas_info, nuevos_estados, m)):
+                trozos[c + x] = trozo
+                self._actualizar(c + x, antes[x])
+            return
+        if total < minimo * m and len(trozos) > m:
+            # Un trozo muy chico absorbe a un vecino, para que la cantidad de trozos siga a la de líneas
+            if d + 1 < len(trozos):
+                d += 1
+                vecino = trozos[d]
+                nuevas, nuevas_info, nuevos_estados = nuevas + vecino.lineas, nuevas_info + vecino.info, nuevos_estados + vecino.estados
+            else:
+                c -= 1
+                vecino = trozos[c]
+                nuevas, nuevas_info, nuevos_estados = vecino.lineas + nuevas, vecino.info + nuevas_info, vecino.estados + nuevos_estados
+        cantidad = max(1, -(-len(nuevas) // LINEAS_POR_TROZO))
+        trozos[c:d + 1] = self._repartir(nuevas, nuevas_info, nuevos_estados, cantidad)
+        self._reconstruir()
+
+    @staticmethod
+    def _repartir(lineas, info, estados, cantidad):
+        """Divide líneas en cantidad trozos de tamaño parecido."""
+        base, sobrantes = divmod(len(lineas), cantidad)
+        trozos = []
+        inicio = 0
+        for x in range(cantidad):
+            fin = inicio + base + (x < sobrantes)
+            trozos.append(_Trozo(lineas[inicio:fin], info[inicio:fin], estados[inicio:fin]))
+            inicio = fin
+        return trozos
+
+    # ------------------------------------------------------------------ bloques
+
+    def _estado(self, i):
+        c, j = self._ubicar(i)
+        return self._trozos[c].estados[j]
+
+    def _fijar_estado(self, i, estado):
+        c, j = self._ubicar(i)
+        trozo = self._trozos[c]
+        antes = trozo.totales()
+        viejo = trozo.estados[j]
+        trozo.estados[j] = estado
+        trozo.inicios += (estado is not _INTERIOR) - (viejo is not _INTERIOR)
+        trozo.pendientes += _pendiente(estado) - _pendiente(viejo)
+        self._actualizar(c, antes)
+
+    def _marcar_bloques(self, inicio, fin):
+        """Vuelve a dividir en bloques pendientes las líneas inicio a fin - 1; inicio siempre empieza uno."""
+        if inicio >= fin:
+            return
+        c, j = self._ubicar(inicio)
+        i = inicio
+        trozos = self._trozos
+        while i < fin:
+            trozo = trozos[c]
+            antes = trozo.totales()
+            hasta = min(len(trozo.lineas), j + fin - i)
+            trozo.estados[j:hasta] = [None if i + k == inicio or datos.corte >= 0 else _INTERIOR
+                                      for k, datos in enumerate(trozo.info[j:hasta])]
+            trozo.contar()
+            self._actualizar(c, antes)
+            i += hasta - j
+            c += 1
+            j = 0
+
+    def _siguiente(self, i, arbol, es_buscada):
+        """Primera línea desde i cuya marca cumple es_buscada, usando arbol para saltar los trozos sin ninguna; o n."""
+        if i >= self._n:
+            return self._n
+        trozos = self._trozos
+        c, j = self._ubicar(i)
+        estados = trozos[c].estados
+        for k in range(j, len(estados)):
+            if es_buscada(estados[k]):
+                return i + k - j
+        anteriores = arbol.prefijo(c + 1)
+        if anteriores == arbol.prefijo(len(trozos)):
+            return self._n
+        d, _ = arbol.buscar(anteriores)
+        estados = trozos[d].estados
+        for k in range(len(estados)):
+            if es_buscada(estados[k]):
+                return self._f_lineas.prefijo(d) + k
+        raise AssertionError("árbol de Fenwick desactualizado")
+
+    def _siguiente_inicio(self, i):
+        return self._siguiente(i, self._f_inicios, lambda estado: estado is not _INTERIOR)
+
+    def _inicio_anterior(self, i):
+        """Línea donde empieza el bloque que contiene a la línea i."""
+        if self._n == 0:
+            return 0
+        i = min(i, self._n - 1)
+        c, j = self._ubicar(i)
+        estados = self._trozos[c].estados
+        for k in range(j, -1, -1):
+            if estados[k] is not _INTERIOR:
+                return i - (j - k)
+        anteriores = self._f_inicios.prefijo(c)
+        if anteriores == 0:
+            return 0
+        d, _ = self._f_inicios.buscar(anteriores - 1)
+        estados = self._trozos[d].estados
+        for k in range(len(estados) - 1, -1, -1):
+            if estados[k] is not _INTERIOR:
+                return self._f_lineas.prefijo(d) + k
+        raise AssertionError("árbol de Fenwick desactualizado")
+
+    # ------------------------------------------------------------------ edición
+
+    def _analizar_linea(self, linea, estado):
+        pila, detenido = estado
+        if detenido:
+            return _Linea((), pila, True, None, False, -1)
+        lex = lexico.EstadoLexer()
+        lex.row = 0
+        lex.indent_stack = list(pila)
+        tokens = []
+        self._escanear(linea, lex, tokens)
+        corte = -1
+        for k, token in enumerate(tokens):
+            if token.kind != "DEDENT":
+                if token.col == 1 and token.kind in self._arranques:
+                    corte = k
+                break
+        return _Linea(tuple(tokens), tuple(lex.indent_stack), lex.detenido, (lex.row, lex.col), bool(lex.errores), corte)
+
+    def _estado_antes(self, i):
+        if i == 0:
+            return _ESTADO_INICIAL
+        info = self._info(i - 1)
+        return (info.pila, info.detenido)
+
+    def _posicion(self, offset):
+        """Convierte un desplazamiento en caracteres en (línea, columna), con índices desde 0."""
+        n = self._n
+        if n == 0:
+            return 0, 0
+        total = self._f_caracteres.prefijo(len(self._trozos))
+        if offset >= total:
+            ultima = self._linea(n - 1)
+            if ultima.endswith("\n") or offset > total:
+                return n, 0
+            return n - 1, len(ultima)
+        c, resto = self._f_caracteres.buscar(offset)
+        finales = list(accumulate(map(len, self._trozos[c].lineas)))
+        j = bisect_right(finales, resto)
+        return self._f_lineas.prefijo(c) + j, resto - (finales[j - 1] if j else 0)
+
+    def editar(self, offset, eliminados, insertado):
+        """
+        Aplica una edición de texto y actualiza el análisis.
+
+        Parámetros:
+            offset (int): Posición (en caracteres) donde empieza la edición.
+            eliminados (int): Cantidad de caracteres eliminados desde offset.
+            insertado (str): Texto insertado en offset.
+
+        Retorna:
+            ResultadoAnalisis: Resultado del análisis del documento editado (ver resultado()).
+        """
+        n = self._n
+        l0, c0 = self._posicion(offset)
+        l1, c1 = self._posicion(offset + eliminados)
+        antes = self._linea(l0)[:c0] if l0 < n else ""
+        despues = self._linea(l1)[c1:] if l1 < n else ""
+        texto = antes + insertado + despues
+        fin = min(l1 + 1, n)
+        fin = max(fin, l0)
+        while not texto.endswith("\n") and fin < n:
+            texto += self._linea(fin)
+            fin += 1
+        nuevas = list(lexico.lineas_de_texto(texto))
+
+        # Se vuelven a lexear las líneas nuevas y las siguientes hasta que el estado converge
+        estado = self._estado_antes(l0)
+        nuevas_info = []
+        for linea in nuevas:
+            info = self._analizar_linea(linea, estado)
+            nuevas_info.append(info)
+            estado = (info.pila, info.detenido)
+        k = fin
+        while k < n and estado != self._estado_antes(k):
+            linea = self._linea(k)
+            info = self._analizar_linea(linea, estado)
+            nuevas.append(linea)
+            nuevas_info.append(info)
+            estado = (info.pila, info.detenido)
+            k += 1
+
+        # Tramo de bloques afectado: desde el bloque de la línea anterior a la edición hasta el
+        # bloque de la última línea vuelta a lexear, inclusive
+        delta = len(nuevas) - (k - l0)
+        inicio_tramo = self._inicio_anterior(max(l0 - 1, 0))
+        fin_tramo = self._siguiente_inicio(max(k - 1, l0) + 1) + delta
+
+        self._reemplazar(l0, k, nuevas, nuevas_info)
+        self._marcar_bloques(inicio_tramo, fin_tramo)
+        self._primer_pendiente = min(self._primer_pendiente, inicio_tramo)
+        return self.resultado()
+
+    # ------------------------------------------------------------------ análisis
+
+    def _fin_documento(self):
+        i = self._n
+        for trozo in reversed(self._trozos):
+            for datos in reversed(trozo.info):
+                i -= 1
+                if datos.fin is not None:
+                    return i + 1 + datos.fin[0], datos.fin[1]
+        return 1, 1
+
+    def _tokens_bloque(self, inicio):
+        fin = self._siguiente_inicio(inicio + 1)
+        fila = inicio
+        for _, linea in self._recorrer(inicio, fin):
+            tokens = linea.tokens[linea.corte:] if fila == inicio and linea.corte > 0 else linea.tokens
+            fila += 1
+            for t in tokens:
+                yield lexico.Token(t.kind, t.value, fila, t.col)
+        if fin < self._n:
+            linea = self._info(fin)
+            for t in linea.tokens[:linea.corte]:
+                yield lexico.Token(t.kind, t.value, fin + 1, t.col)
+            primero = linea.tokens[linea.corte]
+            yield lexico.Token('EOF', '', fin + 1, primero.col)
+        else:
+            fila, col = self._fin_documento()
+            pila = self._info(self._n - 1).pila if self._n else (0,)
+            for _ in range(len(pila) - 1):
+                yield lexico.Token('DEDENT', '', fila, col)
+            yield lexico.Token('EOF', '', fila, col)
+
+    def _parsear_bloque(self, inicio):
+        """
+        Parsea el bloque que empieza en la línea inicio, uniéndolo con los siguientes mientras su error caiga en el centinela.
+
+        Retorna:
+            tuple: (SyntaxError, token del error), o None si el bloque es aceptado.
+        """
+        while True:
+            parser = ASDRTabla(gramatica, 'program', tokens=self._tokens_bloque(inicio), compilada=self.compilada)
+            try:
+                parser.parse()
+                return None
+            except SyntaxError as e:
+                token = parser.token_actual()
+                # Solo el último token de un bloque intermedio es EOF: es el centinela
+                siguiente = self._siguiente_inicio(inicio + 1)
+                if token.kind == 'EOF' and siguiente < self._n:
+                    self._fijar_estado(siguiente, _INTERIOR)
+                    continue
+                return e, token
+
+    def _primer_error(self):
+        """Devuelve la línea donde empieza el primer bloque rechazado, parseando los pendientes que lo preceden."""
+        if self._n == 0:
+            return None
+        i = self._siguiente(self._primer_pendiente, self._f_pendientes, _pendiente)
+        while i < self._n:
+            # Los bloques ya aceptados se saltan con el árbol de pendientes
+            if self._estado(i) is None:
+                self._fijar_estado(i, self._parsear_bloque(i) is None)
+            if self._estado(i) is False:
+                self._primer_pendiente = i
+                return i
+            i = self._siguiente(i + 1, self._f_pendientes, _pendiente)
+        self._primer_pendiente = self._n
+        return None
+
+    def tokens(self):
+        """Devuelve todos los tokens del documento, igual que lexico.tokenize sobre el texto."""
+        tokens = []
+        inicio = 0
+        while True:
+            fin = self._siguiente_inicio(inicio + 1)
+            tokens.extend(t for t in self._tokens_bloque(inicio) if t.kind != 'EOF' or fin >= self._n)
+            if fin >= self._n:
+                return tokens
+            inicio = fin
+
+    def errores_lexicos(self):
+        """Devuelve los errores léxicos del documento, volviendo a lexear solo las líneas que los tienen."""
+        errores = []
+        pila = _ESTADO_INICIAL[0]
+        for i, (linea, info) in enumerate(self._recorrer(0, self._n)):
+            if info.con_errores:
+                lex = lexico.EstadoLexer()
+                lex.row = i + 1
+                lex.indent_stack = list(pila)
+                self._escanear(linea, lex, [])
+                errores.extend(lex.errores)
+            pila = info.pila
+        return errores
+
+    def resultado(self, completo=False):
+        """
+        Devuelve el resultado del análisis, parseando solo los bloques pendientes.
+
+        Parámetros:
+            completo (bool): Si es True, el resultado incluye todos los tokens y errores
+                léxicos del documento (cuesta tiempo proporcional al tamaño del archivo).
+
+        Retorna:
+            ResultadoAnalisis: Resultado equivalente al de parse_source sobre el texto completo.
+        """
+        tokens = self.tokens() if completo else []
+        errores = self.errores_lexicos() if completo else []
+        inicio = self._primer_error()
+        if inicio is None:
+            return ResultadoAnalisis(True, None, None, None, tokens, errores)
+        error, token = self._parsear_bloque(inicio)
+        return ResultadoAnalisis(False, str(error), token.row, token.col, tokens, errores)
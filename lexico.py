@@ -1,3 +1,11 @@
+import mmap
+import re
+import struct
+import sys
+from array import array
+from itertools import accumulate, chain
+from typing import NamedTuple
+
 #Diccionario con las palabaras unicas de python
 KEYWORDS = {
     # Palabras reservadas de Python
@@ -45,6 +53,15 @@ PUNCTUATION = {
     ";": "tk_punto_coma", ".": "tk_punto"
 }
 
+#Tipos de token que puede producir el lexer; su posición en la lista es su código entero
+TIPOS_TOKEN = (["EOF", "INDENT", "DEDENT", "id", "tk_entero", "tk_cadena", "tk_cadena_erronea", "tk_caracter_erroneo"]
+               + sorted(KEYWORDS) + list(dict.fromkeys([*OPERATORS.values(), *PUNCTUATION.values()])))
+CODIGOS_TOKEN = {tipo: codigo for codigo, tipo in enumerate(TIPOS_TOKEN)}
+
+#Lexema fijo de cada código: el símbolo para operadores y puntuación, vacío para los demás
+_LEXEMAS_SIMBOLO = {tipo: lexema for lexema, tipo in {**OPERATORS, **PUNCTUATION}.items()}
+_LEXEMA_FIJO = [_LEXEMAS_SIMBOLO.get(tipo, "") for tipo in TIPOS_TOKEN]
+
 
 def is_digit(char):
     """
@@ -85,157 +102,1059 @@ def is_alnum(char):
     return is_alpha(char) or is_digit(char)
 
 
-def lexer(filename):
-    try:
-        with open(filename, "r", encoding="utf-8") as file:
-            source_code = file.read()
-    except FileNotFoundError:
-        print(f"Error: No se encontró el archivo '{filename}'")
-        return
+class Token(NamedTuple):
+    """
+    Token producido por el lexer.
 
-    tokens = []
-    row, col = 1, 1
-    i = 0
-    length = len(source_code)
+    Atributos:
+        kind (str): Tipo del token (por ejemplo "id", "tk_suma" o una palabra reservada).
+        value (str): Lexema asociado; vacío para palabras reservadas, INDENT, DEDENT y EOF.
+        row (int): Fila donde inicia el token.
+        col (int): Columna donde inicia el token.
 
-    indent_stack = [0]
-    at_line_start = True
+    El formato textual <TIPO,LEXEMA,FILA,COL> solo se genera al convertir el token a texto.
+    """
+    kind: str
+    value: str
+    row: int
+    col: int
 
-    while i < length:
-        char = source_code[i]
+    def __str__(self):
+        return f"<{self.kind},{self.value},{self.row},{self.col}>"
 
-        if at_line_start:
-            start_of_line_i = i
-            start_of_line_col = col
 
-            while i < length and source_code[i] in " \t":
-                i += 1
-                col += 1
+class ErrorLexico(NamedTuple):
+    """
+    Diagnóstico producido por el lexer.
 
-            if i < length and source_code[i] == '#':
-                while i < length and source_code[i] != '\n':
-                    i += 1
+    Atributos:
+        mensaje (str): Descripción del error, con su posición.
+        row (int): Fila del error.
+        col (int): Columna del error.
+    """
+    mensaje: str
+    row: int
+    col: int
 
-            if i == length or source_code[i] == '\n':
-                if i < length and source_code[i] == '\n':
-                    i += 1
-                    row += 1
-                    col = 1
-                continue
+    def __str__(self):
+        return self.mensaje
+
+
+class EstadoLexer:
+    """
+    Estado del lexer que se conserva entre líneas (y por tanto entre bloques de lectura).
+
+    Atributos:
+        row (int): Fila actual.
+        col (int): Columna actual.
+        indent_stack (list): Pila de niveles de indentación abiertos.
+        detenido (bool): True si se encontró un carácter no reconocido y el análisis terminó.
+        errores (list): Errores léxicos (ErrorLexico) aún no entregados.
+        recuperar (bool): Si es True, un carácter no reconocido produce un token
+            tk_caracter_erroneo y el análisis continúa; si es False, el análisis se detiene.
+    """
+    __slots__ = ("row", "col", "indent_stack", "detenido", "errores", "recuperar")
+
+    def __init__(self, recuperar=True):
+        self.row = 1
+        self.col = 1
+        self.indent_stack = [0]
+        self.detenido = False
+        self.errores = []
+        self.recuperar = recuperar
+
+
+def _inicio_linea(linea, estado, tokens):
+    """
+    Procesa la indentación al inicio de una línea y emite los INDENT/DEDENT necesarios.
+
+    Parámetros:
+        linea (str): Línea a analizar.
+        estado (EstadoLexer): Estado del lexer; se actualiza si la línea está en blanco.
+        tokens (list): Lista donde se agregan los tokens de indentación.
 
-            current_indent_level = col - 1
-            last_indent_level = indent_stack[-1]
+    Retorna:
+        int: Índice del primer carácter significativo, o -1 si la línea está vacía o es solo un comentario.
+    """
+    length = len(linea)
+    i = 0
+    while i < length and linea[i] in " \t":
+        i += 1
 
-            if current_indent_level > last_indent_level:
-                tokens.append(f"<INDENT,,{row},{col}>")
-                indent_stack.append(current_indent_level)
-            elif current_indent_level < last_indent_level:
-                while indent_stack[-1] > current_indent_level:
-                    indent_stack.pop()
-                    tokens.append(f"<DEDENT,,{row},{col}>")
+    if i == length or linea[i] in "#\n":
+        if linea.endswith("\n"):
+            estado.row += 1
+            estado.col = 1
+        else:
+            estado.col = i + 1
+        return -1
 
-                if current_indent_level != 0 and indent_stack[-1] != current_indent_level:
-                     pass
+    row = estado.row
+    indent_stack = estado.indent_stack
+    if i > indent_stack[-1]:
+        tokens.append(Token("INDENT", "", row, i + 1))
+        indent_stack.append(i)
+    elif i < indent_stack[-1]:
+        while indent_stack[-1] > i:
+            indent_stack.pop()
+            tokens.append(Token("DEDENT", "", row, i + 1))
+    return i
 
-            at_line_start = False
 
-        char = source_code[i]
+def escanear_linea(linea, estado, tokens):
+    """
+    Analiza una línea de código fuente y agrega sus tokens a una lista.
+
+    Parámetros:
+        linea (str): Línea a analizar, incluyendo el salto de línea final si lo tiene.
+        estado (EstadoLexer): Estado compartido con las líneas anteriores; se actualiza.
+        tokens (list): Lista donde se agregan los tokens encontrados.
+    """
+    i = _inicio_linea(linea, estado, tokens)
+    if i < 0:
+        return
+    row = estado.row
+    length = len(linea)
+
+    while i < length:
+        char = linea[i]
 
         if char in " \t":
-            col += 1
             i += 1
             continue
 
         if char == "\n":
-            row += 1
-            col = 1
-            i += 1
-            at_line_start = True
-            continue
+            estado.row = row + 1
+            estado.col = 1
+            return
 
         if char == "#":
-             while i < length and source_code[i] != "\n":
-                 i += 1
-             continue
+            if linea.endswith("\n"):
+                estado.row = row + 1
+                estado.col = 1
+            else:
+                estado.col = i + 1
+            return
 
         if is_alpha(char):
-            start_col = col
+            start_col = i + 1
             lexeme = ""
-            while i < length and is_alnum(source_code[i]):
-                lexeme += source_code[i]
+            while i < length and is_alnum(linea[i]):
+                lexeme += linea[i]
                 i += 1
-                col += 1
             if lexeme in KEYWORDS:
-                tokens.append(f"<{lexeme},,{row},{start_col}>")
+                tokens.append(Token(lexeme, "", row, start_col))
             else:
-                tokens.append(f"<id,{lexeme},{row},{start_col}>")
+                tokens.append(Token("id", lexeme, row, start_col))
             continue
 
         if is_digit(char):
-            start_col = col
+            start_col = i + 1
             lexeme = ""
-            while i < length and is_digit(source_code[i]):
-                lexeme += source_code[i]
+            while i < length and is_digit(linea[i]):
+                lexeme += linea[i]
                 i += 1
-                col += 1
-            tokens.append(f"<tk_entero,{lexeme},{row},{start_col}>")
+            tokens.append(Token("tk_entero", lexeme, row, start_col))
             continue
 
         if char in "\"'":
-            start_col = col
+            start_col = i + 1
             quote = char
             lexeme = quote
             i += 1
-            col += 1
-            while i < length and source_code[i] != quote and source_code[i] != '\n':
-                lexeme += source_code[i]
+            while i < length and linea[i] != quote and linea[i] != "\n":
+                lexeme += linea[i]
                 i += 1
-                col += 1
-            if i < length and source_code[i] == quote:
+            if i < length and linea[i] == quote:
                 lexeme += quote
                 i += 1
-                col += 1
-                tokens.append(f"<tk_cadena,{lexeme},{row},{start_col}>")
-                continue
+                tokens.append(Token("tk_cadena", lexeme, row, start_col))
             else:
-                 print(f">>> Error léxico: Cadena no cerrada o salto de línea inesperado (linea:{row},posicion:{start_col})")
-                 tokens.append(f"<tk_cadena_erronea,{lexeme},{row},{start_col}>")
-                 continue
+                estado.errores.append(ErrorLexico(f"Error léxico: Cadena no cerrada o salto de línea inesperado (linea:{row},posicion:{start_col})", row, start_col))
+                tokens.append(Token("tk_cadena_erronea", lexeme, row, start_col))
+            continue
 
-        two_char_op = source_code[i:i+2]
+        two_char_op = linea[i:i+2]
         if i + 1 < length and two_char_op in OPERATORS:
-            tokens.append(f"<{OPERATORS[two_char_op]},{two_char_op},{row},{col}>")
+            tokens.append(Token(OPERATORS[two_char_op], two_char_op, row, i + 1))
             i += 2
-            col += 2
             continue
 
         if char in OPERATORS:
-            tokens.append(f"<{OPERATORS[char]},{char},{row},{col}>")
+            tokens.append(Token(OPERATORS[char], char, row, i + 1))
             i += 1
-            col += 1
             continue
 
         if char in PUNCTUATION:
-            tokens.append(f"<{PUNCTUATION[char]},{char},{row},{col}>")
+            tokens.append(Token(PUNCTUATION[char], char, row, i + 1))
+            i += 1
+            continue
+
+        estado.errores.append(ErrorLexico(f"Error léxico(linea:{row},posicion:{i + 1}): Carácter no reconocido '{char}'", row, i + 1))
+        if estado.recuperar:
+            tokens.append(Token("tk_caracter_erroneo", char, row, i + 1))
             i += 1
-            col += 1
             continue
+        estado.col = i + 1
+        estado.detenido = True
+        return
+
+    estado.col = i + 1
+
+
+def _construir_patron():
+    """
+    Construye la expresión regular maestra a partir de KEYWORDS, OPERATORS y PUNCTUATION.
+
+    Igual que el lexer carácter a carácter, solo se reconocen operadores de uno o dos
+    caracteres, probando primero los de dos.
+
+    Retorna:
+        tuple: (patrón compilado, diccionario lexema -> tipo de token para operadores y puntuación).
+    """
+    simbolos = {lexema: tipo for lexema, tipo in {**OPERATORS, **PUNCTUATION}.items() if len(lexema) <= 2}
+    dobles = sorted((lexema for lexema in simbolos if len(lexema) == 2), reverse=True)
+    simples = "".join(sorted(lexema for lexema in simbolos if len(lexema) == 1))
+    patron = "|".join([
+        r"(?P<blanco>[ \t]+)",
+        r"(?P<nombre>[A-Za-z_][A-Za-z0-9_]*)",
+        r"(?P<entero>[0-9]+)",
+        r"(?P<cadena>\"[^\"\n]*\"|'[^'\n]*')",
+        r"(?P<cadena_erronea>\"[^\"\n]*|'[^'\n]*)",
+        "(?P<simbolo>" + "|".join(re.escape(lexema) for lexema in dobles) + "|[" + re.escape(simples) + "])",
+        r"(?P<fin>[#\n])",
+    ])
+    return re.compile(patron), simbolos
+
+
+_PATRON_MAESTRO, _SIMBOLOS = _construir_patron()
+
+
+def escanear_linea_regex(linea, estado, tokens):
+    """
+    Variante de escanear_linea que reconoce lexemas completos con la expresión regular maestra.
+
+    Produce los mismos tokens, mensajes y posiciones que escanear_linea, pero cada
+    lexema se obtiene como un corte de la línea en lugar de concatenar carácter a carácter.
+
+    Parámetros:
+        linea (str): Línea a analizar, incluyendo el salto de línea final si lo tiene.
+        estado (EstadoLexer): Estado compartido con las líneas anteriores; se actualiza.
+        tokens (list): Lista donde se agregan los tokens encontrados.
+    """
+    i = _inicio_linea(linea, estado, tokens)
+    if i < 0:
+        return
+    row = estado.row
+    length = len(linea)
+    match = _PATRON_MAESTRO.match
+    append = tokens.append
+
+    while i < length:
+        m = match(linea, i)
+        if m is None:
+            estado.errores.append(ErrorLexico(f"Error léxico(linea:{row},posicion:{i + 1}): Carácter no reconocido '{linea[i]}'", row, i + 1))
+            if estado.recuperar:
+                append(Token("tk_caracter_erroneo", linea[i], row, i + 1))
+                i += 1
+                continue
+            estado.col = i + 1
+            estado.detenido = True
+            return
+        grupo = m.lastgroup
+        lexeme = m.group()
+        if grupo == "nombre":
+            if lexeme in KEYWORDS:
+                append(Token(lexeme, "", row, i + 1))
+            else:
+                append(Token("id", lexeme, row, i + 1))
+        elif grupo == "simbolo":
+            append(Token(_SIMBOLOS[lexeme], lexeme, row, i + 1))
+        elif grupo == "entero":
+            append(Token("tk_entero", lexeme, row, i + 1))
+        elif grupo == "cadena":
+            append(Token("tk_cadena", lexeme, row, i + 1))
+        elif grupo == "cadena_erronea":
+            estado.errores.append(ErrorLexico(f"Error léxico: Cadena no cerrada o salto de línea inesperado (linea:{row},posicion:{i + 1})", row, i + 1))
+            append(Token("tk_cadena_erronea", lexeme, row, i + 1))
+        elif grupo == "fin":
+            if linea.endswith("\n"):
+                estado.row = row + 1
+                estado.col = 1
+            else:
+                estado.col = i + 1
+            return
+        i = m.end()
 
-        print(f">>> Error léxico(linea:{row},posicion:{col}): Carácter no reconocido '{char}'")
-        break
+    estado.col = i + 1
 
-    while len(indent_stack) > 1:
-        indent_stack.pop()
-        tokens.append(f"<DEDENT,,{row},{col}>")
 
-    tokens.append(f"<EOF,,{row},{col}>")
+#Motores de análisis disponibles para tokens_de_lineas, iter_tokens y lexer
+MOTORES = {
+    "manual": escanear_linea,
+    "regex": escanear_linea_regex,
+}
+
+
+def cerrar(estado):
+    """
+    Genera los DEDENT pendientes y el token EOF al terminar la entrada.
+
+    Parámetros:
+        estado (EstadoLexer): Estado del lexer tras la última línea.
+
+    Retorna:
+        list: Tokens de cierre.
+    """
+    tokens = []
+    while len(estado.indent_stack) > 1:
+        estado.indent_stack.pop()
+        tokens.append(Token("DEDENT", "", estado.row, estado.col))
+    tokens.append(Token("EOF", "", estado.row, estado.col))
+    return tokens
+
+
+def leer_lineas(fileobj, tamano_bloque=1 << 16):
+    """
+    Lee un archivo de texto por bloques y lo entrega línea por línea.
+
+    Parámetros:
+        fileobj: Objeto con método read(n) que devuelve texto.
+        tamano_bloque (int): Cantidad de caracteres leídos en cada bloque.
+
+    Retorna:
+        generator: Líneas del archivo, cada una con su salto de línea final si lo tiene.
+    """
+    resto = ""
+    while True:
+        bloque = fileobj.read(tamano_bloque)
+        if not bloque:
+            break
+        lineas = (resto + bloque).split("\n")
+        resto = lineas.pop()
+        for linea in lineas:
+            yield linea + "\n"
+    if resto:
+        yield resto
+
+
+def tokens_de_lineas(lineas, motor="manual", errores=None, recuperar=True, fila_inicial=1):
+    """
+    Genera los tokens de una secuencia de líneas conservando el estado entre ellas.
+
+    Parámetros:
+        lineas (iterable): Líneas de código fuente, con su salto de línea final.
+        motor (str): Motor de análisis a usar, una de las claves de MOTORES.
+        errores (list): Lista donde se agregan los errores léxicos (ErrorLexico). Si es
+            None, los errores se imprimen en la consola a medida que aparecen.
+        recuperar (bool): Si es True, cada carácter no reconocido se entrega como un token
+            tk_caracter_erroneo y el análisis continúa; si es False, se detiene en el primero.
+        fila_inicial (int): Fila de la primera línea, para analizar un fragmento de un
+            archivo que empieza sin indentación.
+
+    Retorna:
+        generator: Tokens en el mismo orden que produce lexer().
+    """
+    escanear = MOTORES[motor]
+    estado = EstadoLexer(recuperar)
+    estado.row = fila_inicial
+    tokens = []
+    for linea in lineas:
+        escanear(linea, estado, tokens)
+        if estado.errores:
+            _entregar_errores(estado, errores)
+        if tokens:
+            yield from tokens
+            tokens.clear()
+        if estado.detenido:
+            break
+    yield from cerrar(estado)
+
+
+def _entregar_errores(estado, errores):
+    if errores is None:
+        for error in estado.errores:
+            print(f">>> {error}")
+    else:
+        errores.extend(estado.errores)
+    estado.errores.clear()
+
+
+def iter_tokens(fileobj_or_path, tamano_bloque=1 << 16, motor="manual", errores=None, recuperar=True):
+    """
+    Analiza un archivo de forma perezosa, sin cargarlo completo en memoria.
+
+    Parámetros:
+        fileobj_or_path: Ruta del archivo o un objeto de texto ya abierto.
+        tamano_bloque (int): Cantidad de caracteres leídos en cada bloque.
+        motor (str): Motor de análisis a usar, una de las claves de MOTORES, o MOTOR_MMAP
+            para mapear el archivo en memoria (solo con una ruta; ver iter_tokens_mmap).
+        errores (list): Lista donde se agregan los errores léxicos; si es None se imprimen.
+        recuperar (bool): Si es False, el análisis se detiene en el primer carácter no reconocido.
+
+    Retorna:
+        generator: Tokens del archivo, terminando con EOF.
+    """
+    if motor == MOTOR_MMAP:
+        if hasattr(fileobj_or_path, "read"):
+            raise ValueError(f"El motor '{MOTOR_MMAP}' necesita la ruta del archivo")
+        yield from iter_tokens_mmap(fileobj_or_path, errores, recuperar)
+        return
+    if hasattr(fileobj_or_path, "read"):
+        yield from tokens_de_lineas(leer_lineas(fileobj_or_path, tamano_bloque), motor, errores, recuperar)
+        return
+    with open(fileobj_or_path, "r", encoding="utf-8") as file:
+        yield from tokens_de_lineas(leer_lineas(file, tamano_bloque), motor, errores, recuperar)
+
+
+class TokenMapeado(NamedTuple):
+    """
+    Token cuyo lexema es un tramo (inicio, longitud) de los bytes de la fuente.
+
+    Tiene los mismos atributos kind, value, row y col que Token, así que los parsers
+    lo usan igual, pero value solo se decodifica (en UTF-8) cuando se consulta.
+
+    Atributos:
+        kind (str): Tipo del token.
+        inicio (int): Posición en bytes del lexema dentro de fuente.
+        longitud (int): Longitud en bytes del lexema; 0 si el token no tiene valor.
+        row (int): Fila donde inicia el token.
+        col (int): Columna (en caracteres, no en bytes) donde inicia el token.
+        fuente: Bytes de la fuente (un mmap del archivo o un objeto bytes).
+    """
+    kind: str
+    inicio: int
+    longitud: int
+    row: int
+    col: int
+    fuente: object
+
+    @property
+    def value(self):
+        if not self.longitud:
+            return ""
+        return str(self.fuente[self.inicio:self.inicio + self.longitud], "utf-8")
+
+    def materializar(self):
+        """Devuelve el Token equivalente, con el lexema ya decodificado."""
+        return Token(self.kind, self.value, self.row, self.col)
+
+    def __str__(self):
+        return f"<{self.kind},{self.value},{self.row},{self.col}>"
+
+
+def _construir_patron_bytes():
+    """
+    Construye la expresión regular maestra del motor mmap, que trabaja sobre bytes.
+
+    Cada símbolo tiene su propio grupo, de modo que el tipo del token se obtiene de
+    m.lastindex (un entero) sin crear el lexema. Los comentarios solo se reconocen por
+    su '#': los saltos de línea ya se separaron antes de analizar la línea.
+
+    Retorna:
+        tuple: (patrón compilado, índice del primer grupo de símbolo, tipos de token por
+        índice de grupo, diccionario lexema en bytes -> palabra reservada).
+    """
+    dobles = sorted((lexema for lexema in _SIMBOLOS if len(lexema) == 2), reverse=True)
+    simples = sorted(lexema for lexema in _SIMBOLOS if len(lexema) == 1)
+    fijos = [
+        rb"([ \t]+)",
+        rb"([A-Za-z_][A-Za-z0-9_]*)",
+        rb"([0-9]+)",
+        rb"(\"[^\"\n]*\"|'[^'\n]*')",
+        rb"(\"[^\"\n]*|'[^'\n]*)",
+        rb"(#)",
+    ]
+    simbolos = dobles + simples
+    patron = b"|".join(fijos + [b"(" + re.escape(lexema.encode()) + b")" for lexema in simbolos])
+    tipos = [None] * (len(fijos) + 1) + [_SIMBOLOS[lexema] for lexema in simbolos]
+    claves = {palabra.encode(): palabra for palabra in KEYWORDS}
+    return re.compile(patron), len(fijos) + 1, tipos, claves
+
+
+_G_BLANCO, _G_NOMBRE, _G_ENTERO, _G_CADENA, _G_CADENA_ERRONEA, _G_COMENTARIO = range(1, 7)
+_PATRON_BYTES, _G_SIMBOLO, _TIPOS_GRUPO, _CLAVES_BYTES = _construir_patron_bytes()
+_BLANCOS_BYTES = re.compile(rb"[ \t]*")
+_FIN_LINEA_BYTES = re.compile(rb"\r\n?|\n")
+_NO_ASCII = re.compile(rb"[\x80-\xff]")
+_CONTINUACION = re.compile(rb"[\x80-\xbf]")
+
+
+def _longitud_utf8(byte):
+    """Cantidad de bytes del carácter UTF-8 que empieza con el byte dado."""
+    if byte < 0xC0:
+        return 1
+    if byte < 0xE0:
+        return 2
+    if byte < 0xF0:
+        return 3
+    return 4
+
+
+def escanear_linea_bytes(datos, inicio, fin, salto, estado, tokens):
+    """
+    Analiza la línea datos[inicio:fin] (sin su salto de línea) sin copiarla.
+
+    Produce los mismos tokens, mensajes y posiciones que escanear_linea, pero cada
+    token es un TokenMapeado que apunta a datos. Las columnas se cuentan en caracteres:
+    los bytes de continuación UTF-8 de las cadenas y de los caracteres no reconocidos
+    se descuentan del resto de la línea.
+
+    Parámetros:
+        datos: Bytes de la fuente completa (mmap o bytes).
+        inicio (int): Posición del primer byte de la línea.
+        fin (int): Posición del salto de línea, o el largo de datos en la última línea.
+        salto (bool): True si la línea termina con un salto de línea.
+        estado (EstadoLexer): Estado compartido con las líneas anteriores; se actualiza.
+        tokens (list): Lista donde se agregan los tokens encontrados.
+    """
+    i = _BLANCOS_BYTES.match(datos, inicio, fin).end()
+    if i == fin or datos[i] == 0x23:
+        if salto:
+            estado.row += 1
+            estado.col = 1
+        else:
+            estado.col = i - inicio + 1
+        return
+
+    row = estado.row
+    append = tokens.append
+    indent_stack = estado.indent_stack
+    nivel = i - inicio
+    if nivel > indent_stack[-1]:
+        append(TokenMapeado("INDENT", i, 0, row, nivel + 1, datos))
+        indent_stack.append(nivel)
+    elif nivel < indent_stack[-1]:
+        while indent_stack[-1] > nivel:
+            indent_stack.pop()
+            append(TokenMapeado("DEDENT", i, 0, row, nivel + 1, datos))
+
+    match = _PATRON_BYTES.match
+    tipos = _TIPOS_GRUPO
+    claves = _CLAVES_BYTES
+    base = inicio - 1
+    while i < fin:
+        m = match(datos, i, fin)
+        col = i - base
+        if m is None:
+            n = _longitud_utf8(datos[i])
+            char = str(datos[i:i + n], "utf-8")
+            estado.errores.append(ErrorLexico(f"Error léxico(linea:{row},posicion:{col}): Carácter no reconocido '{char}'", row, col))
+            if estado.recuperar:
+                append(TokenMapeado("tk_caracter_erroneo", i, n, row, col, datos))
+                i += n
+                base += n - 1
+                continue
+            estado.col = col
+            estado.detenido = True
+            return
+        grupo = m.lastindex
+        j = m.end()
+        if grupo >= _G_SIMBOLO:
+            append(TokenMapeado(tipos[grupo], i, j - i, row, col, datos))
+        elif grupo == _G_NOMBRE:
+            clave = claves.get(datos[i:j])
+            if clave is None:
+                append(TokenMapeado("id", i, j - i, row, col, datos))
+            else:
+                append(TokenMapeado(clave, i, 0, row, col, datos))
+        elif grupo == _G_BLANCO:
+            pass
+        elif grupo == _G_ENTERO:
+            append(TokenMapeado("tk_entero", i, j - i, row, col, datos))
+        elif grupo == _G_CADENA or grupo == _G_CADENA_ERRONEA:
+            if grupo == _G_CADENA:
+                append(TokenMapeado("tk_cadena", i, j - i, row, col, datos))
+            else:
+                estado.errores.append(ErrorLexico(f"Error léxico: Cadena no cerrada o salto de línea inesperado (linea:{row},posicion:{col})", row, col))
+                append(TokenMapeado("tk_cadena_erronea", i, j - i, row, col, datos))
+            if _NO_ASCII.search(datos, i, j) is not None:
+                base += len(_CONTINUACION.findall(datos, i, j))
+        else:
+            if salto:
+                estado.row = row + 1
+                estado.col = 1
+            else:
+                estado.col = col
+            return
+        i = j
+
+    if salto:
+        estado.row = row + 1
+        estado.col = 1
+    else:
+        estado.col = i - base
+
+
+def tokens_de_bytes(datos, errores=None, recuperar=True):
+    """
+    Genera los tokens de un código fuente en bytes (UTF-8) sin decodificarlo ni copiarlo.
+
+    Los saltos de línea \\n, \\r\\n y \\r se reconocen igual que al leer el archivo en
+    modo texto, así que los tokens coinciden con los de tokens_de_lineas.
+
+    Parámetros:
+        datos: Bytes de la fuente (un mmap, bytes o cualquier objeto con la interfaz de búfer).
+        errores (list): Lista donde se agregan los errores léxicos; si es None se imprimen.
+        recuperar (bool): Si es False, el análisis se detiene en el primer carácter no reconocido.
+
+    Retorna:
+        generator: TokenMapeado de la fuente, terminando con EOF.
+    """
+    estado = EstadoLexer(recuperar)
+    tokens = []
+    buscar_fin = _FIN_LINEA_BYTES.search
+    total = len(datos)
+    pos = 0
+    while pos < total:
+        m = buscar_fin(datos, pos)
+        if m is None:
+            fin = siguiente = total
+        else:
+            fin, siguiente = m.span()
+        escanear_linea_bytes(datos, pos, fin, m is not None, estado, tokens)
+        if estado.errores:
+            _entregar_errores(estado, errores)
+        if tokens:
+            yield from tokens
+            tokens.clear()
+        if estado.detenido:
+            break
+        pos = siguiente
+    for token in cerrar(estado):
+        yield TokenMapeado(token.kind, total, 0, token.row, token.col, datos)
+
+
+def iter_tokens_mmap(ruta, errores=None, recuperar=True):
+    """
+    Analiza un archivo mapeado en memoria, sin leerlo ni decodificarlo completo.
+
+    Los tokens apuntan al mapeo, que se libera cuando ya no queda ninguno; el archivo
+    se cierra apenas se crea el mapeo.
+
+    Parámetros:
+        ruta (str): Ruta del archivo.
+        errores (list): Lista donde se agregan los errores léxicos; si es None se imprimen.
+        recuperar (bool): Si es False, el análisis se detiene en el primer carácter no reconocido.
+
+    Retorna:
+        generator: TokenMapeado del archivo, terminando con EOF.
+    """
+    with open(ruta, "rb") as file:
+        try:
+            datos = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Un archivo vacío no se puede mapear
+            datos = b""
+    yield from tokens_de_bytes(datos, errores, recuperar)
+
+
+#Motor que analiza el archivo completo mapeado en memoria en lugar de línea por línea
+MOTOR_MMAP = "mmap"
+
+class TokensMapeados:
+    """
+    Secuencia compacta de los tokens de una fuente en bytes.
+
+    En lugar de un objeto por token guarda arreglos paralelos (código del tipo, inicio
+    y longitud del lexema, fila y columna), unos 22 bytes por token. Los TokenMapeado
+    se crean solo al indexar o recorrer la secuencia.
+
+    Atributos:
+        fuente: Bytes de la fuente a los que apuntan los lexemas.
+        tipo, inicio, longitud, row, col (array): Un elemento por token.
+    """
+    __slots__ = ("fuente", "tipo", "inicio", "longitud", "row", "col")
+
+    def __init__(self, fuente, tokens=()):
+        self.fuente = fuente
+        self.tipo = array("H")
+        self.inicio = array("q")
+        self.longitud = array("I")
+        self.row = array("I")
+        self.col = array("I")
+        for token in tokens:
+            self.tipo.append(CODIGOS_TOKEN[token.kind])
+            self.inicio.append(token.inicio)
+            self.longitud.append(token.longitud)
+            self.row.append(token.row)
+            self.col.append(token.col)
+
+    @classmethod
+    def desde_archivo(cls, ruta, errores=None, recuperar=True):
+        """Analiza un archivo con iter_tokens_mmap y guarda sus tokens."""
+        tokens = iter_tokens_mmap(ruta, errores, recuperar)
+        primero = next(tokens)
+        return cls(primero.fuente, chain((primero,), tokens))
+
+    def __len__(self):
+        return len(self.tipo)
+
+    def __getitem__(self, i):
+        return TokenMapeado(TIPOS_TOKEN[self.tipo[i]], self.inicio[i], self.longitud[i], self.row[i], self.col[i], self.fuente)
+
+    def __iter__(self):
+        fuente = self.fuente
+        for codigo, inicio, longitud, row, col in zip(self.tipo, self.inicio, self.longitud, self.row, self.col):
+            yield TokenMapeado(TIPOS_TOKEN[codigo], inicio, longitud, row, col, fuente)
+
+
+def normalizar_saltos(source):
+    """
+    Convierte los saltos de línea \\r\\n y \\r en \\n, como al leer un archivo en modo texto.
+
+    Parámetros:
+        source (str): Código fuente completo.
+
+    Retorna:
+        str: El mismo texto con todos los saltos de línea como \\n.
+    """
+    if "\r" not in source:
+        return source
+    return source.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def lineas_de_texto(source):
+    """
+    Divide un texto en líneas, conservando el salto de línea final de cada una.
+
+    Los saltos \\r\\n y \\r se normalizan a \\n (ver normalizar_saltos), así que el texto en
+    memoria produce las mismas líneas que el archivo leído en modo texto o tokens_de_bytes.
+
+    Parámetros:
+        source (str): Código fuente completo.
+
+    Retorna:
+        generator: Líneas del texto.
+    """
+    lineas = normalizar_saltos(source).split("\n")
+    ultima = lineas.pop()
+    for linea in lineas:
+        yield linea + "\n"
+    if ultima:
+        yield ultima
+
+
+def tokenize(source, motor="regex", errores=None, recuperar=True):
+    """
+    Analiza código fuente que ya está en memoria, sin leer ni escribir archivos.
+
+    A diferencia de lexer(), no imprime nada: los errores léxicos se agregan a la
+    lista errores si se indica una.
+
+    Parámetros:
+        source (str): Código fuente a analizar.
+        motor (str): Motor de análisis a usar, una de las claves de MOTORES o MOTOR_MMAP
+            (que analiza el texto codificado en UTF-8 con tokens_de_bytes).
+        errores (list): Lista donde se agregan los errores léxicos (ErrorLexico).
+        recuperar (bool): Si es False, el análisis se detiene en el primer carácter no reconocido.
+
+    Retorna:
+        list: Tokens del código, terminando con EOF.
+    """
+    if errores is None:
+        errores = []
+    if motor == MOTOR_MMAP:
+        return list(tokens_de_bytes(source.encode("utf-8"), errores, recuperar))
+    return list(tokens_de_lineas(lineas_de_texto(source), motor, errores, recuperar))
+
+
+class TablaSimbolos:
+    """
+    Tabla que interna lexemas (nombres, cadenas, enteros...) como enteros consecutivos.
+
+    Cada texto distinto se guarda una sola vez; su índice en textos es su identificador.
+
+    Atributos:
+        textos (list): Textos internados, en el orden en que aparecieron.
+    """
+    __slots__ = ("textos", "_indices")
+
+    def __init__(self, textos=()):
+        self.textos = []
+        self._indices = {}
+        for texto in textos:
+            self.internar(texto)
+
+    def internar(self, texto):
+        """Devuelve el identificador de un texto, agregándolo si es nuevo."""
+        indice = self._indices.get(texto)
+        if indice is None:
+            indice = self._indices[texto] = len(self.textos)
+            self.textos.append(texto)
+        return indice
+
+    def buscar(self, texto):
+        """Devuelve el identificador de un texto, o -1 si no está en la tabla."""
+        return self._indices.get(texto, -1)
+
+    def __getitem__(self, indice):
+        return self.textos[indice]
+
+    def __len__(self):
+        return len(self.textos)
+
+
+class TokensCodificados:
+    """
+    Tokens guardados como enteros: código del tipo (ver TIPOS_TOKEN), identificador del
+    lexema en una TablaSimbolos, fila y columna, cada uno en su propio arreglo.
+
+    Los operadores, la puntuación y las palabras reservadas no ocupan la tabla (su
+    lexema se deduce del tipo y su valor es -1). Al indexar o recorrer la secuencia se
+    obtienen Token cuyos lexemas son los textos internados, compartidos entre todos los
+    tokens que los repiten.
+
+    Atributos:
+        simbolos (TablaSimbolos): Lexemas internados.
+        tipos (list): Tipo de token de cada código; por defecto TIPOS_TOKEN.
+        tipo, valor, row, col (array): Un elemento por token.
+    """
+    __slots__ = ("simbolos", "tipos", "tipo", "valor", "row", "col", "_codigos", "_fijos", "_usos")
+
+    def __init__(self, simbolos=None, tipos=TIPOS_TOKEN):
+        self.simbolos = TablaSimbolos() if simbolos is None else simbolos
+        self.tipos = tipos
+        if tipos is TIPOS_TOKEN:
+            self._codigos, self._fijos = CODIGOS_TOKEN, _LEXEMA_FIJO
+        else:
+            self._codigos = {tipo: codigo for codigo, tipo in enumerate(tipos)}
+            self._fijos = [_LEXEMAS_SIMBOLO.get(tipo, "") for tipo in tipos]
+        self.tipo = array("H")
+        self.valor = array("i")
+        self.row = array("I")
+        self.col = array("I")
+        self._usos = None
+
+    def agregar(self, token):
+        codigo = self._codigos[token.kind]
+        self.tipo.append(codigo)
+        if self._fijos[codigo] or not token.value:
+            self.valor.append(-1)
+        else:
+            self.valor.append(self.simbolos.internar(token.value))
+        self.row.append(token.row)
+        self.col.append(token.col)
+        self._usos = None
+
+    def __len__(self):
+        return len(self.tipo)
+
+    def _token(self, codigo, valor, row, col):
+        return Token(self.tipos[codigo], self.simbolos.textos[valor] if valor >= 0 else self._fijos[codigo], row, col)
+
+    def __getitem__(self, i):
+        return self._token(self.tipo[i], self.valor[i], self.row[i], self.col[i])
+
+    def __iter__(self):
+        return self.desde(0)
+
+    def desde(self, inicio):
+        """Recorre los tokens a partir de la posición inicio."""
+        tipos, textos, fijos = self.tipos, self.simbolos.textos, self._fijos
+        for i in range(inicio, len(self.tipo)):
+            codigo, valor = self.tipo[i], self.valor[i]
+            yield Token(tipos[codigo], textos[valor] if valor >= 0 else fijos[codigo], self.row[i], self.col[i])
+
+    def usos(self, nombre):
+        """
+        Devuelve las posiciones de los tokens 'id' con ese nombre, en orden.
+
+        La primera consulta construye un índice identificador -> posiciones con una
+        pasada sobre los arreglos; las siguientes solo lo consultan.
+        """
+        if self._usos is None:
+            self._usos = {}
+            codigo_id = self._codigos.get("id", -1)
+            for i, (codigo, valor) in enumerate(zip(self.tipo, self.valor)):
+                if codigo == codigo_id:
+                    self._usos.setdefault(valor, []).append(i)
+        return list(self._usos.get(self.simbolos.buscar(nombre), ()))
+
+
+def codificar(tokens, simbolos=None):
+    """
+    Guarda una secuencia de tokens como TokensCodificados.
+
+    Parámetros:
+        tokens (iterable): Tokens (Token, TokenMapeado o equivalentes), por ejemplo de iter_tokens.
+        simbolos (TablaSimbolos): Tabla donde internar los lexemas; si se comparte entre
+            varios archivos, el mismo nombre tiene el mismo identificador en todos.
+
+    Retorna:
+        TokensCodificados: Tokens codificados, con su tabla de símbolos.
+    """
+    codificados = TokensCodificados(simbolos)
+    for token in tokens:
+        codificados.agregar(token)
+    return codificados
+
+
+def tokenize_codificado(source, motor="regex", errores=None, recuperar=True, simbolos=None):
+    """
+    Igual que tokenize, pero devuelve los tokens como TokensCodificados.
+
+    Parámetros:
+        source (str): Código fuente a analizar.
+        motor (str): Motor de análisis a usar (ver tokenize).
+        errores (list): Lista donde se agregan los errores léxicos (ErrorLexico).
+        recuperar (bool): Si es False, el análisis se detiene en el primer carácter no reconocido.
+        simbolos (TablaSimbolos): Tabla donde internar los lexemas; por defecto, una nueva.
+
+    Retorna:
+        TokensCodificados: Tokens del código, terminando con EOF.
+    """
+    if errores is None:
+        errores = []
+    if motor == MOTOR_MMAP:
+        return codificar(tokens_de_bytes(source.encode("utf-8"), errores, recuperar), simbolos)
+    return codificar(tokens_de_lineas(lineas_de_texto(source), motor, errores, recuperar), simbolos)
+
+
+#Archivo de tokens binario: encabezado (magia, versión, reservado, cantidad de tipos, de
+#símbolos y de tokens), tabla de tipos, tabla de símbolos, relleno hasta múltiplo de 8 y
+#un registro de cuatro int32 (tipo, valor, fila, columna) por token, todo little-endian.
+#Cada tabla de textos es un arreglo uint32 con el fin de cada texto seguido de sus bytes UTF-8.
+MAGIA_BINARIA = b"TOKB"
+VERSION_BINARIA = 1
+_ENCABEZADO_BINARIO = struct.Struct("<4sHHIIQ")
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+def _escribir_textos(archivo, textos):
+    datos = [texto.encode("utf-8") for texto in textos]
+    fines = array("I", accumulate(map(len, datos)))
+    if _BIG_ENDIAN:
+        fines.byteswap()
+    archivo.write(fines.tobytes())
+    blob = b"".join(datos)
+    archivo.write(blob)
+    return 4 * len(datos) + len(blob)
+
+
+def _leer_textos(mapa, pos, cantidad):
+    fines = array("I", mapa[pos:pos + 4 * cantidad])
+    if len(fines) != cantidad:
+        raise ValueError("Archivo de tokens binario truncado")
+    if _BIG_ENDIAN:
+        fines.byteswap()
+    pos += 4 * cantidad
+    textos = []
+    inicio = 0
+    for fin in fines:
+        textos.append(str(mapa[pos + inicio:pos + fin], "utf-8"))
+        inicio = fin
+    return textos, pos + inicio
+
+
+def escribir_tokens_binario(tokens, ruta):
+    """
+    Guarda tokens en el formato binario (ver MAGIA_BINARIA), que se lee sin volver a lexear.
+
+    Parámetros:
+        tokens: TokensCodificados, o cualquier secuencia de tokens (se codifica antes).
+        ruta (str): Archivo de salida.
+
+    Retorna:
+        TokensCodificados: Los tokens guardados.
+    """
+    if not isinstance(tokens, TokensCodificados):
+        tokens = codificar(tokens)
+    n = len(tokens)
+    registros = array("i", bytes(16 * n))
+    registros[0::4] = array("i", tokens.tipo)
+    registros[1::4] = array("i", tokens.valor)
+    registros[2::4] = array("i", tokens.row)
+    registros[3::4] = array("i", tokens.col)
+    if _BIG_ENDIAN:
+        registros.byteswap()
+    with open(ruta, "wb") as archivo:
+        archivo.write(_ENCABEZADO_BINARIO.pack(MAGIA_BINARIA, VERSION_BINARIA, 0, len(tokens.tipos), len(tokens.simbolos), n))
+        pos = _ENCABEZADO_BINARIO.size
+        pos += _escribir_textos(archivo, tokens.tipos)
+        pos += _escribir_textos(archivo, tokens.simbolos.textos)
+        archivo.write(bytes(-pos % 8))
+        archivo.write(registros.tobytes())
+    return tokens
+
+
+def leer_tokens_binario(ruta):
+    """
+    Abre un archivo de tokens binario mapeándolo en memoria.
+
+    Los arreglos tipo, valor, row y col del resultado son vistas sobre los registros del
+    mapeo, sin copiarlos; solo se leen las tablas de tipos y de símbolos. Los códigos de
+    tipo son los de la tabla del archivo (tokens.tipos), no necesariamente TIPOS_TOKEN.
+    El resultado es de solo lectura y se puede pasar directamente a ASDRCodificado.
+
+    Parámetros:
+        ruta (str): Archivo escrito por escribir_tokens_binario.
+
+    Retorna:
+        TokensCodificados: Tokens del archivo.
+    """
+    with open(ruta, "rb") as archivo:
+        try:
+            mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            mapa = b""
+    if len(mapa) < _ENCABEZADO_BINARIO.size:
+        raise ValueError(f"'{ruta}' no es un archivo de tokens binario")
+    magia, version, _, n_tipos, n_simbolos, n = _ENCABEZADO_BINARIO.unpack_from(mapa, 0)
+    if magia != MAGIA_BINARIA:
+        raise ValueError(f"'{ruta}' no es un archivo de tokens binario")
+    if version != VERSION_BINARIA:
+        raise ValueError(f"'{ruta}' usa la versión {version} del formato binario; se esperaba la {VERSION_BINARIA}")
+    tipos, pos = _leer_textos(mapa, _ENCABEZADO_BINARIO.size, n_tipos)
+    simbolos, pos = _leer_textos(mapa, pos, n_simbolos)
+    pos += -pos % 8
+    if len(mapa) < pos + 16 * n:
+        raise ValueError("Archivo de tokens binario truncado")
+    if _BIG_ENDIAN:
+        registros = array("i", mapa[pos:pos + 16 * n])
+        registros.byteswap()
+        registros = memoryview(registros)
+    else:
+        registros = memoryview(mapa)[pos:pos + 16 * n].cast("i")
+    tokens = TokensCodificados(TablaSimbolos(simbolos), tipos)
+    tokens.tipo, tokens.valor, tokens.row, tokens.col = registros[0::4], registros[1::4], registros[2::4], registros[3::4]
+    return tokens
+
+
+def exportar_texto(tokens, ruta):
+    """
+    Guarda tokens en el formato de texto, una línea <TIPO,LEXEMA,FILA,COL> por token.
+
+    Parámetros:
+        tokens (iterable): Tokens a guardar (por ejemplo, los de leer_tokens_binario).
+        ruta (str): Archivo de salida.
+    """
+    with open(ruta, "w", encoding="utf-8") as output_file:
+        for token in tokens:
+            output_file.write(f"{token}\n")
+
+
+#Extensiones de los archivos que escribe lexer() según su formato
+EXTENSIONES_TOKENS = {"texto": "_tokens.txt", "binario": "_tokens.bin"}
+
+
+def lexer(filename, motor="manual", formato="texto"):
+    try:
+        if motor == MOTOR_MMAP:
+            tokens = TokensMapeados.desde_archivo(filename)
+        else:
+            tokens = list(iter_tokens(filename, motor=motor))
+    except FileNotFoundError:
+        print(f"Error: No se encontró el archivo '{filename}'")
+        return
 
-    output_filename = filename.replace(".py", "_tokens.txt")
+    output_filename = filename.replace(".py", EXTENSIONES_TOKENS[formato])
     try:
-        with open(output_filename, "w", encoding="utf-8") as output_file:
-            for token in tokens:
-                output_file.write(token + "\n")
+        if formato == "binario":
+            tokens = escribir_tokens_binario(tokens, output_filename)
+        else:
+            exportar_texto(tokens, output_filename)
         print(f"Tokens guardados en '{output_filename}'")
     except IOError as e:
         print(f"Error al escribir en el archivo '{output_filename}': {e}")
-    return tokens
\ No newline at end of file
+    return tokens
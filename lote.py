@@ -0,0 +1,250 @@
+"""
+Análisis por lotes: lexea y parsea muchos archivos en paralelo con un ProcessPoolExecutor.
+
+Uso:
+    python parser.py RUTA [RUTA ...] [-j TRABAJOS] [--reporte reporte.json] [--cache [DIRECTORIO]]
+    python lote.py RUTA [RUTA ...] [-j TRABAJOS] [--reporte reporte.json] [--cache [DIRECTORIO]]
+
+Cada RUTA puede ser un archivo, un directorio (se recorren sus *.py) o un patrón glob.
+Los archivos *_tokens.bin (ver lexico.escribir_tokens_binario) se parsean sin volver a lexear.
+"""
+import argparse
+import glob
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cache_resultados
+import gramatica_compilada
+import lexico
+import parser as analizador
+
+
+def expandir_rutas(rutas):
+    """
+    Convierte archivos, directorios y patrones glob en una lista ordenada de archivos .py.
+
+    Parámetros:
+        rutas (list): Rutas o patrones indicados por el usuario.
+
+    Retorna:
+        list: Archivos encontrados, sin repetir.
+    """
+    archivos = []
+    for ruta in rutas:
+        if os.path.isdir(ruta):
+            encontrados = glob.glob(os.path.join(ruta, "**", "*.py"), recursive=True)
+        elif os.path.isfile(ruta):
+            encontrados = [ruta]
+        else:
+            encontrados = glob.glob(ruta, recursive=True)
+        archivos.extend(sorted(encontrados))
+    return list(dict.fromkeys(archivos))
+
+
+def analizar_archivo(ruta, motor="regex", recuperar=False, cache=None):
+    """
+    Lexea y parsea un archivo con ASDRTabla, sin escribir archivos de salida ni imprimir.
+
+    Si el archivo es de tokens binario (*_tokens.bin) no se lexea: sus registros se
+    parsean directamente con ASDRCodificado y no se reportan errores léxicos.
+
+    Con una cache (cache_resultados.CacheResultados), un archivo cuyo contenido ya se
+    analizó devuelve el resultado guardado sin lexear ni parsear.
+
+    Parámetros:
+        ruta (str): Archivo a analizar.
+        motor (str): Motor del lexer (ver lexico.MOTORES).
+        recuperar (bool): Si es True, se usa ASDRRecuperacion y se reportan todos los
+            errores sintácticos en la clave errores_sintacticos.
+        cache (CacheResultados): Caché de resultados, o None para no usarla.
+
+    Retorna:
+        dict: Resultado con las claves archivo, aceptado, error, fila, columna, tokens
+        (todos los que produce el lexer, aunque el archivo se rechace antes del final),
+        errores_lexicos, cache (True si salió de la caché) y segundos (y
+        errores_sintacticos si se pidió recuperación).
+    """
+    inicio = time.perf_counter()
+    clave = None
+    if cache is not None:
+        try:
+            with open(ruta, "rb") as f:
+                clave = cache.clave(f.read(), "recuperar" if recuperar else "")
+        except OSError:
+            pass
+        guardado = cache.obtener(clave) if clave is not None else None
+        if guardado is not None:
+            guardado.update(archivo=ruta, cache=True, segundos=time.perf_counter() - inicio)
+            return guardado
+    resultado = {"archivo": ruta, "aceptado": False, "error": None, "fila": None, "columna": None, "tokens": 0}
+    errores_lexicos = []
+    guardar_tokens = clave is not None and cache.guardar_tokens
+    try:
+        binario = ruta.endswith(lexico.EXTENSIONES_TOKENS["binario"])
+        if binario:
+            tokens = lexico.leer_tokens_binario(ruta)
+        elif guardar_tokens:
+            tokens = lexico.codificar(lexico.iter_tokens(ruta, motor=motor, errores=errores_lexicos))
+        else:
+            # Se cuentan los tokens que produce el lexer a medida que el parser los pide
+            contador = itertools.count()
+            tokens = (token for token, _ in zip(lexico.iter_tokens(ruta, motor=motor, errores=errores_lexicos), contador))
+        if recuperar:
+            parser = analizador.ASDRRecuperacion(analizador.gramatica, 'program', tokens=tokens)
+            errores = parser.parse()
+            resultado["errores_sintacticos"] = [{"error": e.mensaje, "fila": e.row, "columna": e.col} for e in errores]
+            if errores:
+                resultado.update(error=errores[0].mensaje, fila=errores[0].row, columna=errores[0].col)
+            else:
+                resultado["aceptado"] = True
+        else:
+            clase = analizador.ASDRCodificado if binario or guardar_tokens else analizador.ASDRTabla
+            parser = clase(analizador.gramatica, 'program', tokens=tokens)
+            try:
+                parser.parse()
+                resultado["aceptado"] = True
+            except SyntaxError as e:
+                token = parser.token_actual()
+                resultado.update(error=str(e), fila=token.row, columna=token.col)
+        if isinstance(tokens, lexico.TokensCodificados):
+            resultado["tokens"] = len(tokens)
+        else:
+            # Un archivo rechazado no se leyó completo: se lexea el resto para contar todos sus tokens
+            for _ in tokens:
+                pass
+            resultado["tokens"] = next(contador)
+    except (OSError, UnicodeDecodeError, ValueError) as e:
+        resultado["error"] = f"Error al leer el archivo: {e}"
+        clave = None
+    resultado["errores_lexicos"] = [str(error) for error in errores_lexicos]
+    resultado["cache"] = False
+    if clave is not None:
+        guardado = {k: v for k, v in resultado.items() if k not in ("archivo", "cache")}
+        cache.guardar(clave, guardado, tokens if guardar_tokens else None)
+    resultado["segundos"] = time.perf_counter() - inicio
+    return resultado
+
+
+_cache_trabajador = None
+
+
+def _inicializar_trabajador(compilada, cache):
+    global _cache_trabajador
+    gramatica_compilada.registrar(compilada)
+    # La caché se recibe una vez por proceso para que su cuenta de tamaño persista entre archivos
+    _cache_trabajador = cache
+
+
+def _analizar_en_trabajador(ruta, motor, recuperar):
+    return analizar_archivo(ruta, motor, recuperar, _cache_trabajador)
+
+
+def analizar_lote(archivos, trabajos=None, motor="regex", recuperar=False, cache=None):
+    """
+    Analiza una lista de archivos repartiéndolos entre varios procesos.
+
+    La gramática se compila una vez en el proceso principal y se entrega a cada
+    trabajador en su inicializador, así que ningún trabajador recalcula los conjuntos.
+
+    Parámetros:
+        archivos (list): Archivos a analizar.
+        trabajos (int): Número de procesos; por defecto, uno por núcleo.
+        motor (str): Motor del lexer (ver lexico.MOTORES).
+        recuperar (bool): Si es True, se reportan todos los errores de cada archivo.
+        cache (CacheResultados): Caché de resultados compartida por todos los procesos.
+
+    Retorna:
+        list: Un resultado de analizar_archivo por archivo, en el mismo orden.
+    """
+    compilada = gramatica_compilada.compilar_gramatica(analizador.gramatica, 'program', gramatica_compilada.RUTA_CACHE)
+    trabajos = trabajos or os.cpu_count() or 1
+    if trabajos == 1 or len(archivos) <= 1:
+        return [analizar_archivo(ruta, motor, recuperar, cache) for ruta in archivos]
+    tamano_lote = max(1, len(archivos) // (trabajos * 8))
+    with ProcessPoolExecutor(max_workers=trabajos, initializer=_inicializar_trabajador, initargs=(compilada, cache)) as ejecutor:
+        return list(ejecutor.map(_analizar_en_trabajador, archivos, [motor] * len(archivos), [recuperar] * len(archivos), chunksize=tamano_lote))
+
+
+def resumir(resultados, segundos):
+    """
+    Construye el reporte agregado de un lote.
+
+    Parámetros:
+        resultados (list): Resultados de analizar_archivo.
+        segundos (float): Tiempo total de pared del lote.
+
+    Retorna:
+        dict: Totales (archivos, aceptados, rechazados, aciertos de caché, tokens, tiempo y
+        tokens por segundo) y resultados por archivo.
+    """
+    tokens = sum(r["tokens"] for r in resultados)
+    aceptados = sum(1 for r in resultados if r["aceptado"])
+    for r in resultados:
+        r["tokens_por_segundo"] = r["tokens"] / r["segundos"] if r["segundos"] else 0.0
+    return {
+        "archivos": len(resultados),
+        "aceptados": aceptados,
+        "rechazados": len(resultados) - aceptados,
+        "aciertos_cache": sum(1 for r in resultados if r.get("cache")),
+        "tokens": tokens,
+        "segundos": segundos,
+        "archivos_por_segundo": len(resultados) / segundos if segundos else 0.0,
+        "tokens_por_segundo": tokens / segundos if segundos else 0.0,
+        "resultados": resultados,
+    }
+
+
+def imprimir_reporte(reporte):
+    for r in reporte["resultados"]:
+        if r["aceptado"]:
+            print(f"✔ {r['archivo']} ({r['tokens']} tokens, {r['tokens_por_segundo']:.0f} tokens/s)")
+        else:
+            print(f"❌ {r['archivo']}: {r['error']}")
+            for e in r.get("errores_sintacticos", [])[1:]:
+                print(f"   {e['error']}")
+    print(f"\n{reporte['archivos']} archivos: {reporte['aceptados']} aceptados, {reporte['rechazados']} rechazados")
+    if reporte["aciertos_cache"]:
+        print(f"{reporte['aciertos_cache']} resultados tomados de la caché")
+    print(f"{reporte['tokens']} tokens en {reporte['segundos']:.3f} s "
+          f"({reporte['archivos_por_segundo']:.1f} archivos/s, {reporte['tokens_por_segundo']:.0f} tokens/s)")
+
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description="Analiza sintácticamente muchos archivos en paralelo.")
+    argumentos.add_argument("rutas", nargs="+", help="archivos, directorios o patrones glob")
+    argumentos.add_argument("-j", "--trabajos", type=int, default=None, help="número de procesos (por defecto, uno por núcleo)")
+    argumentos.add_argument("--motor", choices=sorted(lexico.MOTORES) + [lexico.MOTOR_MMAP], default="regex", help="motor del lexer")
+    argumentos.add_argument("--recuperar", action="store_true", help="continuar tras cada error y reportarlos todos")
+    argumentos.add_argument("--reporte", help="archivo JSON donde guardar el reporte agregado")
+    argumentos.add_argument("--cache", nargs="?", const=cache_resultados.RUTA_CACHE_RESULTADOS, help="reutilizar resultados de archivos ya analizados (directorio de la caché)")
+    argumentos.add_argument("--cache-max", type=int, default=64, help="tamaño máximo de la caché en MB")
+    argumentos.add_argument("--cache-tokens", action="store_true", help="guardar también los tokens en la caché")
+    opciones = argumentos.parse_args(argv)
+
+    archivos = expandir_rutas(opciones.rutas)
+    if not archivos:
+        print("Error: No se encontraron archivos para analizar.")
+        return 2
+
+    cache = None
+    if opciones.cache:
+        cache = cache_resultados.CacheResultados(analizador.gramatica, 'program', opciones.cache,
+                                                 opciones.cache_max << 20, opciones.cache_tokens)
+    inicio = time.perf_counter()
+    resultados = analizar_lote(archivos, opciones.trabajos, opciones.motor, opciones.recuperar, cache)
+    reporte = resumir(resultados, time.perf_counter() - inicio)
+    imprimir_reporte(reporte)
+
+    if opciones.reporte:
+        with open(opciones.reporte, "w", encoding="utf-8") as f:
+            json.dump(reporte, f, ensure_ascii=False, indent=2)
+        print(f"\nReporte guardado en '{opciones.reporte}'")
+    return 0 if reporte["rechazados"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
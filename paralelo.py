@@ -0,0 +1,219 @@
+"""
+Análisis en paralelo de un solo archivo grande, dividido en trozos de sentencias de nivel superior.
+
+Una línea sin indentación cuyo primer token puede iniciar un 'statement' es un punto
+de corte natural: ahí la pila de indentación del lexer vuelve a ser [0] y el parser
+está al comienzo de una sentencia de 'program'. El texto se divide en trozos de tamaño
+parecido en esas líneas y cada trabajador lexea su trozo (con la fila inicial que le
+corresponde, así que filas, columnas y mensajes son los del archivo completo) y lo
+parsea como un 'program' terminado por su propio EOF, que hace de centinela.
+
+Los tokens de los trozos se unen en un solo lexico.TokensCodificados quitando los EOF
+intermedios: los DEDENT que cierra cada trozo tienen la misma posición que los que
+emitiría el lexer al empezar la línea de corte, así que la secuencia es la misma que
+la de un análisis secuencial. Igual que en incremental.py, si el error de un trozo cae
+en su centinela la sentencia continúa en el trozo siguiente, y ambos se vuelven a
+parsear juntos. Con recuperación de errores, los trozos sin errores se aceptan tal
+cual y todo lo que sigue al primer trozo con errores se parsea de forma secuencial,
+porque la sincronización del modo pánico puede cruzar un corte.
+
+Uso:
+    python paralelo.py ARCHIVO [-j TRABAJOS] [--motor regex] [--recuperar] [--trozos N]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import gramatica_compilada
+import lexico
+from parser import ASDRCodificado, ASDRRecuperacion, ResultadoAnalisis, gramatica
+
+#Primer lexema de una línea sin indentación, igual que el patrón 'nombre' del lexer
+_PALABRA = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+def puntos_de_corte(source, cantidad, arranques):
+    """
+    Elige dónde dividir un texto en trozos de tamaño parecido.
+
+    Parámetros:
+        source (str): Código fuente completo.
+        cantidad (int): Cantidad de trozos deseada.
+        arranques (set): Tipos de token que pueden iniciar un 'statement'.
+
+    Retorna:
+        list: Desplazamientos (en caracteres) donde empieza cada trozo; el primero es 0.
+    """
+    cortes = [0]
+    tamano = max(1, len(source) // max(1, cantidad))
+    objetivo = tamano
+    while objetivo < len(source):
+        inicio = source.find("\n", objetivo - 1) + 1
+        while inicio:
+            palabra = _PALABRA.match(source, inicio)
+            if palabra and ("id" if palabra.group() not in lexico.KEYWORDS else palabra.group()) in arranques:
+                break
+            inicio = source.find("\n", inicio) + 1
+        if not inicio or inicio >= len(source):
+            break
+        cortes.append(inicio)
+        objetivo = inicio + tamano
+    return cortes
+
+
+def _analizar_trozo(texto, fila_inicial, ultimo, motor, recuperar):
+    """
+    Lexea y parsea un trozo en un trabajador.
+
+    Retorna:
+        tuple: (arreglos tipo, valor, row y col, textos de la tabla de símbolos, errores
+        léxicos, resultado del parse). El resultado es la lista de ErrorSintactico con
+        recuperación; sin ella, None si el trozo es aceptado o (mensaje, fila, columna,
+        en_centinela).
+    """
+    errores = []
+    tokens = lexico.codificar(lexico.tokens_de_lineas(lexico.lineas_de_texto(texto), motor, errores, True, fila_inicial))
+    if recuperar:
+        resultado = ASDRRecuperacion(gramatica, 'program', tokens=tokens).parse()
+    else:
+        parser = ASDRCodificado(gramatica, 'program', tokens=tokens)
+        try:
+            parser.parse()
+            resultado = None
+        except SyntaxError as e:
+            token = parser.token_actual()
+            resultado = (str(e), token.row, token.col, token.kind == 'EOF' and not ultimo)
+    return (tokens.tipo, tokens.valor, tokens.row, tokens.col), tokens.simbolos.textos, errores, resultado
+
+
+def _unir(trozos, simbolos):
+    """Une arreglos de trozos ya traducidos a la tabla simbolos, quitando los EOF intermedios."""
+    unidos = lexico.TokensCodificados(simbolos)
+    columnas = (unidos.tipo, unidos.valor, unidos.row, unidos.col)
+    for k, arreglos in enumerate(trozos):
+        fin = len(arreglos[0]) - (k + 1 < len(trozos))
+        for destino, origen in zip(columnas, arreglos):
+            destino.extend(origen[:fin] if fin < len(origen) else origen)
+    return unidos
+
+
+def analizar_paralelo(source, trabajos=None, motor="regex", recuperar=False, trozos=None):
+    """
+    Lexea y parsea un código fuente repartiendo sus trozos entre varios procesos.
+
+    Parámetros:
+        source (str): Código fuente a analizar.
+        trabajos (int): Número de procesos; por defecto, uno por núcleo. Con 1 los trozos
+            se analizan en este proceso.
+        motor (str): Motor del lexer (ver lexico.MOTORES).
+        recuperar (bool): Si es True, se usa ASDRRecuperacion y el resultado incluye todos
+            los errores en errores_sintacticos.
+        trozos (int): Cantidad de trozos; por defecto, cuatro por proceso.
+
+    Retorna:
+        ResultadoAnalisis: El mismo resultado que parse_source(source, motor, recuperar=recuperar,
+        codificado=True): tokens (lexico.TokensCodificados), errores léxicos y sintácticos.
+    """
+    if motor not in lexico.MOTORES:
+        raise ValueError(f"Motor desconocido: {motor!r} (opciones: {', '.join(sorted(lexico.MOTORES))})")
+    compilada = gramatica_compilada.compilar_gramatica(gramatica, 'program', gramatica_compilada.RUTA_CACHE)
+    # Las filas de cada trozo se cuentan por '\n', así que \r\n y \r se normalizan antes de cortar
+    source = lexico.normalizar_saltos(source)
+    trabajos = trabajos or os.cpu_count() or 1
+    cortes = puntos_de_corte(source, trozos or trabajos * 4, compilada.primeros['statement'] - {'ε'})
+    limites = list(zip(cortes, cortes[1:] + [len(source)]))
+    filas = [1]
+    for inicio, fin in limites[:-1]:
+        filas.append(filas[-1] + source.count("\n", inicio, fin))
+    argumentos = ([source[inicio:fin] for inicio, fin in limites], filas,
+                  [k + 1 == len(limites) for k in range(len(limites))],
+                  [motor] * len(limites), [recuperar] * len(limites))
+    if trabajos == 1 or len(limites) == 1:
+        resultados = list(map(_analizar_trozo, *argumentos))
+    else:
+        with ProcessPoolExecutor(max_workers=trabajos, initializer=gramatica_compilada.registrar, initargs=(compilada,)) as ejecutor:
+            resultados = list(ejecutor.map(_analizar_trozo, *argumentos))
+
+    # Cada trozo trae su propia tabla de símbolos: sus identificadores se traducen a una común
+    simbolos = lexico.TablaSimbolos()
+    arreglos = []
+    errores_lexicos = []
+    parseos = []
+    for (tipo, valor, row, col), textos, errores, parseo in resultados:
+        traduccion = [simbolos.internar(texto) for texto in textos] + [-1]
+        arreglos.append((tipo, array("i", map(traduccion.__getitem__, valor)), row, col))
+        errores_lexicos.extend(errores)
+        parseos.append(parseo)
+    tokens = _unir(arreglos, simbolos)
+
+    if recuperar:
+        errores = []
+        for k, parseo in enumerate(parseos):
+            if parseo:
+                errores.extend(ASDRRecuperacion(gramatica, 'program', tokens=_unir(arreglos[k:], simbolos), compilada=compilada).parse())
+                break
+        if errores:
+            primero = errores[0]
+            return ResultadoAnalisis(False, primero.mensaje, primero.row, primero.col, tokens, errores_lexicos, None, errores)
+        return ResultadoAnalisis(True, None, None, None, tokens, errores_lexicos, None, errores)
+
+    k = next((k for k, parseo in enumerate(parseos) if parseo is not None), None)
+    if k is None:
+        return ResultadoAnalisis(True, None, None, None, tokens, errores_lexicos)
+    mensaje, fila, columna, en_centinela = parseos[k]
+    fin = k + 1
+    while en_centinela:
+        # La sentencia sigue en el trozo siguiente: se parsean juntos
+        fin += 1
+        parser = ASDRCodificado(gramatica, 'program', tokens=_unir(arreglos[k:fin], simbolos), compilada=compilada)
+        try:
+            parser.parse()
+            en_centinela = False
+            k = next((j for j in range(fin, len(parseos)) if parseos[j] is not None), None)
+            if k is None:
+                return ResultadoAnalisis(True, None, None, None, tokens, errores_lexicos)
+            mensaje, fila, columna, en_centinela = parseos[k]
+            fin = k + 1
+        except SyntaxError as e:
+            token = parser.token_actual()
+            mensaje, fila, columna = str(e), token.row, token.col
+            en_centinela = token.kind == 'EOF' and fin < len(parseos)
+    return ResultadoAnalisis(False, mensaje, fila, columna, tokens, errores_lexicos)
+
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description="Analiza sintácticamente un archivo grande repartiéndolo entre varios procesos.")
+    argumentos.add_argument("archivo", help="archivo a analizar")
+    argumentos.add_argument("-j", "--trabajos", type=int, default=None, help="número de procesos (por defecto, uno por núcleo)")
+    argumentos.add_argument("--motor", choices=sorted(lexico.MOTORES), default="regex", help="motor del lexer")
+    argumentos.add_argument("--recuperar", action="store_true", help="continuar tras cada error y reportarlos todos")
+    argumentos.add_argument("--trozos", type=int, default=None, help="cantidad de trozos (por defecto, cuatro por proceso)")
+    opciones = argumentos.parse_args(argv)
+
+    try:
+        with open(opciones.archivo, "r", encoding="utf-8") as f:
+            source = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"Error al leer el archivo: {e}")
+        return 2
+    inicio = time.perf_counter()
+    resultado = analizar_paralelo(source, opciones.trabajos, opciones.motor, opciones.recuperar, opciones.trozos)
+    segundos = time.perf_counter() - inicio
+    for error in resultado.errores_lexicos:
+        print(error.mensaje)
+    if resultado.aceptado:
+        print(f"✔ {opciones.archivo}: aceptado")
+    else:
+        print(f"❌ {opciones.archivo}: {resultado.error}")
+        for error in (resultado.errores_sintacticos or [])[1:]:
+            print(f"   {error.mensaje}")
+    print(f"{len(resultado.tokens)} tokens en {segundos:.3f} s ({len(resultado.tokens) / segundos if segundos else 0:.0f} tokens/s)")
+    return 0 if resultado.aceptado else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,13 @@
 import lexico
-from collections import defaultdict
+from arbol import ArbolSintactico
+from array import array
+from collections import deque
+from functools import partial
+from itertools import islice
+from typing import NamedTuple, Optional
+from gramatica_compilada import TablaLL1, compilar_gramatica, conflictos_ll1, RUTA_CACHE
+from perfil import PerfilASDR, coincidir_perfilado, crear_funcion_perfilada
+from generar_parser import cargar_parser_generado
 
 gramatica = {
     'program': [
@@ -126,51 +134,125 @@ gramatica = {
     ]
 }
 
+def _valor_visible(valor):
+    """Devuelve el lexema tal como se muestra en los mensajes de error (sin comillas externas)."""
+    valor = valor.strip()
+    if valor[:1] in ('"', "'") and valor.endswith(valor[0]):
+        return valor[1:-1]
+    return valor
+
+_TOKEN_FIN = lexico.Token('EOF', '', 0, 0)
+
+class FlujoTokens:
+    """
+    Buffer de anticipación sobre una fuente de tokens.
+
+    Los tokens se extraen bajo demanda de cualquier iterable (una lista o el
+    generador lexico.iter_tokens), por lo que el parser no necesita tener la
+    entrada completa en memoria. Agotada la fuente, el token actual es EOF.
+    """
+    __slots__ = ('_fuente', '_pendientes', 'actual')
+
+    def __init__(self, tokens):
+        self._fuente = iter(tokens)
+        self._pendientes = deque()
+        self.actual = next(self._fuente, _TOKEN_FIN)
+
+    def avanzar(self):
+        if self._pendientes:
+            self.actual = self._pendientes.popleft()
+        else:
+            self.actual = next(self._fuente, _TOKEN_FIN)
+
+    def ver(self, k=0):
+        """Devuelve el token k posiciones adelante del actual sin consumirlo."""
+        if k == 0:
+            return self.actual
+        while len(self._pendientes) < k:
+            self._pendientes.append(next(self._fuente, _TOKEN_FIN))
+        return self._pendientes[k - 1]
+
 class ASDR:
-    def __init__(self, gramatica, simbolo_inicial, tokens_types, tokens_info):
+    def __init__(self, gramatica, simbolo_inicial, tokens_types=None, tokens_info=None, tokens=None, iterativo=False, ruta_cache=None, compilada=None, perfil=False):
         self.gramatica = gramatica
         self.inicial = simbolo_inicial
-        self.primeros = defaultdict(set)
-        self.siguientes = defaultdict(set)
-        self.predicciones = defaultdict(list)
-        self._calcular_primeros()
-        self._calcular_siguientes()
-        self._calcular_predicciones()
-        self.tokens = tokens_types
-        self.token_info = tokens_info
+        self.iterativo = iterativo
+        # Quien crea muchos parsers seguidos puede pasar la gramática ya compilada y evitar calcular su huella
+        self.compilada = compilada or compilar_gramatica(gramatica, simbolo_inicial, ruta_cache)
+        self.primeros = self.compilada.primeros
+        self.siguientes = self.compilada.siguientes
+        self.predicciones = self.compilada.predicciones
+        if tokens is None:
+            tokens = (lexico.Token(tipo, valor, fila, col) for tipo, (valor, fila, col) in zip(tokens_types, tokens_info))
+        self.flujo = FlujoTokens(tokens)
         self.pos = 0
-        for nt in self.gramatica:
-            setattr(self, nt, self._crear_funcion(nt))
+        # El perfil es opcional: sin él se instalan las funciones sin instrumentar
+        self.perfil = PerfilASDR(self.predicciones) if perfil else None
+        self._instalar_funciones()
+
+    def _instalar_funciones(self):
+        # Las funciones por no terminal reciben el parser como argumento, así que se
+        # generan una vez por gramática y modo y se comparten entre instancias.
+        if self.perfil is not None:
+            crear = partial(crear_funcion_perfilada, iterativo=self.iterativo)
+            clave = ('perfil', self.iterativo)
+            self.coincidir = coincidir_perfilado(self, self.coincidir)
+        else:
+            crear = self._crear_funcion_iterativa if self.iterativo else self._crear_funcion
+            clave = crear
+        funciones = self.compilada.funciones.get(clave)
+        if funciones is None:
+            funciones = {}
+            for nt in self.gramatica:
+                funciones[nt] = crear(self.compilada, nt, funciones)
+            self.compilada.funciones[clave] = funciones
+        self.funciones = funciones
+
+    def __getattr__(self, nombre):
+        funciones = self.__dict__.get('funciones')
+        if funciones is not None and nombre in funciones:
+            return partial(funciones[nombre], self)
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{nombre}'")
+
+    def token_actual(self):
+        return self.flujo.actual
 
     def token_actual_type(self):
-        return self.tokens[self.pos] if self.pos < len(self.tokens) else 'EOF'
+        return self.flujo.actual.kind
 
     def token_actual_info(self):
-        return self.token_info[self.pos] if self.pos < len(self.token_info) else ('', 0, 0)
+        token = self.token_actual()
+        return _valor_visible(token.value), token.row, token.col
 
     def parse(self):
         try:
-            getattr(self, self.inicial)()
-            if self.token_actual_type() == 'EOF':
-                pass
-            else:
-                value, row, col = self.token_actual_info()
-                found_str = f"“{self.token_actual_type()}”"
-                if value:
-                     found_str = f"“{self.token_actual_type()} ({value})”"
-                raise SyntaxError(f"<{row},{col}> Error sintactico: Sobran símbolos tras el análisis. Se encontró: {found_str}.")
+            self._derivar()
+            if self.token_actual_type() != 'EOF':
+                raise self._error_sobrantes()
         except SyntaxError as e:
             raise e
         except Exception as e:
             value, row, col = self.token_actual_info()
             raise SyntaxError(f"<{row},{col}> Error interno del parser: {e}")
 
+    def _derivar(self):
+        self.funciones[self.inicial](self)
+
+    def _error_sobrantes(self):
+        """Error para los tokens que quedan después de derivar el símbolo inicial."""
+        value, row, col = self.token_actual_info()
+        found_str = f"“{self.token_actual_type()}”"
+        if value:
+             found_str = f"“{self.token_actual_type()} ({value})”"
+        return SyntaxError(f"<{row},{col}> Error sintactico: Sobran símbolos tras el análisis. Se encontró: {found_str}.")
+
     def coincidir(self, terminal):
         actual_type = self.token_actual_type()
-        value, row, col = self.token_actual_info()
         if actual_type == terminal:
+            self.flujo.avanzar()
             self.pos += 1
         else:
+            value, row, col = self.token_actual_info()
             expected_str = f"“{terminal}”"
             found_str = f"“{actual_type}”"
             if value:
@@ -180,116 +262,17 @@ class ASDR:
     def es_terminal(self, simbolo):
         return simbolo not in self.gramatica and simbolo != '[]'
 
-    def _calcular_primeros(self):
-        cambiado = True
-        while cambiado:
-            cambiado = False
-            for nt, producciones in self.gramatica.items():
-                for prod in producciones:
-                    if prod == []:
-                        if 'ε' not in self.primeros[nt]:
-                            self.primeros[nt].add('ε')
-                            cambiado = True
-                        continue
-                    i = 0
-                    bloque_deriva_epsilon = True
-                    while i < len(prod) and bloque_deriva_epsilon:
-                        simbolo = prod[i]
-                        bloque_deriva_epsilon = False
-                        if self.es_terminal(simbolo):
-                            if simbolo not in self.primeros[nt]:
-                                self.primeros[nt].add(simbolo)
-                                cambiado = True
-                            break
-                        else:
-                            antes = len(self.primeros[nt])
-                            self.primeros[nt].update(self.primeros[simbolo] - {'ε'})
-                            if len(self.primeros[nt]) > antes:
-                                cambiado = True
-                            if 'ε' in self.primeros[simbolo]:
-                                bloque_deriva_epsilon = True
-                                i += 1
-                            else:
-                                break
-                    if i == len(prod) and bloque_deriva_epsilon:
-                        if 'ε' not in self.primeros[nt]:
-                            self.primeros[nt].add('ε')
-                            cambiado = True
-
-    def _calcular_siguientes(self):
-        cambiado = True
-        self.siguientes[self.inicial].add('EOF')
-        while cambiado:
-            cambiado = False
-            for nt, producciones in self.gramatica.items():
-                for prod in producciones:
-                    len_prod = len(prod)
-                    for i, simbolo_actual in enumerate(prod):
-                        if simbolo_actual in self.gramatica:
-                            siguientes_en_prod = set()
-                            j = i + 1
-                            puede_derivar_epsilon_cola = True
-                            while j < len_prod and puede_derivar_epsilon_cola:
-                                siguiente_simbolo = prod[j]
-                                puede_derivar_epsilon_cola = False
-                                if self.es_terminal(siguiente_simbolo):
-                                    if siguiente_simbolo not in siguientes_en_prod:
-                                        siguientes_en_prod.add(siguiente_simbolo)
-                                    break
-                                else:
-                                    antes = len(siguientes_en_prod)
-                                    siguientes_en_prod.update(self.primeros[siguiente_simbolo] - {'ε'})
-                                    if len(siguientes_en_prod) > antes:
-                                         pass
-                                    if 'ε' in self.primeros[siguiente_simbolo]:
-                                        puede_derivar_epsilon_cola = True
-                                        j += 1
-                                    else:
-                                        break
-                            antes = len(self.siguientes[simbolo_actual])
-                            self.siguientes[simbolo_actual].update(siguientes_en_prod)
-                            if len(self.siguientes[simbolo_actual]) > antes:
-                                cambiado = True
-                            if j == len_prod and puede_derivar_epsilon_cola:
-                                antes = len(self.siguientes[simbolo_actual])
-                                self.siguientes[simbolo_actual].update(self.siguientes[nt])
-                                if len(self.siguientes[simbolo_actual]) > antes:
-                                    cambiado = True
-
-    def _calcular_predicciones(self):
-        for nt, producciones in self.gramatica.items():
-            for prod in producciones:
-                pred = set()
-                if prod == []:
-                    pred.update(self.siguientes[nt])
-                else:
-                    i = 0
-                    deriva_epsilon_prefijo = True
-                    while i < len(prod) and deriva_epsilon_prefijo:
-                        simbolo = prod[i]
-                        deriva_epsilon_prefijo = False
-                        if self.es_terminal(simbolo):
-                            if simbolo not in pred:
-                                pred.add(simbolo)
-                            break
-                        else:
-                            pred.update(self.primeros[simbolo] - {'ε'})
-                            if 'ε' in self.primeros[simbolo]:
-                                deriva_epsilon_prefijo = True
-                                i += 1
-                            else:
-                                break
-                    if i == len(prod) and deriva_epsilon_prefijo:
-                        pred.update(self.siguientes[nt])
-                self.predicciones[nt].append((prod, pred))
-
-    def _crear_funcion(self, nt):
-        def funcion():
-            actual_type = self.token_actual_type()
-            value, row, col = self.token_actual_info()
+    @staticmethod
+    def _crear_funcion(compilada, nt, funciones):
+        predicciones = compilada.predicciones[nt]
+        es_terminal = compilada.es_terminal
+        def funcion(parser):
+            token = parser.token_actual()
+            actual_type = token.kind
+            row, col = token.row, token.col
             opcion_encontrada = False
             expected_tokens = set()
-            for produccion, pred in self.predicciones[nt]:
+            for produccion, pred in predicciones:
                 expected_tokens.update(pred)
                 if actual_type in pred:
                     opcion_encontrada = True
@@ -297,25 +280,78 @@ class ASDR:
                         for s in produccion:
                             if s == '[]':
                                 pass
-                            elif self.es_terminal(s):
-                                self.coincidir(s)
+                            elif es_terminal(s):
+                                parser.coincidir(s)
                             else:
-                                getattr(self, s)()
+                                funciones[s](parser)
                         return
                     except SyntaxError as e:
                          raise e
                     except Exception as e:
                          raise SyntaxError(f"<{row},{col}> Error interno procesando producción {nt} → {' '.join(produccion) if produccion else 'ε'}: {e}")
             if not opcion_encontrada:
-                 found_str = f"“{actual_type}”"
-                 if value:
-                      found_str = f"“{actual_type} ({value})”"
-                 expected_str_list = [f"“{t}”" for t in sorted(list(expected_tokens))]
-                 expected_str = ", ".join(expected_str_list)
-                 raise SyntaxError(f"<{row},{col}> Error sintactico: Se encontró: {found_str}; se esperaba uno de: {expected_str}.")
+                 raise parser._error_prediccion(token, expected_tokens)
         funcion.__name__ = f"parse_{nt}"
         return funcion
 
+    @staticmethod
+    def _crear_funcion_iterativa(compilada, nt_inicial, funciones):
+        """
+        Igual que _crear_funcion, pero cuando el último símbolo de la producción elegida
+        es un no terminal lo expande en el mismo ciclo en lugar de llamar a su función.
+
+        Así las reglas recursivas por la derecha (program, suite_cont, expression',
+        argument_list_cont, ...) no agregan un nivel de pila de Python por cada
+        sentencia u operando, y la profundidad solo depende del anidamiento.
+        """
+        es_terminal = compilada.es_terminal
+        opciones = {}
+        for nt, lista in compilada.predicciones.items():
+            opciones[nt] = []
+            for produccion, pred in lista:
+                if produccion and produccion[-1] in compilada.gramatica:
+                    opciones[nt].append((produccion, pred, produccion[:-1], produccion[-1]))
+                else:
+                    opciones[nt].append((produccion, pred, produccion, None))
+
+        def funcion(parser):
+            nt = nt_inicial
+            while nt is not None:
+                token = parser.token_actual()
+                actual_type = token.kind
+                row, col = token.row, token.col
+                expected_tokens = set()
+                for produccion, pred, cuerpo, cola in opciones[nt]:
+                    expected_tokens.update(pred)
+                    if actual_type in pred:
+                        break
+                else:
+                    raise parser._error_prediccion(token, expected_tokens)
+                try:
+                    for s in cuerpo:
+                        if s == '[]':
+                            pass
+                        elif es_terminal(s):
+                            parser.coincidir(s)
+                        else:
+                            funciones[s](parser)
+                except SyntaxError as e:
+                     raise e
+                except Exception as e:
+                     raise SyntaxError(f"<{row},{col}> Error interno procesando producción {nt} → {' '.join(produccion) if produccion else 'ε'}: {e}")
+                nt = cola
+        funcion.__name__ = f"parse_{nt_inicial}"
+        return funcion
+
+    def _error_prediccion(self, token, expected_tokens):
+        value = _valor_visible(token.value)
+        found_str = f"“{token.kind}”"
+        if value:
+             found_str = f"“{token.kind} ({value})”"
+        expected_str_list = [f"“{t}”" for t in sorted(list(expected_tokens))]
+        expected_str = ", ".join(expected_str_list)
+        return SyntaxError(f"<{token.row},{token.col}> Error sintactico: Se encontró: {found_str}; se esperaba uno de: {expected_str}.")
+
     def mostrar_conjuntos(self):
         print("PRIMEROS:")
         for nt, s in sorted(self.primeros.items()):
@@ -328,7 +364,567 @@ class ASDR:
             for produccion, pred in lista:
                 print(f"  {nt} → {' '.join(produccion) if produccion else 'ε'}: {sorted(list(pred))}")
 
-def main_analisis_sintactico(archivo_entrada_py, archivo_salida_txt):
+class ASDRTabla(ASDR):
+    """
+    Variante de ASDR dirigida por una TablaLL1 con una pila explícita.
+
+    Acepta el mismo lenguaje y produce los mismos SyntaxError que ASDR, pero no
+    genera una función por no terminal: cada paso es una consulta a la tabla, y el
+    conjunto de tokens esperados solo se calcula cuando se informa un error.
+    """
+    def _instalar_funciones(self):
+        if self.perfil is not None:
+            raise ValueError("El perfil por no terminal solo está disponible en ASDR")
+        self.tabla = self.compilada.tabla
+
+    def _derivar(self):
+        tabla = self.tabla
+        entradas, cuerpos, ancho = tabla.entradas, tabla.cuerpos, tabla.ancho
+        id_terminal, desconocido = tabla.id_terminal, tabla.desconocido
+        flujo = self.flujo
+        token = flujo.actual
+        t = id_terminal.get(token.kind, desconocido)
+        pila = [tabla.inicial]
+        while pila:
+            x = pila.pop()
+            if x >= 0:
+                if x != t:
+                    self.coincidir(tabla.terminales[x])
+                flujo.avanzar()
+                self.pos += 1
+                token = flujo.actual
+                t = id_terminal.get(token.kind, desconocido)
+            else:
+                id_prod = entradas[(-1 - x) * ancho + t]
+                if id_prod < 0:
+                    nt = tabla.no_terminales[-1 - x]
+                    esperados = set()
+                    for _, pred in self.predicciones[nt]:
+                        esperados.update(pred)
+                    raise self._error_prediccion(token, esperados)
+                pila.extend(cuerpos[id_prod])
+
+class ASDRCodificado(ASDRTabla):
+    """
+    Variante de ASDRTabla que recorre directamente los arreglos de lexico.TokensCodificados.
+
+    El código de tipo de cada token se traduce a su código de terminal con una lista,
+    así que el análisis compara solo enteros y no crea ningún Token; los tokens se
+    reconstruyen únicamente para informar un error o consultar el token actual al
+    terminar. Acepta el mismo lenguaje y produce los mismos SyntaxError que ASDRTabla.
+    """
+    def __init__(self, gramatica, simbolo_inicial, tokens, **opciones):
+        if not isinstance(tokens, lexico.TokensCodificados):
+            tokens = lexico.codificar(tokens)
+        self.codificados = tokens
+        super().__init__(gramatica, simbolo_inicial, tokens=(), **opciones)
+        self._ubicar(0)
+
+    def _ubicar(self, pos):
+        self.pos = pos
+        self.flujo = FlujoTokens(self.codificados.desde(pos))
+
+    def _derivar(self):
+        tabla = self.tabla
+        entradas, cuerpos, ancho = tabla.entradas, tabla.cuerpos, tabla.ancho
+        traduccion = tabla.traducir(self.codificados.tipos)
+        fin = tabla.id_terminal.get('EOF', tabla.desconocido)
+        codigos = self.codificados.tipo
+        n = len(codigos)
+        pos = self.pos
+        t = traduccion[codigos[pos]] if pos < n else fin
+        pila = [tabla.inicial]
+        try:
+            while pila:
+                x = pila.pop()
+                if x >= 0:
+                    if x != t:
+                        self._ubicar(pos)
+                        self.coincidir(tabla.terminales[x])
+                    pos += 1
+                    t = traduccion[codigos[pos]] if pos < n else fin
+                else:
+                    id_prod = entradas[(-1 - x) * ancho + t]
+                    if id_prod < 0:
+                        self._ubicar(pos)
+                        nt = tabla.no_terminales[-1 - x]
+                        esperados = set()
+                        for _, pred in self.predicciones[nt]:
+                            esperados.update(pred)
+                        raise self._error_prediccion(self.flujo.actual, esperados)
+                    pila.extend(cuerpos[id_prod])
+        finally:
+            self._ubicar(pos)
+
+class ASDRArbol(ASDRTabla):
+    """
+    Variante de ASDRTabla que además construye un ArbolSintactico.
+
+    Cada expansión de un no terminal y cada terminal consumido se registra como un
+    nodo en los arreglos del árbol (self.arbol), que queda disponible incluso si el
+    análisis termina con error (con los nodos construidos hasta ese punto).
+    """
+    def _derivar(self):
+        tabla = self.tabla
+        entradas, cuerpos, ancho = tabla.entradas, tabla.cuerpos, tabla.ancho
+        id_terminal, desconocido = tabla.id_terminal, tabla.desconocido
+        arbol = self.arbol = ArbolSintactico(tabla)
+        simbolo, padre, primer_hijo, siguiente, token_nodo, tokens = arbol.simbolo, arbol.padre, arbol.primer_hijo, arbol.siguiente, arbol.token, arbol.tokens
+        sin_enlace = [array('i', [-1]) * k for k in range(max(map(len, cuerpos), default=0) + 1)]
+        flujo = self.flujo
+        token = flujo.actual
+        t = id_terminal.get(token.kind, desconocido)
+        pila = [tabla.inicial]
+        nodos = [arbol.agregar(tabla.inicial, -1)]
+        while pila:
+            x = pila.pop()
+            nodo = nodos.pop()
+            if x >= 0:
+                if x != t:
+                    self.coincidir(tabla.terminales[x])
+                token_nodo[nodo] = len(tokens)
+                tokens.append(token)
+                flujo.avanzar()
+                self.pos += 1
+                token = flujo.actual
+                t = id_terminal.get(token.kind, desconocido)
+            else:
+                id_prod = entradas[(-1 - x) * ancho + t]
+                if id_prod < 0:
+                    nt = tabla.no_terminales[-1 - x]
+                    esperados = set()
+                    for _, pred in self.predicciones[nt]:
+                        esperados.update(pred)
+                    raise self._error_prediccion(token, esperados)
+                cuerpo = cuerpos[id_prod]
+                k = len(cuerpo)
+                if k:
+                    # Los hijos se agregan en orden (el cuerpo está invertido) y se apilan al revés
+                    n = len(simbolo)
+                    simbolo.extend(reversed(cuerpo))
+                    padre.extend([nodo] * k)
+                    primer_hijo.extend(sin_enlace[k])
+                    siguiente.extend(range(n + 1, n + k))
+                    siguiente.append(-1)
+                    token_nodo.extend(sin_enlace[k])
+                    primer_hijo[nodo] = n
+                    pila.extend(cuerpo)
+                    nodos.extend(range(n + k - 1, n - 1, -1))
+
+class ErrorSintactico(NamedTuple):
+    """
+    Error sintáctico registrado durante un análisis con recuperación.
+
+    Atributos:
+        mensaje (str): Mensaje del error, igual al del SyntaxError que lanzaría ASDR.
+        row (int): Fila del token donde se detectó.
+        col (int): Columna del token donde se detectó.
+    """
+    mensaje: str
+    row: int
+    col: int
+
+    def __str__(self):
+        return self.mensaje
+
+class ASDRRecuperacion(ASDRTabla):
+    """
+    Variante de ASDRTabla que se recupera de los errores (modo pánico) y los reporta todos.
+
+    parse() no lanza SyntaxError: devuelve la lista de ErrorSintactico, que también
+    queda en self.errores. El primer error es siempre el mismo que reporta ASDR.
+
+    Recuperación:
+        - Si falta un terminal, se registra el error y se supone insertado.
+        - Si un no terminal no tiene producción para el token actual, se descartan
+          tokens hasta encontrar uno de sus PRIMEROS (se reintenta) o de sus
+          SIGUIENTES (se abandona el no terminal).
+        - Un DEDENT, o un token que inicia una sentencia al comienzo de una línea,
+          también sincroniza: se abandona todo hasta la lista de sentencias más
+          cercana en la pila (program o suite_cont).
+        - No se registra un nuevo error sin haber consumido algún token desde el anterior.
+    """
+    def parse(self):
+        self.errores = []
+        self._pos_ultimo_error = -1
+        try:
+            self._derivar()
+            # Como en ASDR, los tokens que siguen al final del programa son un error
+            if self.token_actual_type() != 'EOF':
+                self._registrar(self._error_sobrantes(), self.token_actual())
+        except Exception as e:
+            token = self.token_actual()
+            self._registrar(SyntaxError(f"<{token.row},{token.col}> Error interno del parser: {e}"), token)
+        return self.errores
+
+    def _registrar(self, error, token):
+        if self.pos == self._pos_ultimo_error:
+            return
+        self._pos_ultimo_error = self.pos
+        self.errores.append(ErrorSintactico(str(error), token.row, token.col))
+
+    def _derivar(self):
+        tabla = self.tabla
+        entradas, cuerpos, ancho = tabla.entradas, tabla.cuerpos, tabla.ancho
+        id_terminal, desconocido = tabla.id_terminal, tabla.desconocido
+        primeros, siguientes = self.primeros, self.siguientes
+        arranques = primeros.get('statement', set())
+        listas = {tabla.id_simbolo(nt) for nt, producciones in self.gramatica.items()
+                  if any(prod[:1] == ['statement'] and prod[-1] == nt for prod in producciones)}
+        flujo = self.flujo
+        token = flujo.actual
+        t = id_terminal.get(token.kind, desconocido)
+        fila_anterior = 0
+        pila = [tabla.inicial]
+        while pila:
+            x = pila.pop()
+            if x >= 0:
+                if x == t:
+                    fila_anterior = token.row
+                    flujo.avanzar()
+                    self.pos += 1
+                    token = flujo.actual
+                    t = id_terminal.get(token.kind, desconocido)
+                else:
+                    try:
+                        self.coincidir(tabla.terminales[x])
+                    except SyntaxError as e:
+                        self._registrar(e, token)
+                continue
+            id_prod = entradas[(-1 - x) * ancho + t]
+            if id_prod >= 0:
+                pila.extend(cuerpos[id_prod])
+                continue
+            nt = tabla.no_terminales[-1 - x]
+            esperados = set()
+            for _, pred in self.predicciones[nt]:
+                esperados.update(pred)
+            self._registrar(self._error_prediccion(token, esperados), token)
+            while True:
+                kind = token.kind
+                if kind in siguientes[nt]:
+                    break
+                if kind in primeros[nt]:
+                    pila.append(x)
+                    break
+                if kind == 'DEDENT' or (token.row != fila_anterior and kind in arranques):
+                    destino = next((i for i in range(len(pila) - 1, -1, -1) if pila[i] in listas), -1)
+                    if destino >= 0:
+                        del pila[destino + 1:]
+                        break
+                if kind == 'EOF':
+                    pila.clear()
+                    break
+                fila_anterior = token.row
+                flujo.avanzar()
+                self.pos += 1
+                token = flujo.actual
+                t = id_terminal.get(token.kind, desconocido)
+
+class ASDRGenerado(ASDR):
+    """
+    Variante de ASDR que usa el parser especializado que genera generar_parser.py.
+
+    Las funciones parse_<nt> no interpretan la gramática: se generan como código
+    (con la elección de producción y los terminales resueltos de antemano) y se
+    importan del módulo generado, que se regenera cuando cambia la huella de la
+    gramática. Acepta el mismo lenguaje y produce los mismos SyntaxError que ASDR.
+    """
+    def _instalar_funciones(self):
+        if self.perfil is not None:
+            raise ValueError("El perfil por no terminal solo está disponible en ASDR")
+        self.funciones = cargar_parser_generado(self.compilada).FUNCIONES
+
+class ASDRMemo(ASDR):
+    """
+    Variante de ASDR para gramáticas que no son LL(1): retrocede con memoria (packrat).
+
+    Los conflictos se detectan a partir de las predicciones (ver conflictos_ll1). Donde
+    el token actual es predicho por una sola producción el análisis es el de ASDR y
+    produce sus mismos SyntaxError; donde lo predicen varias, se prueban en orden y se
+    queda la primera que tiene éxito (elección ordenada, como en una PEG: una alternativa
+    que tuvo éxito no se reconsidera aunque lo que sigue falle).
+
+    Mientras hay alternativas pendientes, el resultado de cada (no terminal, posición)
+    se guarda en una tabla de memoria, así que ningún no terminal se analiza dos veces
+    en la misma posición y el tiempo sigue siendo lineal. La tabla guarda como máximo
+    max_memo entradas: al llenarse se descarta la mitad más antigua, que corresponde a
+    las posiciones más atrasadas. Si todas las alternativas fallan, el error es el del
+    punto más lejano al que llegó alguna.
+
+    Atributos:
+        conflictos (dict): Conflictos LL(1) de la gramática (ver conflictos_ll1).
+        estadisticas (dict): Consultas y aciertos de la memoria, entradas guardadas y
+            expulsadas, máximo de entradas simultáneas y alternativas descartadas.
+    """
+    def __init__(self, gramatica, simbolo_inicial, tokens_types=None, tokens_info=None, tokens=None, max_memo=1 << 16, **opciones):
+        if tokens is None:
+            tokens = (lexico.Token(tipo, valor, fila, col) for tipo, (valor, fila, col) in zip(tokens_types, tokens_info))
+        # El retroceso necesita acceso por posición, así que los tokens se guardan en una lista
+        self.tokens = list(tokens)
+        self.max_memo = max_memo
+        super().__init__(gramatica, simbolo_inicial, tokens=self.tokens, **opciones)
+
+    def _instalar_funciones(self):
+        if self.perfil is not None:
+            raise ValueError("El perfil por no terminal solo está disponible en ASDR")
+        opciones = self.compilada.funciones.get('memo')
+        if opciones is None:
+            opciones = self.compilada.funciones['memo'] = self._crear_opciones(self.compilada)
+        self._opciones, self._esperados, self.conflictos = opciones
+
+    @staticmethod
+    def _crear_opciones(compilada):
+        """
+        Prepara, por no terminal, las producciones candidatas para cada terminal.
+
+        Cada candidata es (cuerpo, cola): si la producción termina en un no terminal,
+        la cola se expande en el mismo ciclo (como en el modo iterativo de ASDR).
+        """
+        opciones, esperados = {}, {}
+        for nt, lista in compilada.predicciones.items():
+            por_terminal = {}
+            for produccion, pred in lista:
+                cuerpo = [s for s in produccion if s != '[]']
+                if cuerpo and cuerpo[-1] in compilada.gramatica:
+                    candidata = (tuple(cuerpo[:-1]), cuerpo[-1])
+                else:
+                    candidata = (tuple(cuerpo), None)
+                for terminal in pred:
+                    por_terminal.setdefault(terminal, []).append(candidata)
+            opciones[nt] = {terminal: tuple(candidatas) for terminal, candidatas in por_terminal.items()}
+            esperados[nt] = set().union(*(pred for _, pred in lista))
+        return opciones, esperados, conflictos_ll1(compilada.predicciones)
+
+    def _ubicar(self, pos):
+        self.pos = pos
+        self.flujo = FlujoTokens(islice(self.tokens, pos, None))
+
+    def _derivar(self):
+        self._tipos = [token.kind for token in self.tokens] + ['EOF']
+        self._memo = {}
+        self._alternativas = 0
+        self._fallo = None
+        self.estadisticas = dict.fromkeys(('consultas', 'aciertos', 'guardadas', 'expulsadas', 'maximo', 'descartadas'), 0)
+        try:
+            self._ubicar(self._analizar(self.inicial, 0))
+        finally:
+            self._memo = {}
+
+    def _fallar(self, pos, terminal=None, nt=None):
+        """Registra un fallo en pos; sin alternativas pendientes lanza el SyntaxError de ASDR."""
+        if self._alternativas:
+            if self._fallo is None or pos > self._fallo[0]:
+                self._fallo = (pos, terminal, nt)
+            return -1
+        self._lanzar(pos, terminal, nt)
+
+    def _lanzar(self, pos, terminal, nt):
+        self._ubicar(pos)
+        if terminal is not None:
+            self.coincidir(terminal)
+        raise self._error_prediccion(self.token_actual(), self._esperados[nt])
+
+    def _secuencia(self, cuerpo, pos):
+        """Analiza los símbolos de cuerpo desde pos; devuelve la posición final o -1."""
+        tipos, opciones = self._tipos, self._opciones
+        for s in cuerpo:
+            if s in opciones:
+                pos = self._analizar(s, pos)
+                if pos < 0:
+                    return -1
+            elif tipos[pos] == s:
+                pos += 1
+            else:
+                return self._fallar(pos, terminal=s)
+        return pos
+
+    def _analizar(self, nt, pos):
+        """Analiza nt desde pos; devuelve la posición donde termina o -1 si falla."""
+        memo, estadisticas = self._memo, self.estadisticas
+        especulando = self._alternativas > 0
+        if especulando:
+            # Cada llamada lleva su propio fallo más lejano, que se guarda con su resultado
+            anterior, self._fallo = self._fallo, None
+        claves = []
+        while True:
+            if especulando:
+                clave = (nt, pos)
+                estadisticas['consultas'] += 1
+                guardado = memo.get(clave)
+                if guardado is not None:
+                    estadisticas['aciertos'] += 1
+                    resultado = guardado if isinstance(guardado, int) else self._fallar(*guardado)
+                    break
+                claves.append(clave)
+            candidatas = self._opciones[nt].get(self._tipos[pos])
+            if candidatas is None:
+                resultado = self._fallar(pos, nt=nt)
+                break
+            if len(candidatas) == 1:
+                cuerpo, cola = candidatas[0]
+                fin = self._secuencia(cuerpo, pos)
+                if fin < 0 or cola is None:
+                    resultado = fin
+                    break
+                nt, pos = cola, fin
+                continue
+            # Conflicto LL(1): elección ordenada entre las candidatas
+            if not especulando:
+                self._fallo = None
+            self._alternativas += 1
+            try:
+                for cuerpo, cola in candidatas:
+                    resultado = self._secuencia(cuerpo, pos)
+                    if resultado >= 0 and cola is not None:
+                        resultado = self._analizar(cola, resultado)
+                    if resultado >= 0:
+                        break
+                    estadisticas['descartadas'] += 1
+            finally:
+                self._alternativas -= 1
+            if resultado < 0 and not especulando:
+                self._lanzar(*self._fallo)
+            break
+        if especulando:
+            propio = self._fallo
+            if anterior is not None and (propio is None or anterior[0] >= propio[0]):
+                self._fallo = anterior
+            guardado = resultado if resultado >= 0 else propio
+            for clave in claves:
+                memo[clave] = guardado
+            estadisticas['guardadas'] += len(claves)
+            if len(memo) > self.max_memo:
+                # Las entradas más antiguas son las de las posiciones más atrasadas
+                expulsadas = list(islice(memo, len(memo) // 2))
+                for clave in expulsadas:
+                    del memo[clave]
+                estadisticas['expulsadas'] += len(expulsadas)
+            estadisticas['maximo'] = max(estadisticas['maximo'], len(memo))
+        return resultado
+
+class ResultadoAnalisis(NamedTuple):
+    """
+    Resultado de analizar un código fuente en memoria.
+
+    Atributos:
+        aceptado (bool): True si el código pertenece al lenguaje.
+        error (str): Mensaje del error sintáctico, o None si fue aceptado.
+        fila (int): Fila del error sintáctico, o None.
+        columna (int): Columna del error sintáctico, o None.
+        tokens (list): Tokens producidos por el lexer (lexico.TokensCodificados si se pidió codificado).
+        errores_lexicos (list): Errores léxicos (lexico.ErrorLexico) encontrados.
+        arbol (ArbolSintactico): Árbol sintáctico, si se pidió construirlo.
+        errores_sintacticos (list): Todos los errores sintácticos (ErrorSintactico), si se pidió recuperación.
+    """
+    aceptado: bool
+    error: Optional[str]
+    fila: Optional[int]
+    columna: Optional[int]
+    tokens: list
+    errores_lexicos: list
+    arbol: Optional[ArbolSintactico] = None
+    errores_sintacticos: Optional[list] = None
+
+def parse_source(source, motor="regex", clase_parser=None, construir_arbol=False, recuperar=False, codificado=False):
+    """
+    Lexea y parsea código fuente en memoria, sin leer ni escribir archivos ni imprimir.
+
+    Parámetros:
+        source (str): Código fuente a analizar.
+        motor (str): Motor del lexer (ver lexico.MOTORES).
+        clase_parser (type): Parser a usar; por defecto ASDRTabla, o ASDRArbol si se
+            construye el árbol, o ASDRRecuperacion si se pide recuperación.
+        construir_arbol (bool): Si es True, el resultado incluye el ArbolSintactico.
+        recuperar (bool): Si es True, el análisis continúa tras cada error y el resultado
+            incluye todos los errores en errores_sintacticos.
+        codificado (bool): Si es True, los tokens del resultado son lexico.TokensCodificados
+            (con su tabla de símbolos) y, por defecto, se parsean con ASDRCodificado.
+
+    Retorna:
+        ResultadoAnalisis: Resultado del análisis; error, fila y columna son los del primer error.
+    """
+    errores_lexicos = []
+    if codificado:
+        tokens = lexico.tokenize_codificado(source, motor, errores_lexicos)
+    else:
+        tokens = lexico.tokenize(source, motor, errores_lexicos)
+    if clase_parser is None:
+        clase_parser = ASDRRecuperacion if recuperar else ASDRArbol if construir_arbol else ASDRCodificado if codificado else ASDRTabla
+    parser = clase_parser(gramatica, 'program', tokens=tokens)
+    arbol = None
+    if recuperar:
+        errores = parser.parse()
+        if errores:
+            primero = errores[0]
+            return ResultadoAnalisis(False, primero.mensaje, primero.row, primero.col, tokens, errores_lexicos, None, errores)
+        return ResultadoAnalisis(True, None, None, None, tokens, errores_lexicos, None, errores)
+    try:
+        parser.parse()
+    except SyntaxError as e:
+        token = parser.token_actual()
+        if construir_arbol:
+            arbol = parser.arbol
+        return ResultadoAnalisis(False, str(e), token.row, token.col, tokens, errores_lexicos, arbol)
+    if construir_arbol:
+        arbol = parser.arbol
+    return ResultadoAnalisis(True, None, None, None, tokens, errores_lexicos, arbol)
+
+def tokens_para_parser(lista_tokens_crudos):
+    """
+    Convierte la salida de lexico.lexer en la lista de tokens que recibe el parser,
+    agregando el EOF si falta.
+    """
+    tokens_parser = list(lista_tokens_crudos)
+
+    if not tokens_parser or tokens_parser[-1].kind != 'EOF':
+         last_row, last_col = (tokens_parser[-1].row, tokens_parser[-1].col + 1) if tokens_parser else (0, 0)
+         tokens_parser.append(lexico.Token('EOF', '', last_row, last_col))
+         print(f"    -> Type: 'EOF', Pos: <{last_row},{last_col}> (manual)")
+    return tokens_parser
+
+def _resultado_en_cache(cache, clave, archivo_entrada_py, archivo_salida_txt):
+    """
+    Reproduce un análisis guardado en la caché: repite sus mensajes, vuelve a escribir el
+    archivo de tokens (si la entrada los guarda) y el de salida. Retorna False si no está.
+    """
+    guardado = cache.obtener(clave)
+    if guardado is None:
+        return False
+    tokens = cache.tokens(clave)
+    if tokens is not None:
+        archivo_tokens = archivo_entrada_py.replace(".py", lexico.EXTENSIONES_TOKENS["texto"])
+        try:
+            lexico.exportar_texto(tokens, archivo_tokens)
+            print(f"Tokens guardados en '{archivo_tokens}' (caché)")
+        except IOError as e:
+            print(f"Error al escribir en el archivo '{archivo_tokens}': {e}")
+    print(guardado["mensaje"])
+    try:
+        with open(archivo_salida_txt, "w", encoding="utf-8") as f:
+            f.write(guardado["resultado"])
+        print(f"\nResultado del análisis guardado en '{archivo_salida_txt}'")
+    except IOError as e:
+        print(f"Error al escribir en el archivo de salida '{archivo_salida_txt}': {e}")
+    return True
+
+def main_analisis_sintactico(archivo_entrada_py, archivo_salida_txt, cache=None):
+    """
+    Lexea y parsea un archivo, guardando los tokens y el resultado en archivos de texto.
+
+    Si se indica una cache (cache_resultados.CacheResultados) y ya contiene el resultado
+    de un archivo con el mismo contenido, no se lexea ni se parsea: se reutiliza.
+    """
+    clave = None
+    if cache is not None:
+        try:
+            with open(archivo_entrada_py, "rb") as f:
+                clave = cache.clave(f.read(), "main")
+        except OSError:
+            pass
+        if clave is not None and _resultado_en_cache(cache, clave, archivo_entrada_py, archivo_salida_txt):
+            return
+
     try:
         lista_tokens_crudos = lexico.lexer(archivo_entrada_py)
     except FileNotFoundError:
@@ -353,94 +949,40 @@ def main_analisis_sintactico(archivo_entrada_py, archivo_salida_txt):
             f.write("Error: Análisis léxico fallido o archivo vacío.")
         return
 
-    tokens_parser_types = []
-    tokens_parser_info = []
-
-    for t in lista_tokens_crudos:
-        if isinstance(t, str) and t.startswith('<') and t.endswith('>'):
-            try:
-                inner_content = t[1:-1]
-                last_comma_index = inner_content.rfind(',')
-                second_last_comma_index = inner_content.rfind(',', 0, last_comma_index)
-
-                if last_comma_index != -1 and second_last_comma_index != -1:
-                    row_str = inner_content[second_last_comma_index + 1 : last_comma_index].strip()
-                    col_str = inner_content[last_comma_index + 1 :].strip()
-                    type_and_value_str = inner_content[:second_last_comma_index]
-                    first_comma_index_in_type_value = type_and_value_str.find(',')
-
-                    if first_comma_index_in_type_value != -1:
-                        actual_type = type_and_value_str[:first_comma_index_in_type_value].strip()
-                        actual_value_str = type_and_value_str[first_comma_index_in_type_value + 1 :].strip()
-                    else:
-                        actual_type = type_and_value_str.strip().rstrip(',')
-                        actual_value_str = ""
-
-                    row = int(row_str) if row_str.isdigit() else 0
-                    col = int(col_str) if col_str.isdigit() else 0
-
-                    if actual_value_str.startswith('"') and actual_value_str.endswith('"'):
-                        actual_value = actual_value_str[1:-1]
-                    elif actual_value_str.startswith("'") and actual_value_str.endswith("'"):
-                        actual_value = actual_value_str[1:-1]
-                    else:
-                         actual_value = actual_value_str
-
-                    tokens_parser_types.append(actual_type)
-                    tokens_parser_info.append((actual_value, row, col))
-
-                else:
-                    processed_type = inner_content.split(',')[0].strip() if inner_content else t.strip()
-                    tokens_parser_types.append(processed_type or 'UNKNOWN_TOKEN')
-                    tokens_parser_info.append(('', 0, 0))
-                    print(f"    -> Type: '{processed_type or 'UNKNOWN_TOKEN'}', Pos: <0,0> (dummy)")
-
-            except Exception as e:
-                 processed_type = t[1:-1].split(',')[0].strip() if isinstance(t, str) and t.startswith('<') and t.endswith('>') and t[1:-1].find(',') != -1 else str(t).strip()
-                 tokens_parser_types.append(processed_type or 'PROCESSING_ERROR_TOKEN')
-                 tokens_parser_info.append(('', 0, 0))
-                 print(f"    -> Type: '{processed_type or 'PROCESSING_ERROR_TOKEN'}', Pos: <0,0> (error)")
-
-        elif isinstance(t, str) and t.strip():
-             tokens_parser_types.append(t.strip())
-             tokens_parser_info.append(('', 0, 0))
-             print(f"    -> Type: '{t.strip()}', Pos: <0,0> (dummy)")
-        else:
-             if t:
-                print(f"  Advertencia: Ignorando item no válido o vacío de la salida del lexer: {t}")
-
-    if not tokens_parser_types or tokens_parser_types[-1] != 'EOF':
-         tokens_parser_types.append('EOF')
-         last_row, last_col = (tokens_parser_info[-1][1], tokens_parser_info[-1][2] + 1) if tokens_parser_info else (0, 0)
-         tokens_parser_info.append(('', last_row, last_col))
-         print(f"    -> Type: 'EOF', Pos: <{last_row},{last_col}> (manual)")
+    tokens_parser = tokens_para_parser(lista_tokens_crudos)
 
     try:       
-        parser = ASDR(gramatica, simbolo_inicial='program', tokens_types=tokens_parser_types, tokens_info=tokens_parser_info)
+        parser = ASDR(gramatica, simbolo_inicial='program', tokens=tokens_parser, iterativo=True)
         resultado = ""
         try:
              parser.parse()
              if parser.token_actual_type() == 'EOF':
-                 print("\n✔ Cadena aceptada: Análisis realizado exitosamente.")
+                 mensaje = "\n✔ Cadena aceptada: Análisis realizado exitosamente."
+                 error = None
+                 print(mensaje)
                  resultado = "✔ Cadena aceptada: Análisis realizado exitosamente. Consulta la salida de la consola para el rastreo."
              else:
                  value, row, col = parser.token_actual_info()
                  err_msg = f"<{row},{col}> Error sintactico: Análisis completado antes de consumir todos los símbolos restantes. Se encontró: “{parser.token_actual_type()}”.";
-                 print(f"\n❌ {err_msg}")
+                 mensaje, error = f"\n❌ {err_msg}", err_msg
+                 print(mensaje)
                  resultado = f"❌ {err_msg}"
 
         except SyntaxError as e:
-             print(f"\n❌ {e}")
+             mensaje, error = f"\n❌ {e}", str(e)
+             print(mensaje)
              resultado = f"❌ Error sintáctico: {e}"
         except Exception as e:
              value, row, col = parser.token_actual_info()
              err_msg = f"Ocurrió un error inesperado durante el análisis en <{row},{col}>: {e}"
-             print(f"\n❌ {err_msg}")
+             mensaje, error = f"\n❌ {err_msg}", err_msg
+             print(mensaje)
              resultado = f"❌ {err_msg}"
 
     except Exception as e:
          err_msg = f"Error durante la inicialización del parser: {e}"
-         print(f"\n❌ {err_msg}")
+         mensaje, error = f"\n❌ {err_msg}", err_msg
+         print(mensaje)
          resultado = f"❌ {err_msg}"
 
     try:
@@ -450,7 +992,16 @@ def main_analisis_sintactico(archivo_entrada_py, archivo_salida_txt):
     except IOError as e:
         print(f"Error al escribir en el archivo de salida '{archivo_salida_txt}': {e}")
 
+    if clave is not None:
+        guardado = {"aceptado": error is None, "errores": [] if error is None else [error], "mensaje": mensaje, "resultado": resultado}
+        cache.guardar(clave, guardado, tokens_parser)
+
 if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1:
+        import lote
+        sys.exit(lote.main(sys.argv[1:]))
+    compilar_gramatica(gramatica, 'program', RUTA_CACHE)
     archivo_entrada = "ejemplo.py"
     archivo_salida = "salida_sintactico.txt"
     main_analisis_sintactico(archivo_entrada, archivo_salida)
\ No newline at end of file
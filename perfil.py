@@ -0,0 +1,226 @@
+"""
+Instrumentación opcional de ASDR por no terminal.
+
+Con ASDR(..., perfil=True) el parser instala versiones instrumentadas de sus funciones
+parse_<nt> y de coincidir, que registran sus datos en un PerfilASDR (parser.perfil).
+Sin perfil se usan las funciones de siempre, así que la instrumentación no cuesta nada
+cuando no se pide.
+
+Uso:
+    python perfil.py ARCHIVO [--json perfil.json] [--recursivo] [--top N]
+"""
+import argparse
+import json
+import sys
+from time import perf_counter
+
+
+class PerfilASDR:
+    """
+    Datos recolectados por un ASDR instrumentado.
+
+    Atributos:
+        llamadas (dict): Expansiones de cada no terminal (incluye las colas que el
+            modo iterativo expande sin llamar a su función).
+        tokens (dict): Tokens consumidos dentro de cada expansión, sumados.
+        segundos (dict): Tiempo inclusivo de cada no terminal.
+        segundos_propios (dict): Tiempo sin contar otros no terminales ni coincidir.
+        producciones (dict): Por no terminal, cantidad de veces que se eligió cada
+            producción (en el orden de predicciones).
+        coincidir_llamadas (dict): Llamadas a coincidir por terminal esperado.
+        coincidir_segundos (float): Tiempo total dentro de coincidir.
+        profundidad_maxima (int): Máxima cantidad de funciones parse_<nt> activas a la vez.
+    """
+    def __init__(self, predicciones):
+        self.predicciones = predicciones
+        self.llamadas = dict.fromkeys(predicciones, 0)
+        self.tokens = dict.fromkeys(predicciones, 0)
+        self.segundos = dict.fromkeys(predicciones, 0.0)
+        self.segundos_propios = dict.fromkeys(predicciones, 0.0)
+        self.producciones = {nt: [0] * len(lista) for nt, lista in predicciones.items()}
+        self.coincidir_llamadas = {}
+        self.coincidir_segundos = 0.0
+        self.profundidad_maxima = 0
+        self.segundos_totales = 0.0
+        # Tiempo de los hijos de cada función activa, para calcular el tiempo propio
+        self.hijos = []
+
+    def registrar_coincidir(self, terminal, segundos):
+        self.coincidir_llamadas[terminal] = self.coincidir_llamadas.get(terminal, 0) + 1
+        self.coincidir_segundos += segundos
+        if self.hijos:
+            self.hijos[-1] += segundos
+
+    def reporte(self, tokens=None):
+        """
+        Devuelve el perfil como un diccionario serializable a JSON.
+
+        Parámetros:
+            tokens (int): Tokens consumidos por todo el análisis (parser.pos).
+
+        Retorna:
+            dict: Totales, datos por no terminal (ordenados por tiempo propio) y de coincidir.
+        """
+        no_terminales = {}
+        for nt in sorted(self.llamadas, key=lambda nt: -self.segundos_propios[nt]):
+            if not self.llamadas[nt]:
+                continue
+            no_terminales[nt] = {
+                "funcion": f"parse_{nt}",
+                "llamadas": self.llamadas[nt],
+                "tokens": self.tokens[nt],
+                "segundos": self.segundos[nt],
+                "segundos_propios": self.segundos_propios[nt],
+                "producciones": [
+                    {"produccion": " ".join(produccion) if produccion else "ε", "veces": veces}
+                    for (produccion, _), veces in zip(self.predicciones[nt], self.producciones[nt])
+                ],
+            }
+        return {
+            "tokens": tokens,
+            "segundos": self.segundos_totales,
+            "profundidad_maxima": self.profundidad_maxima,
+            "no_terminales": no_terminales,
+            "coincidir": {
+                "llamadas": sum(self.coincidir_llamadas.values()),
+                "segundos": self.coincidir_segundos,
+                "terminales": dict(sorted(self.coincidir_llamadas.items(), key=lambda item: -item[1])),
+            },
+        }
+
+
+def crear_funcion_perfilada(compilada, nt_inicial, funciones, iterativo):
+    """
+    Crea la función parse_<nt> instrumentada, equivalente a la de ASDR en el modo pedido.
+
+    Parámetros:
+        compilada (GramaticaCompilada): Gramática compilada.
+        nt_inicial (str): No terminal de la función.
+        funciones (dict): Funciones instrumentadas de los demás no terminales.
+        iterativo (bool): Si es True, las colas no terminales se expanden en el mismo ciclo.
+
+    Retorna:
+        function: Función que recibe el parser.
+    """
+    es_terminal = compilada.es_terminal
+    opciones = {}
+    for nt, lista in compilada.predicciones.items():
+        opciones[nt] = []
+        for indice, (produccion, pred) in enumerate(lista):
+            if iterativo and produccion and produccion[-1] in compilada.gramatica:
+                opciones[nt].append((indice, produccion, pred, produccion[:-1], produccion[-1]))
+            else:
+                opciones[nt].append((indice, produccion, pred, produccion, None))
+
+    def funcion(parser):
+        perfil = parser.perfil
+        hijos = perfil.hijos
+        hijos.append(0.0)
+        if len(hijos) > perfil.profundidad_maxima:
+            perfil.profundidad_maxima = len(hijos)
+        # Una entrada [nt, inicio, pos inicial, tiempo de hijos] por expansión de la cadena
+        cadena = []
+        nt = nt_inicial
+        try:
+            while nt is not None:
+                entrada = [nt, perf_counter(), parser.pos, 0.0]
+                cadena.append(entrada)
+                token = parser.token_actual()
+                actual_type = token.kind
+                row, col = token.row, token.col
+                expected_tokens = set()
+                for indice, produccion, pred, cuerpo, cola in opciones[nt]:
+                    expected_tokens.update(pred)
+                    if actual_type in pred:
+                        break
+                else:
+                    raise parser._error_prediccion(token, expected_tokens)
+                perfil.producciones[nt][indice] += 1
+                try:
+                    for s in cuerpo:
+                        if s == '[]':
+                            pass
+                        elif es_terminal(s):
+                            parser.coincidir(s)
+                        else:
+                            funciones[s](parser)
+                except SyntaxError as e:
+                     raise e
+                except Exception as e:
+                     raise SyntaxError(f"<{row},{col}> Error interno procesando producción {nt} → {' '.join(produccion) if produccion else 'ε'}: {e}")
+                entrada[3] = hijos[-1]
+                hijos[-1] = 0.0
+                nt = cola
+        finally:
+            fin = perf_counter()
+            pos = parser.pos
+            if cadena:
+                # Si la última expansión terminó con error, sus hijos no se habían registrado
+                cadena[-1][3] += hijos[-1]
+            hijos.pop()
+            siguiente = 0.0
+            for nt, inicio, pos_inicio, tiempo_hijos in reversed(cadena):
+                total = fin - inicio
+                perfil.llamadas[nt] += 1
+                perfil.tokens[nt] += pos - pos_inicio
+                perfil.segundos[nt] += total
+                perfil.segundos_propios[nt] += total - siguiente - tiempo_hijos
+                siguiente = total
+            if hijos:
+                hijos[-1] += siguiente
+            else:
+                perfil.segundos_totales += siguiente
+    funcion.__name__ = f"parse_{nt_inicial}"
+    return funcion
+
+
+def coincidir_perfilado(parser, coincidir):
+    """Devuelve una versión de coincidir que registra su tiempo en parser.perfil."""
+    perfil = parser.perfil
+    def funcion(terminal):
+        inicio = perf_counter()
+        try:
+            coincidir(terminal)
+        finally:
+            perfil.registrar_coincidir(terminal, perf_counter() - inicio)
+    return funcion
+
+
+def imprimir_reporte(reporte, top=15):
+    print(f"{reporte['tokens']} tokens en {reporte['segundos']:.4f} s; profundidad máxima: {reporte['profundidad_maxima']}\n")
+    print(f"{'no terminal':<26} {'llamadas':>10} {'tokens':>10} {'total (s)':>10} {'propio (s)':>11}")
+    for nt, datos in list(reporte["no_terminales"].items())[:top]:
+        print(f"{nt:<26} {datos['llamadas']:>10} {datos['tokens']:>10} {datos['segundos']:>10.4f} {datos['segundos_propios']:>11.4f}")
+    coincidir = reporte["coincidir"]
+    print(f"\ncoincidir: {coincidir['llamadas']} llamadas, {coincidir['segundos']:.4f} s")
+
+
+def main(argv=None):
+    import lexico
+    from parser import ASDR, gramatica
+
+    argumentos = argparse.ArgumentParser(description="Perfila el análisis sintáctico de un archivo por no terminal.")
+    argumentos.add_argument("archivo")
+    argumentos.add_argument("--json", help="archivo donde guardar el perfil")
+    argumentos.add_argument("--recursivo", action="store_true", help="usar el modo recursivo en lugar del iterativo")
+    argumentos.add_argument("--top", type=int, default=15, help="no terminales a mostrar")
+    opciones = argumentos.parse_args(argv)
+
+    with open(opciones.archivo, encoding="utf-8") as f:
+        tokens = lexico.tokenize(f.read())
+    parser = ASDR(gramatica, 'program', tokens=tokens, iterativo=not opciones.recursivo, perfil=True)
+    try:
+        parser.parse()
+    except SyntaxError as e:
+        print(f"❌ {e}\n")
+    reporte = parser.perfil.reporte(parser.pos)
+    imprimir_reporte(reporte, opciones.top)
+    if opciones.json:
+        with open(opciones.json, "w", encoding="utf-8") as f:
+            json.dump(reporte, f, ensure_ascii=False, indent=2)
+        print(f"\nPerfil guardado en '{opciones.json}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
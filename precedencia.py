@@ -0,0 +1,272 @@
+"""
+Expresiones con todos los operadores de lexico.OPERATORS, analizadas por precedencia (Pratt).
+
+La gramática de parser.py solo tiene + - * / en la cadena expression / expression' /
+term / term' / factor, que cuesta una llamada por nivel de precedencia y operando.
+Aquí los operadores binarios se describen en una tabla de poder de enlace (POTENCIAS),
+con la misma precedencia y asociatividad que en Python, y con ella:
+
+    gramatica_con_operadores() reemplaza la cadena por una cadena LL(1) con un nivel por
+        cada fila de NIVELES_OPERADORES, los prefijos - + ~ y la potencia ** (asociativa
+        por la derecha). Es la gramática del lenguaje extendido, la que usan los demás
+        parsers para aceptarlo, y define los PRIMEROS y SIGUIENTES del resto de la gramática.
+    ASDRPrecedencia analiza esa gramática con la TablaLL1, salvo 'expression' y
+        'comparison', que analiza por escalada de precedencia: un número constante de
+        operaciones por operador, sin importar cuántos niveles haya, y sin recursión:
+        los paréntesis, listas y llamadas usan la misma pila que la tabla.
+
+Los operadores de asignación (=, +=, ...) ya son parte de 'asig' en la gramática.
+"""
+import copy
+
+import lexico
+from gramatica_compilada import hash_gramatica
+from parser import ASDRTabla
+
+#Operadores binarios por nivel de precedencia, de menor a mayor, como en Python
+NIVELES_OPERADORES = [
+    ['tk_or_bin'],
+    ['tk_xor_bin'],
+    ['tk_and_bin'],
+    ['tk_despl_izq', 'tk_despl_der'],
+    ['tk_suma', 'tk_resta'],
+    ['tk_mult', 'tk_div', 'tk_div_entera', 'tk_mod'],
+]
+
+#Operadores prefijos (- + ~), que se enlazan más que los binarios salvo la potencia
+OPERADORES_PREFIJOS = ['tk_resta', 'tk_suma', 'tk_not_bin']
+POTENCIA_PREFIJOS = 10 * (len(NIVELES_OPERADORES) + 2)
+
+#La potencia se enlaza más que un prefijo a su izquierda y es asociativa por la derecha
+OPERADOR_POTENCIA = 'tk_pot'
+
+#Poder de enlace de las comparaciones: el menor, solo se aceptan dentro de 'comparison'
+POTENCIA_COMPARACION = 10
+
+
+def _potencias():
+    potencias = {}
+    for tipo in lexico.OPERATORS.values():
+        if tipo in ('tk_igual', 'tk_dif', 'tk_menor', 'tk_mayor', 'tk_menor_igual', 'tk_mayor_igual'):
+            potencias[tipo] = (POTENCIA_COMPARACION, POTENCIA_COMPARACION)
+    for nivel, operadores in enumerate(NIVELES_OPERADORES, start=2):
+        for tipo in operadores:
+            # Asociativos por la izquierda: el operando derecho no puede tomar otro igual
+            potencias[tipo] = (10 * nivel, 10 * nivel)
+    potencias[OPERADOR_POTENCIA] = (POTENCIA_PREFIJOS + 10, POTENCIA_PREFIJOS + 9)
+    return potencias
+
+
+#Poder de enlace (izquierdo, derecho) de cada operador binario
+POTENCIAS = _potencias()
+
+#Gramáticas extendidas por huella de la gramática original (no por objeto: se puede modificar)
+_extendidas = {}
+
+
+def gramatica_con_operadores(gramatica):
+    """
+    Devuelve una copia de la gramática cuya cadena de expresiones tiene todos los operadores.
+
+    'expression' y sus niveles (expression', term, term', factor) se reemplazan por un
+    nivel por cada fila de NIVELES_OPERADORES, un no terminal 'unario' para los prefijos,
+    'potencia' para ** y 'primario' con las producciones de factor que no empiezan con
+    un operador. El resultado se memoriza por el contenido de la gramática (una gramática
+    modificada se vuelve a extender) y aplicarla dos veces no cambia nada.
+
+    Parámetros:
+        gramatica (dict): Gramática con la cadena de parser.py.
+
+    Retorna:
+        dict: Gramática extendida, LL(1) si la original lo es.
+    """
+    if 'unario' in gramatica:
+        return gramatica
+    # La extensión no depende del símbolo inicial
+    huella = hash_gramatica(gramatica, None)
+    guardada = _extendidas.get(huella)
+    if guardada is not None:
+        return guardada
+    extendida = copy.deepcopy(gramatica)
+    primario = [prod for prod in extendida.pop('factor') if not (prod and prod[0] in OPERADORES_PREFIJOS)]
+    for nt in ("expression'", 'term', "term'"):
+        extendida.pop(nt, None)
+    nombres = ['expression'] + [f'nivel_{i}' for i in range(1, len(NIVELES_OPERADORES))] + ['unario']
+    for i, operadores in enumerate(NIVELES_OPERADORES):
+        nivel, operando, cola = nombres[i], nombres[i + 1], f"{nombres[i]}'"
+        extendida[nivel] = [[operando, cola]]
+        extendida[cola] = [[operador, operando, cola] for operador in operadores] + [[]]
+    extendida['unario'] = [[operador, 'unario'] for operador in OPERADORES_PREFIJOS] + [['potencia']]
+    extendida['potencia'] = [['primario', "potencia'"]]
+    extendida["potencia'"] = [[OPERADOR_POTENCIA, 'unario'], []]
+    extendida['primario'] = primario
+    _extendidas[huella] = extendida
+    return extendida
+
+
+class ASDRPrecedencia(ASDRTabla):
+    """
+    Variante de ASDRTabla que analiza 'expression' y 'comparison' por escalada de precedencia.
+
+    Recibe la gramática de parser.py y la extiende con gramatica_con_operadores, así que
+    acepta también // % ** & | ^ ~ << >>. El resto de la gramática se analiza con la
+    TablaLL1; dentro de una expresión, cada operador binario cuesta una consulta a
+    POTENCIAS y solo apila un nivel cuando se enlaza más que el anterior. Los
+    operandos que no son un entero, una cadena o un nombre (paréntesis, listas,
+    llamadas) vuelven a la tabla, en la misma pila: la profundidad de Python no crece con
+    el anidamiento de la entrada.
+
+    Acepta el mismo lenguaje que ASDRTabla sobre la gramática extendida y detecta los
+    errores en el mismo token; el conjunto de tokens esperados del mensaje puede ser el
+    del no terminal que rodea a la expresión en lugar del de un nivel de la cadena.
+    """
+    def __init__(self, gramatica, simbolo_inicial, **opciones):
+        super().__init__(gramatica_con_operadores(gramatica), simbolo_inicial, **opciones)
+
+    def _instalar_funciones(self):
+        super()._instalar_funciones()
+        datos = self.compilada.funciones.get('precedencia')
+        if datos is None:
+            datos = self.compilada.funciones['precedencia'] = self._preparar(self.compilada)
+        (self._id_expresion, self._id_comparacion, self._id_primario, self._prefijos, self._infijos,
+         self._comparadores, self._inicio_operando, self._simples, self._sufijos) = datos
+
+    @staticmethod
+    def _preparar(compilada):
+        """Calcula, una vez por gramática, las tablas que usa la escalada de precedencia."""
+        tabla, gramatica, predicciones = compilada.tabla, compilada.gramatica, compilada.predicciones
+        prefijos = dict.fromkeys(OPERADORES_PREFIJOS, POTENCIA_PREFIJOS)
+        infijos = {tipo: potencia for tipo, potencia in POTENCIAS.items() if potencia[0] > POTENCIA_COMPARACION}
+        comparadores = {tipo for tipo, potencia in POTENCIAS.items() if potencia[0] == POTENCIA_COMPARACION}
+        # Operandos de un solo terminal (tk_entero) y terminal seguido de un sufijo anulable (id llamada)
+        simples, sufijos = set(), {}
+        for produccion in gramatica['primario']:
+            if len(produccion) == 1 and produccion[0] not in gramatica:
+                simples.add(produccion[0])
+            elif len(produccion) == 2 and produccion[0] not in gramatica and 'ε' in compilada.primeros.get(produccion[1], ()):
+                inicio = set().union(*(pred for prod, pred in predicciones[produccion[1]] if prod))
+                sufijos[produccion[0]] = (tabla.id_simbolo(produccion[1]), inicio)
+        return (tabla.id_simbolo('expression'), tabla.id_simbolo('comparison'), tabla.id_simbolo('primario'),
+                prefijos, infijos, comparadores, compilada.primeros['unario'] - {'ε'}, simples, sufijos)
+
+    def _derivar(self):
+        """
+        Analiza el programa con la tabla, delegando 'expression' y 'comparison' a la escalada de precedencia.
+
+        Todo el análisis usa una sola pila, sin recursión: cuando un operando necesita la
+        tabla (paréntesis, listas y llamadas), la escalada devuelve su estado, que queda en
+        'estados' con una marca en la pila para retomarlo cuando la tabla termine el
+        operando. 'comparison' se apila como expression, una marca de comparador y expression.
+        """
+        tabla = self.tabla
+        entradas, cuerpos, ancho = tabla.entradas, tabla.cuerpos, tabla.ancho
+        id_terminal, desconocido = tabla.id_terminal, tabla.desconocido
+        id_expresion, id_comparacion = self._id_expresion, self._id_comparacion
+        # Marcas con ids fuera del rango de los no terminales
+        reanudar = -1 - len(tabla.no_terminales)
+        comparador = reanudar - 1
+        flujo = self.flujo
+        token = flujo.actual
+        t = id_terminal.get(token.kind, desconocido)
+        pila = [tabla.inicial]
+        estados = []
+        while pila:
+            x = pila.pop()
+            if x >= 0:
+                if x != t:
+                    self.coincidir(tabla.terminales[x])
+                flujo.avanzar()
+                self.pos += 1
+            elif x == id_expresion or x == reanudar:
+                estado = self._escalar(estados.pop() if x == reanudar else None)
+                if estado is not None:
+                    # Se retoma después de que la tabla analice el operando
+                    estados.append(estado)
+                    pila.append(reanudar)
+                    pila.append(estado[3])
+            elif x == id_comparacion:
+                pila += (id_expresion, comparador, id_expresion)
+                continue
+            elif x < reanudar:
+                # Marca de comparador, entre las dos expresiones de 'comparison'
+                if token.kind not in self._comparadores:
+                    raise self._error_prediccion(token, self._comparadores)
+                flujo.avanzar()
+                self.pos += 1
+            else:
+                id_prod = entradas[(-1 - x) * ancho + t]
+                if id_prod < 0:
+                    nt = tabla.no_terminales[-1 - x]
+                    esperados = set()
+                    for _, pred in self.predicciones[nt]:
+                        esperados.update(pred)
+                    raise self._error_prediccion(token, esperados)
+                pila.extend(cuerpos[id_prod])
+                continue
+            token = flujo.actual
+            t = id_terminal.get(token.kind, desconocido)
+
+    def _escalar(self, estado):
+        """
+        Avanza la escalada de precedencia de una expresión hasta terminarla o hasta un operando que analiza la tabla.
+
+        Los niveles que quedan abiertos (el de cada operador prefijo y el de cada operador
+        que se enlaza más que el anterior) se guardan en una lista como pares
+        (minimo, derecha), así que ni las cadenas de ** ni las de prefijos suman llamadas.
+
+        Parámetros:
+            estado (tuple): Estado devuelto por una llamada anterior, cuyo operando acaba de
+                analizar la tabla, o None para empezar una expresión.
+
+        Retorna:
+            tuple: None si la expresión terminó, o el estado a retomar: (minimo, derecha,
+            niveles, simbolo), donde simbolo (primario o un sufijo) es el no terminal con el
+            que la tabla debe analizar el operando.
+        """
+        flujo, prefijos, infijos, simples, sufijos = self.flujo, self._prefijos, self._infijos, self._simples, self._sufijos
+        if estado is None:
+            minimo = derecha = POTENCIA_COMPARACION
+            niveles = []
+        else:
+            minimo, derecha, niveles, _ = estado
+        operando = estado is None
+        while True:
+            if operando:
+                tipo = flujo.actual.kind
+                # Cada prefijo abre un nivel que solo admite los operadores que se enlazan más que él
+                while tipo in prefijos:
+                    niveles.append((minimo, derecha))
+                    minimo = derecha = prefijos[tipo]
+                    flujo.avanzar()
+                    self.pos += 1
+                    tipo = flujo.actual.kind
+                # Los operandos más comunes (enteros, cadenas y nombres) se consumen aquí mismo
+                if tipo in simples:
+                    flujo.avanzar()
+                    self.pos += 1
+                elif tipo in sufijos:
+                    flujo.avanzar()
+                    self.pos += 1
+                    id_sufijo, inicio = sufijos[tipo]
+                    if flujo.actual.kind in inicio:
+                        return minimo, derecha, niveles, id_sufijo
+                elif tipo in self._inicio_operando:
+                    return minimo, derecha, niveles, self._id_primario
+                else:
+                    raise self._error_prediccion(flujo.actual, self._inicio_operando)
+            operando = True
+            potencia = infijos.get(flujo.actual.kind)
+            if potencia is None:
+                return None
+            # Se cierran los niveles en los que el operador siguiente no se enlaza
+            while potencia[0] <= minimo:
+                if not niveles:
+                    return None
+                minimo, derecha = niveles.pop()
+            # Solo se abre un nivel si el operador se enlaza más que el anterior del mismo nivel
+            if potencia[0] > derecha > minimo:
+                niveles.append((minimo, derecha))
+                minimo = derecha
+            flujo.avanzar()
+            self.pos += 1
+            derecha = potencia[1]
@@ -0,0 +1,421 @@
+"""
+Servicio de análisis de larga duración con asyncio, para no pagar el arranque del
+intérprete y la compilación de la gramática por cada archivo.
+
+Protocolo (JSON por líneas, sobre TCP local o un socket Unix): cada línea es una petición
+y cada respuesta lleva el mismo "id", en el orden en que terminan.
+
+    {"id": 1, "fuente": "x = 1\\n", "recuperar": false, "timeout": 5}
+    {"id": 1, "aceptado": true, "error": null, "fila": null, "columna": null,
+     "tokens": 4, "errores_lexicos": [], "segundos": 0.0003}
+
+    {"id": 2, "op": "estadisticas"}
+    {"id": 2, "peticiones": 10, "errores": 0, "vencidas": 0, "pendientes": 0, "latencia_ms": {...}}
+
+Una petición que falla devuelve {"id": ..., "error_servicio": "mensaje"}. El lexeo y el
+parseo se hacen en un ProcessPoolExecutor cuyos procesos reciben la gramática ya
+compilada. Un cliente puede enviar varias peticiones sin esperar las respuestas
+(pipelining); cuando tiene demasiadas en curso el servicio deja de leer su conexión, y
+el total en curso también está acotado (contrapresión). El timeout de una petición
+incluye la espera por un lugar, y si un proceso muere el ejecutor se reemplaza.
+
+Uso:
+    python servicio.py servidor [--puerto 8765 | --unix RUTA] [-j TRABAJOS] [--timeout S]
+    python servicio.py cliente ARCHIVO [ARCHIVO ...] [--puerto 8765 | --unix RUTA] [--repeticiones N] [--ventana K]
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import gramatica_compilada
+import parser as analizador
+
+#Límite de una línea del protocolo (una petición incluye el código fuente completo)
+LIMITE_LINEA = 64 << 20
+
+
+def percentiles(valores, cuantiles=(50, 90, 99)):
+    """
+    Calcula percentiles (por el método del rango más cercano) de una lista de valores.
+
+    Retorna:
+        dict: "p50", "p90", ... -> valor, más "max"; vacío si no hay valores.
+    """
+    if not valores:
+        return {}
+    ordenados = sorted(valores)
+    n = len(ordenados)
+    resultado = {f"p{q}": ordenados[min(n - 1, max(0, -(-q * n // 100) - 1))] for q in cuantiles}
+    resultado["max"] = ordenados[-1]
+    return resultado
+
+
+def analizar_fuente(source, recuperar=False):
+    """
+    Lexea y parsea un código fuente y devuelve un resultado serializable en JSON.
+
+    Parámetros:
+        source (str): Código fuente.
+        recuperar (bool): Si es True, se reportan todos los errores sintácticos.
+
+    Retorna:
+        dict: aceptado, error, fila, columna, tokens, errores_lexicos y segundos (y
+        errores_sintacticos si se pidió recuperación).
+    """
+    inicio = time.perf_counter()
+    r = analizador.parse_source(source, recuperar=recuperar)
+    resultado = {"aceptado": r.aceptado, "error": r.error, "fila": r.fila, "columna": r.columna,
+                 "tokens": len(r.tokens), "errores_lexicos": [str(e) for e in r.errores_lexicos]}
+    if recuperar:
+        resultado["errores_sintacticos"] = [{"error": e.mensaje, "fila": e.row, "columna": e.col} for e in r.errores_sintacticos]
+    resultado["segundos"] = time.perf_counter() - inicio
+    return resultado
+
+
+def _inicializar_trabajador(compilada):
+    gramatica_compilada.registrar(compilada)
+
+
+class ServicioAnalisis:
+    """
+    Servidor asyncio que atiende peticiones de análisis con un conjunto de procesos.
+
+    Parámetros:
+        trabajos (int): Procesos del ejecutor; por defecto, uno por núcleo.
+        max_pendientes (int): Peticiones en curso como máximo entre todas las conexiones.
+        por_conexion (int): Peticiones en curso como máximo por conexión; al alcanzarlo
+            se deja de leer la conexión hasta que termine alguna.
+        timeout (float): Segundos máximos por petición si esta no indica otro.
+        muestras (int): Cantidad de latencias recientes usadas para los percentiles.
+    """
+    def __init__(self, trabajos=None, max_pendientes=256, por_conexion=32, timeout=30.0, muestras=10000):
+        self.trabajos = trabajos or os.cpu_count() or 1
+        self.timeout = timeout
+        self.por_conexion = por_conexion
+        self._max_pendientes = max_pendientes
+        self._latencias = deque(maxlen=muestras)
+        self.peticiones = 0
+        self.errores = 0
+        self.vencidas = 0
+        self.pendientes = 0
+        self.servidor = None
+        self.ejecutor = None
+
+    async def iniciar(self, host="127.0.0.1", puerto=0, ruta_unix=None):
+        """
+        Compila la gramática, arranca los procesos y empieza a escuchar.
+
+        Parámetros:
+            host (str): Dirección TCP (solo local por defecto).
+            puerto (int): Puerto TCP; 0 elige uno libre (ver direccion()).
+            ruta_unix (str): Si se indica, se escucha en ese socket Unix en lugar de TCP.
+        """
+        self._compilada = gramatica_compilada.compilar_gramatica(analizador.gramatica, 'program', gramatica_compilada.RUTA_CACHE)
+        self.ejecutor = self._crear_ejecutor()
+        # Se arrancan los procesos antes de aceptar conexiones para que la primera petición no pague su arranque
+        calentar = [self.ejecutor.submit(analizar_fuente, "pass\n") for _ in range(self.trabajos)]
+        await asyncio.gather(*(asyncio.wrap_future(f) for f in calentar))
+        self._cupo = asyncio.Semaphore(self._max_pendientes)
+        if ruta_unix:
+            self.servidor = await asyncio.start_unix_server(self._atender, ruta_unix, limit=LIMITE_LINEA)
+        else:
+            self.servidor = await asyncio.start_server(self._atender, host, puerto, limit=LIMITE_LINEA)
+        return self.servidor
+
+    def _crear_ejecutor(self):
+        return ProcessPoolExecutor(max_workers=self.trabajos, initializer=_inicializar_trabajador, initargs=(self._compilada,))
+
+    def _reemplazar_ejecutor(self, roto):
+        """Reemplaza un ejecutor roto (murió uno de sus procesos) una sola vez, aunque fallen varias peticiones."""
+        if self.ejecutor is roto:
+            roto.shutdown(wait=False, cancel_futures=True)
+            self.ejecutor = self._crear_ejecutor()
+        return self.ejecutor
+
+    def direccion(self):
+        """Devuelve la dirección donde escucha el servidor ((host, puerto) o la ruta del socket)."""
+        return self.servidor.sockets[0].getsockname()
+
+    async def cerrar(self):
+        if self.servidor is not None:
+            self.servidor.close()
+            await self.servidor.wait_closed()
+        if self.ejecutor is not None:
+            self.ejecutor.shutdown(cancel_futures=True)
+
+    def estadisticas(self):
+        """Devuelve los contadores del servicio y los percentiles de latencia en milisegundos."""
+        return {
+            "peticiones": self.peticiones,
+            "errores": self.errores,
+            "vencidas": self.vencidas,
+            "pendientes": self.pendientes,
+            "latencia_ms": {k: v * 1000 for k, v in percentiles(list(self._latencias)).items()},
+        }
+
+    async def _atender(self, reader, writer):
+        en_curso = asyncio.Semaphore(self.por_conexion)
+        escritura = asyncio.Lock()
+        tareas = set()
+        try:
+            while True:
+                await en_curso.acquire()
+                try:
+                    linea = await reader.readline()
+                except ValueError:
+                    # La línea pasa de LIMITE_LINEA: no se puede seguir leyendo la conexión, pero se avisa antes de cerrarla
+                    en_curso.release()
+                    self.errores += 1
+                    await self._escribir({"id": None, "error_servicio": f"Petición inválida: la línea supera {LIMITE_LINEA} bytes"},
+                                         writer, escritura)
+                    break
+                except ConnectionError:
+                    en_curso.release()
+                    break
+                if not linea:
+                    en_curso.release()
+                    break
+                tarea = asyncio.ensure_future(self._responder(linea, writer, escritura, en_curso))
+                tareas.add(tarea)
+                tarea.add_done_callback(tareas.discard)
+            if tareas:
+                await asyncio.gather(*tareas, return_exceptions=True)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _responder(self, linea, writer, escritura, en_curso):
+        try:
+            await self._escribir(await self._procesar(linea), writer, escritura)
+        finally:
+            en_curso.release()
+
+    @staticmethod
+    async def _escribir(respuesta, writer, escritura):
+        datos = (json.dumps(respuesta, ensure_ascii=False) + "\n").encode("utf-8")
+        try:
+            async with escritura:
+                writer.write(datos)
+                await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def _procesar(self, linea):
+        inicio = time.perf_counter()
+        try:
+            peticion = json.loads(linea)
+        except ValueError as e:
+            self.errores += 1
+            return {"id": None, "error_servicio": f"Petición inválida: {e}"}
+        if not isinstance(peticion, dict):
+            self.errores += 1
+            return {"id": None, "error_servicio": "Petición inválida: se esperaba un objeto JSON"}
+        id_peticion = peticion.get("id")
+        if peticion.get("op") == "estadisticas":
+            return {"id": id_peticion, **self.estadisticas()}
+        fuente = peticion.get("fuente")
+        if not isinstance(fuente, str):
+            self.errores += 1
+            return {"id": id_peticion, "error_servicio": "Petición inválida: falta 'fuente'"}
+        timeout = peticion.get("timeout")
+        if timeout is None:
+            timeout = self.timeout
+        elif isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or not 0 < timeout < math.inf:
+            self.errores += 1
+            return {"id": id_peticion, "error_servicio": "Petición inválida: 'timeout' debe ser un número positivo"}
+        recuperar = bool(peticion.get("recuperar"))
+        bucle = asyncio.get_running_loop()
+        limite = None if timeout is None else bucle.time() + timeout
+        ejecutor = futuro = None
+        self.pendientes += 1
+        try:
+            # La espera por un lugar cuenta dentro del timeout de la petición
+            await asyncio.wait_for(self._cupo.acquire(), timeout)
+            try:
+                ejecutor = self.ejecutor
+                try:
+                    futuro = ejecutor.submit(analizar_fuente, fuente, recuperar)
+                except BrokenProcessPool:
+                    # Se rompió con una petición anterior: esta todavía no se ejecutó y se reintenta
+                    ejecutor = self._reemplazar_ejecutor(ejecutor)
+                    futuro = ejecutor.submit(analizar_fuente, fuente, recuperar)
+            except Exception:
+                self._cupo.release()
+                raise
+            # El lugar se devuelve cuando el análisis termina de verdad, no cuando se deja de esperarlo:
+            # un análisis vencido sigue ocupando un proceso y debe seguir contando para la contrapresión
+            futuro.add_done_callback(lambda _: bucle.call_soon_threadsafe(self._cupo.release))
+            resultado = await asyncio.wait_for(asyncio.wrap_future(futuro), None if limite is None else limite - bucle.time())
+        except asyncio.TimeoutError:
+            # Un análisis que ya empezó no se puede interrumpir; su resultado se descarta
+            if futuro is not None:
+                futuro.cancel()
+            self.vencidas += 1
+            return {"id": id_peticion, "error_servicio": f"Tiempo agotado ({timeout} s)"}
+        except BrokenProcessPool:
+            self._reemplazar_ejecutor(ejecutor)
+            self.errores += 1
+            return {"id": id_peticion, "error_servicio": "Error interno: un proceso de análisis terminó de forma abrupta"}
+        except Exception as e:
+            self.errores += 1
+            return {"id": id_peticion, "error_servicio": f"Error interno: {e}"}
+        finally:
+            self.pendientes -= 1
+        self.peticiones += 1
+        self._latencias.append(time.perf_counter() - inicio)
+        return {"id": id_peticion, **resultado}
+
+
+async def _conectar(host, puerto, ruta_unix):
+    if ruta_unix:
+        return await asyncio.open_unix_connection(ruta_unix, limit=LIMITE_LINEA)
+    return await asyncio.open_connection(host, puerto, limit=LIMITE_LINEA)
+
+
+async def enviar(fuentes, host="127.0.0.1", puerto=8765, ruta_unix=None, ventana=32, recuperar=False, timeout=None):
+    """
+    Cliente: envía varias fuentes por una conexión con hasta ventana peticiones en curso.
+
+    Parámetros:
+        fuentes (list): Códigos fuente a analizar.
+        host, puerto, ruta_unix: Dirección del servicio.
+        ventana (int): Peticiones enviadas sin esperar respuesta.
+        recuperar (bool): Si es True, se piden todos los errores sintácticos.
+        timeout (float): Segundos máximos por petición, o None para usar los del servicio.
+
+    Retorna:
+        tuple: (respuestas en el orden de fuentes, latencias en segundos vistas por el cliente).
+    """
+    reader, writer = await _conectar(host, puerto, ruta_unix)
+    respuestas = [None] * len(fuentes)
+    latencias = [0.0] * len(fuentes)
+    enviadas = {}
+    libres = asyncio.Semaphore(ventana)
+
+    async def leer():
+        for _ in range(len(fuentes)):
+            linea = await reader.readline()
+            if not linea:
+                raise ConnectionError("El servicio cerró la conexión")
+            respuesta = json.loads(linea)
+            i = respuesta.get("id")
+            if i not in enviadas:
+                # Una respuesta sin id de petición (como la de una línea demasiado larga) precede al cierre
+                raise ConnectionError(f"El servicio rechazó la conexión: {respuesta.get('error_servicio', respuesta)}")
+            latencias[i] = time.perf_counter() - enviadas.pop(i)
+            respuestas[i] = respuesta
+            libres.release()
+
+    async def esperar_lugar():
+        # Si el lector termina (el servicio cerró la conexión) no va a liberar más lugares: se propaga su error
+        adquirir = asyncio.ensure_future(libres.acquire())
+        await asyncio.wait((adquirir, lector), return_when=asyncio.FIRST_COMPLETED)
+        if not adquirir.done():
+            adquirir.cancel()
+            lector.result()
+            raise ConnectionError("El servicio respondió más peticiones de las enviadas")
+
+    lector = asyncio.ensure_future(leer())
+    try:
+        for i, fuente in enumerate(fuentes):
+            await esperar_lugar()
+            peticion = {"id": i, "fuente": fuente, "recuperar": recuperar}
+            if timeout is not None:
+                peticion["timeout"] = timeout
+            enviadas[i] = time.perf_counter()
+            writer.write((json.dumps(peticion, ensure_ascii=False) + "\n").encode("utf-8"))
+            await writer.drain()
+        await lector
+    finally:
+        lector.cancel()
+        writer.close()
+    return respuestas, latencias
+
+
+async def consultar_estadisticas(host="127.0.0.1", puerto=8765, ruta_unix=None):
+    """Cliente: devuelve las estadísticas del servicio."""
+    reader, writer = await _conectar(host, puerto, ruta_unix)
+    try:
+        writer.write(b'{"id": 0, "op": "estadisticas"}\n')
+        await writer.drain()
+        return json.loads(await reader.readline())
+    finally:
+        writer.close()
+
+
+async def _servir(opciones):
+    servicio = ServicioAnalisis(opciones.trabajos, timeout=opciones.timeout)
+    await servicio.iniciar(puerto=opciones.puerto, ruta_unix=opciones.unix)
+    print(f"Servicio de análisis escuchando en {servicio.direccion()} con {servicio.trabajos} procesos")
+    try:
+        await servicio.servidor.serve_forever()
+    finally:
+        await servicio.cerrar()
+
+
+async def _cliente(opciones):
+    fuentes, nombres = [], []
+    for ruta in opciones.archivos:
+        with open(ruta, "r", encoding="utf-8") as f:
+            fuentes.append(f.read())
+        nombres.append(ruta)
+    fuentes *= opciones.repeticiones
+    nombres *= opciones.repeticiones
+    inicio = time.perf_counter()
+    respuestas, latencias = await enviar(fuentes, puerto=opciones.puerto, ruta_unix=opciones.unix, ventana=opciones.ventana,
+                                         recuperar=opciones.recuperar, timeout=opciones.timeout)
+    segundos = time.perf_counter() - inicio
+    for nombre, respuesta in list(zip(nombres, respuestas))[:len(opciones.archivos)]:
+        if "error_servicio" in respuesta:
+            print(f"⚠ {nombre}: {respuesta['error_servicio']}")
+        elif respuesta["aceptado"]:
+            print(f"✔ {nombre} ({respuesta['tokens']} tokens)")
+        else:
+            print(f"❌ {nombre}: {respuesta['error']}")
+    latencia = " ".join(f"{k}={v * 1000:.2f}ms" for k, v in percentiles(latencias).items())
+    print(f"\n{len(fuentes)} peticiones en {segundos:.3f} s ({len(fuentes) / segundos:.1f} peticiones/s)")
+    print(f"Latencia en el cliente: {latencia}")
+    estadisticas = await consultar_estadisticas(puerto=opciones.puerto, ruta_unix=opciones.unix)
+    latencia = " ".join(f"{k}={v:.2f}ms" for k, v in estadisticas["latencia_ms"].items())
+    print(f"Latencia en el servicio: {latencia}")
+    return 0 if all(r.get("aceptado") for r in respuestas) else 1
+
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description="Servicio de análisis sintáctico (JSON por líneas).")
+    modos = argumentos.add_subparsers(dest="modo", required=True)
+    servidor = modos.add_parser("servidor", help="iniciar el servicio")
+    servidor.add_argument("-j", "--trabajos", type=int, default=None, help="número de procesos (por defecto, uno por núcleo)")
+    cliente = modos.add_parser("cliente", help="enviar archivos a un servicio en ejecución")
+    cliente.add_argument("archivos", nargs="+", help="archivos a analizar")
+    cliente.add_argument("--repeticiones", type=int, default=1, help="enviar cada archivo varias veces")
+    cliente.add_argument("--ventana", type=int, default=32, help="peticiones enviadas sin esperar respuesta")
+    cliente.add_argument("--recuperar", action="store_true", help="pedir todos los errores sintácticos")
+    for modo in (servidor, cliente):
+        modo.add_argument("--puerto", type=int, default=8765, help="puerto TCP local")
+        modo.add_argument("--unix", help="socket Unix en lugar de TCP")
+        modo.add_argument("--timeout", type=float, default=None, help="segundos máximos por petición")
+    opciones = argumentos.parse_args(argv)
+    if opciones.modo == "servidor":
+        if opciones.timeout is None:
+            opciones.timeout = 30.0
+        try:
+            asyncio.run(_servir(opciones))
+        except KeyboardInterrupt:
+            pass
+        return 0
+    return asyncio.run(_cliente(opciones))
+
+
+if __name__ == "__main__":
+    sys.exit(main())